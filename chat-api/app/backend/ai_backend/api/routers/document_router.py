@@ -90,7 +90,6 @@ def upload_folder(
     """폴더 전체 업로드 (Document 테이블에 저장)"""
     try:
         import os
-        from io import BytesIO
         from pathlib import Path
 
         from fastapi import UploadFile
@@ -131,23 +130,20 @@ def upload_folder(
         
         for file_path in files_to_upload:
             try:
-                # 파일을 UploadFile 객체로 변환
+                # 파일 핸들을 UploadFile 객체로 감싸서 전달 (내용을 메모리에 올리지 않음)
                 with open(file_path, 'rb') as f:
-                    file_content = f.read()
-                
-                # UploadFile 객체 생성
-                file_obj = UploadFile(
-                    filename=file_path.name,
-                    file=BytesIO(file_content),
-                    size=len(file_content)
-                )
-                
-                # 기존 upload_document 호출
-                result = document_service.upload_document(
-                    file=file_obj,
-                    user_id=user_id,
-                    is_public=is_public
-                )
+                    file_obj = UploadFile(
+                        filename=file_path.name,
+                        file=f,
+                        size=file_path.stat().st_size
+                    )
+                    
+                    # 기존 upload_document 호출
+                    result = document_service.upload_document(
+                        file=file_obj,
+                        user_id=user_id,
+                        is_public=is_public
+                    )
                 
                 uploaded_documents.append(result)
                 uploaded_count += 1
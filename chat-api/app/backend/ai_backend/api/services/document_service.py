@@ -1,6 +1,7 @@
 # _*_ coding: utf-8 _*_
 """Document Service for handling file uploads and management."""
 import logging
+import os
 from typing import Dict, List, Optional
 from datetime import datetime
 
@@ -93,9 +94,12 @@ class DocumentService(BaseDocumentService):
             original_filename = file.filename
             file_extension = self._get_file_extension(original_filename)
             
-            # 파일 크기 확인 (환경변수에서 설정값 가져오기)
-            file_content = file.file.read()
-            file_size = len(file_content)
+            # 파일 크기 확인 (환경변수에서 설정값 가져오기, 내용을 읽지 않고 스트림 끝 위치로 확인)
+            file_size = file.size
+            if file_size is None:
+                file.file.seek(0, os.SEEK_END)
+                file_size = file.file.tell()
+            file.file.seek(0)
             max_size = settings.upload_max_size
             
             if file_size > max_size:
@@ -111,9 +115,9 @@ class DocumentService(BaseDocumentService):
                 raise HandledException(ResponseCode.DOCUMENT_INVALID_FILE_TYPE, 
                                      msg=f"지원하지 않는 파일 형식입니다. 허용된 형식: {allowed_types_str}")
             
-            # 공통 모듈의 create_document_from_file 사용
-            result = self.create_document_from_file(
-                file_content=file_content,
+            # 공통 모듈의 create_document_from_stream 사용 (청크 단위 복사 + 해시 계산)
+            result = self.create_document_from_stream(
+                file_obj=file.file,
                 filename=str(original_filename),
                 user_id=user_id,
                 is_public=is_public,
@@ -0,0 +1,26 @@
+-- ============================================================================
+-- Migration: Add chunk offset columns to DOCUMENT_CHUNKS
+-- Created: 2026-10-17
+-- Purpose: 페이지 하위 청크 분할 지원 (페이지 내 청크 순번, 원본 내 위치, 토큰 수)
+-- ============================================================================
+
+-- 1. 컬럼 추가 (기존 행은 페이지 전체를 담은 청크 0번으로 간주)
+ALTER TABLE DOCUMENT_CHUNKS
+    ADD COLUMN chunk_index INT DEFAULT 0 COMMENT '페이지 내 청크 순번',
+    ADD COLUMN char_start INT NULL COMMENT '원본(페이지 텍스트/이미지 설명) 내 시작 위치',
+    ADD COLUMN char_end INT NULL COMMENT '원본 내 끝 위치',
+    ADD COLUMN token_count INT NULL COMMENT '임베딩 입력 토큰 수 (추정치)';
+
+-- 2. 기존 행 기본값
+UPDATE DOCUMENT_CHUNKS
+SET chunk_index = 0,
+    char_start = 0,
+    char_end = COALESCE(char_count, 0)
+WHERE char_start IS NULL;
+
+-- 3. 문서 청크 조회 순서용 인덱스
+CREATE INDEX idx_document_chunks_doc_page_chunk
+    ON DOCUMENT_CHUNKS (doc_id, page_number, chunk_index);
+
+-- 4. 확인 쿼리
+SHOW COLUMNS FROM DOCUMENT_CHUNKS LIKE 'char_%';
@@ -0,0 +1,42 @@
+-- ============================================================================
+-- Migration: Add chunk offset columns to DOCUMENT_CHUNKS (PostgreSQL)
+-- Created: 2026-10-17
+-- Purpose: 페이지 하위 청크 분할 지원 (페이지 내 청크 순번, 원본 내 위치, 토큰 수)
+-- ============================================================================
+
+-- 1. 컬럼 추가 (기존 행은 페이지 전체를 담은 청크 0번으로 간주)
+ALTER TABLE "DOCUMENT_CHUNKS" ADD COLUMN IF NOT EXISTS chunk_index INTEGER DEFAULT 0;
+ALTER TABLE "DOCUMENT_CHUNKS" ADD COLUMN IF NOT EXISTS char_start INTEGER;
+ALTER TABLE "DOCUMENT_CHUNKS" ADD COLUMN IF NOT EXISTS char_end INTEGER;
+ALTER TABLE "DOCUMENT_CHUNKS" ADD COLUMN IF NOT EXISTS token_count INTEGER;
+
+-- 2. 기존 행 기본값
+UPDATE "DOCUMENT_CHUNKS"
+SET chunk_index = 0,
+    char_start = 0,
+    char_end = COALESCE(char_count, 0)
+WHERE char_start IS NULL;
+
+-- 3. 컬럼 주석 추가
+COMMENT ON COLUMN "DOCUMENT_CHUNKS".chunk_index IS '페이지 내 청크 순번';
+COMMENT ON COLUMN "DOCUMENT_CHUNKS".char_start IS '원본(페이지 텍스트/이미지 설명) 내 시작 위치';
+COMMENT ON COLUMN "DOCUMENT_CHUNKS".char_end IS '원본 내 끝 위치';
+COMMENT ON COLUMN "DOCUMENT_CHUNKS".token_count IS '임베딩 입력 토큰 수 (추정치)';
+
+-- 4. 문서 청크 조회 순서용 인덱스
+CREATE INDEX IF NOT EXISTS idx_document_chunks_doc_page_chunk
+    ON "DOCUMENT_CHUNKS" (doc_id, page_number, chunk_index);
+
+-- 5. 확인 쿼리
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'DOCUMENT_CHUNKS'
+  AND column_name IN ('chunk_index', 'char_start', 'char_end', 'token_count');
+
+-- ============================================================================
+-- 참고:
+-- ============================================================================
+-- Milvus 컬렉션도 스키마 v2(chunk_id, chunk_index, chunk_count, char_start, char_end)로
+-- 바뀌었으므로 doc-processor에서 함께 마이그레이션하세요.
+--    python run_migrate_collection.py --update-chunks
+-- ============================================================================
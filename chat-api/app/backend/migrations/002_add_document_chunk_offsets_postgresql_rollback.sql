@@ -0,0 +1,20 @@
+-- ============================================================================
+-- Rollback: Remove chunk offset columns from DOCUMENT_CHUNKS (PostgreSQL)
+-- Created: 2026-10-17
+-- Purpose: 002_add_document_chunk_offsets_postgresql.sql 롤백
+-- ============================================================================
+
+-- ⚠️ 경고: 청크 순번/위치 정보가 삭제됩니다. 페이지가 여러 청크로 나뉜 문서는
+-- 같은 페이지의 청크를 구분할 수 없게 됩니다.
+
+-- 1. 인덱스 삭제
+DROP INDEX IF EXISTS idx_document_chunks_doc_page_chunk;
+
+-- 2. 컬럼 삭제
+ALTER TABLE "DOCUMENT_CHUNKS" DROP COLUMN IF EXISTS token_count;
+ALTER TABLE "DOCUMENT_CHUNKS" DROP COLUMN IF EXISTS char_end;
+ALTER TABLE "DOCUMENT_CHUNKS" DROP COLUMN IF EXISTS char_start;
+ALTER TABLE "DOCUMENT_CHUNKS" DROP COLUMN IF EXISTS chunk_index;
+
+-- 3. 확인
+SELECT '✅ DOCUMENT_CHUNKS 청크 위치 컬럼이 삭제되었습니다.' AS Status;
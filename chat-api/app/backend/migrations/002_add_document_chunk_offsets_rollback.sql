@@ -0,0 +1,20 @@
+-- ============================================================================
+-- Rollback: Remove chunk offset columns from DOCUMENT_CHUNKS
+-- Created: 2026-10-17
+-- Purpose: 002_add_document_chunk_offsets.sql 롤백
+-- ============================================================================
+
+-- ⚠️ 경고: 청크 순번/위치 정보가 삭제됩니다.
+
+-- 1. 인덱스 삭제
+DROP INDEX idx_document_chunks_doc_page_chunk ON DOCUMENT_CHUNKS;
+
+-- 2. 컬럼 삭제
+ALTER TABLE DOCUMENT_CHUNKS
+    DROP COLUMN token_count,
+    DROP COLUMN char_end,
+    DROP COLUMN char_start,
+    DROP COLUMN chunk_index;
+
+-- 3. 확인
+SELECT '✅ DOCUMENT_CHUNKS 청크 위치 컬럼이 삭제되었습니다.' AS Status;
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ANN 인덱스 벤치마크 (오프라인, 합성 벡터)
+- 코퍼스 크기별로 인덱스 유형(FLAT/IVF_FLAT/HNSW/AUTOINDEX)을 만들고 recall@k, 단건 검색 p50/p99 지연을 측정
+- 정답(ground truth)은 같은 데이터의 FLAT(전수 검색) 결과
+- 임시 Milvus Lite 파일을 사용하므로 운영 컬렉션과 Azure OpenAI에 접근하지 않음
+- 인덱스/검색 파라미터는 파이프라인과 같은 vector_store.build_index_params / build_search_params 사용
+
+사용 예:
+    python benchmarks/ann_index_benchmark.py --sizes 1000,10000,50000 --dim 3072 --top-k 10
+    MILVUS_HNSW_EF=128 python benchmarks/ann_index_benchmark.py --index-types HNSW
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# flow 경로 추가
+flow_path = Path(__file__).resolve().parent.parent / "flow"
+sys.path.insert(0, str(flow_path))
+
+from config import config
+from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, connections, utility
+from vector_store import (
+    EMBEDDING_DIMENSION,
+    SUPPORTED_INDEX_TYPES,
+    build_index_params,
+    build_search_params,
+)
+
+
+def synthetic_vectors(count: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """클러스터 구조를 가진 정규화 벡터 (실제 임베딩처럼 주제별로 뭉친 분포)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build_collection(name: str, vectors: np.ndarray, index_type: str, batch_size: int) -> Dict[str, Any]:
+    """벤치마크 컬렉션 생성, 삽입, 인덱스 생성 및 로드"""
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+    schema = CollectionSchema([
+        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=vectors.shape[1]),
+    ])
+    collection = Collection(name, schema)
+
+    t0 = time.perf_counter()
+    for start in range(0, len(vectors), batch_size):
+        batch = vectors[start:start + batch_size]
+        collection.insert([list(range(start, start + len(batch))), batch.tolist()])
+    collection.flush()
+    insert_seconds = time.perf_counter() - t0
+
+    index_params = build_index_params(index_type)
+    t0 = time.perf_counter()
+    collection.create_index("embedding", index_params)
+    collection.load()
+    index_seconds = time.perf_counter() - t0
+
+    return {
+        "collection": collection,
+        "index_params": index_params,
+        "insert_seconds": insert_seconds,
+        "index_seconds": index_seconds,
+    }
+
+
+def run_queries(collection: Collection, queries: np.ndarray, index_type: str, top_k: int) -> Dict[str, Any]:
+    """단건 검색을 반복하여 결과 id와 지연(ms) 수집"""
+    search_params = build_search_params(index_type, top_k)
+    results: List[List[int]] = []
+    latencies: List[float] = []
+    for query in queries:
+        t0 = time.perf_counter()
+        hits = collection.search([query.tolist()], "embedding", search_params, limit=top_k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        results.append([hit.id for hit in hits[0]])
+    return {"ids": results, "latencies_ms": latencies, "search_params": search_params}
+
+
+def recall_at_k(results: List[List[int]], ground_truth: List[List[int]], top_k: int) -> float:
+    """정답 top_k 중 찾은 비율의 평균"""
+    found = sum(len(set(result[:top_k]) & set(truth[:top_k])) for result, truth in zip(results, ground_truth))
+    return found / (top_k * len(ground_truth)) if ground_truth else 0.0
+
+
+def benchmark_size(size: int, args) -> List[Dict[str, Any]]:
+    """코퍼스 크기 하나에 대해 모든 인덱스 유형 측정"""
+    vectors = synthetic_vectors(size, args.dim, args.clusters, args.seed)
+    queries = synthetic_vectors(args.queries, args.dim, args.clusters, args.seed + 1)
+
+    # FLAT을 먼저 실행해 정답으로 사용
+    index_types = ["FLAT"] + [index_type for index_type in args.index_types if index_type != "FLAT"]
+    ground_truth = None
+    rows = []
+    for index_type in index_types:
+        name = f"ann_bench_{index_type.lower()}_{size}"
+        built = build_collection(name, vectors, index_type, args.batch_size)
+        # 첫 검색의 로드/워밍업 비용은 지연 통계에서 제외
+        run_queries(built["collection"], queries[:min(5, len(queries))], index_type, args.top_k)
+        measured = run_queries(built["collection"], queries, index_type, args.top_k)
+        if ground_truth is None:
+            ground_truth = measured["ids"]
+
+        latencies = np.array(measured["latencies_ms"])
+        row = {
+            "corpus_size": size,
+            "dim": args.dim,
+            "index_type": index_type,
+            "index_params": built["index_params"]["params"],
+            "search_params": measured["search_params"]["params"],
+            f"recall@{args.top_k}": round(recall_at_k(measured["ids"], ground_truth, args.top_k), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "insert_seconds": round(built["insert_seconds"], 2),
+            "index_seconds": round(built["index_seconds"], 2),
+        }
+        rows.append(row)
+        print(
+            f"   {index_type:<10} recall@{args.top_k}={row[f'recall@{args.top_k}']:.4f} "
+            f"p50={row['p50_ms']:.2f}ms p99={row['p99_ms']:.2f}ms "
+            f"(index {row['index_seconds']:.1f}s) {row['index_params']} {row['search_params']}"
+        )
+        utility.drop_collection(name)
+    return rows
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='ANN 인덱스 recall/지연 벤치마크 (합성 벡터)')
+    parser.add_argument('--sizes', default='1000,10000,50000',
+                       help='코퍼스 크기 목록 (쉼표 구분)')
+    parser.add_argument('--index-types', default=','.join(SUPPORTED_INDEX_TYPES),
+                       help='측정할 인덱스 유형 (쉼표 구분, FLAT은 정답용으로 항상 실행)')
+    parser.add_argument('--dim', type=int, default=EMBEDDING_DIMENSION,
+                       help='벡터 차원')
+    parser.add_argument('--queries', type=int, default=200,
+                       help='쿼리 수')
+    parser.add_argument('--top-k', type=int, default=10,
+                       help='recall@k의 k (검색 limit)')
+    parser.add_argument('--clusters', type=int, default=64,
+                       help='합성 데이터 클러스터 수')
+    parser.add_argument('--batch-size', type=int, default=config.MILVUS_INSERT_BATCH_SIZE,
+                       help='삽입 배치 크기')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='난수 시드')
+    parser.add_argument('--json', dest='json_path', default=None,
+                       help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    args.index_types = [index_type.strip().upper() for index_type in args.index_types.split(',') if index_type.strip()]
+    unknown = [index_type for index_type in args.index_types if index_type not in SUPPORTED_INDEX_TYPES]
+    if unknown:
+        parser.error(f"지원하지 않는 인덱스 유형: {unknown}")
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    work_dir = Path(tempfile.mkdtemp(prefix="ann_bench_"))
+    print("🧪 ANN 인덱스 벤치마크")
+    print(f"   코퍼스 크기: {sizes}, 차원: {args.dim}, 쿼리: {args.queries}, top_k: {args.top_k}")
+    print(f"   인덱스: {args.index_types}")
+    print("=" * 50)
+
+    rows = []
+    try:
+        connections.connect("default", uri=str(work_dir / "ann_bench.db"))
+        for size in sizes:
+            print(f"📊 코퍼스 {size}개")
+            rows.extend(benchmark_size(size, args))
+    finally:
+        connections.disconnect("default")
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"💾 결과 저장: {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
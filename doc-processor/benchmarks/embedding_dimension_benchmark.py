@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+임베딩 차원/저장 형식 벤치마크 (오프라인)
+- 차원(기본 3072, 1024, 256) × 저장 형식(float32, float16)별 벡터 메모리 사용량과 recall@k 측정
+- 정답(ground truth)은 전체 차원 float32 벡터의 전수 코사인 검색 결과
+- 축소 벡터는 마이그레이션과 같은 vector_store.reproject_embedding(앞쪽 성분 + 정규화)으로 생성하고,
+  float16은 저장 시 반올림 오차를 그대로 반영
+- ANN 인덱스 영향과 분리하기 위해 numpy 전수 검색으로 비교 (인덱스별 recall은 ann_index_benchmark.py --dim)
+- --source collection: 기존 컬렉션의 실제 임베딩 사용 (권장, 3072차원 float32 컬렉션이어야 함)
+  --source synthetic: 앞쪽 성분일수록 분산이 큰 합성 벡터 (실제 임베딩보다 recall 감소를 과장할 수 있음)
+
+사용 예:
+    python benchmarks/embedding_dimension_benchmark.py --source collection --limit 50000 --queries 500
+    python benchmarks/embedding_dimension_benchmark.py --dims 3072,1536,1024,512,256 --project-rows 10000000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# flow 경로 추가
+flow_path = Path(__file__).resolve().parent.parent / "flow"
+sys.path.insert(0, str(flow_path))
+
+from config import config
+from embedding_engine import DEFAULT_EMBEDDING_DIMENSION
+from pymilvus import Collection
+from vector_store import VECTOR_DATA_TYPES, collection_vector_field, connect_milvus, decode_vector, reproject_embedding
+
+# 저장 형식별 성분당 바이트
+BYTES_PER_COMPONENT = {"float32": 4, "float16": 2}
+
+
+def synthetic_embeddings(count: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """클러스터 구조 + 앞쪽 성분일수록 분산이 큰 정규화 벡터 (text-embedding-3의 성분별 정보량 분포를 흉내)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    vectors *= (1.0 + np.arange(dim, dtype=np.float32) / 64.0) ** -0.5
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def collection_embeddings(collection_name: str, limit: int, batch_size: int) -> np.ndarray:
+    """기존 컬렉션에서 임베딩 최대 limit개 읽기"""
+    connect_milvus()
+    collection = Collection(collection_name)
+    dimension, vector_type = collection_vector_field(collection)
+    if dimension != DEFAULT_EMBEDDING_DIMENSION or vector_type != "float32":
+        raise ValueError(f"전체 차원 float32 컬렉션이 필요합니다 (현재 {dimension}차원 {vector_type}).")
+    collection.load()
+    vectors: List[np.ndarray] = []
+    iterator = collection.query_iterator(batch_size=batch_size, limit=limit, output_fields=["embedding"])
+    try:
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+            vectors.extend(decode_vector(row["embedding"]) for row in rows)
+    finally:
+        iterator.close()
+    return np.vstack(vectors).astype(np.float32)
+
+
+def project(vectors: np.ndarray, dimension: int, vector_type: str) -> np.ndarray:
+    """차원 축소 후 저장 형식으로 반올림한 벡터 (검색 점수 계산용 float32)"""
+    projected = np.vstack([reproject_embedding(vector, dimension) for vector in vectors])
+    return projected.astype(np.float16).astype(np.float32) if vector_type == "float16" else projected
+
+
+def top_k_ids(corpus: np.ndarray, queries: np.ndarray, top_k: int) -> np.ndarray:
+    """전수 코사인 검색 (정규화 벡터의 내적) 상위 top_k 인덱스"""
+    scores = queries @ corpus.T
+    candidates = np.argpartition(-scores, top_k, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def recall_at_k(results: np.ndarray, ground_truth: np.ndarray) -> float:
+    """정답 top_k 중 찾은 비율의 평균"""
+    found = sum(len(set(result) & set(truth)) for result, truth in zip(results.tolist(), ground_truth.tolist()))
+    return found / ground_truth.size if ground_truth.size else 0.0
+
+
+def benchmark(corpus: np.ndarray, queries: np.ndarray, args) -> List[Dict[str, Any]]:
+    """차원 × 저장 형식 조합별 메모리/recall 측정"""
+    ground_truth = top_k_ids(corpus, queries, args.top_k)
+    full_bytes = corpus.shape[1] * BYTES_PER_COMPONENT["float32"]
+
+    rows = []
+    for dimension in args.dims:
+        for vector_type in args.vector_types:
+            t0 = time.perf_counter()
+            results = top_k_ids(project(corpus, dimension, vector_type), project(queries, dimension, vector_type),
+                                args.top_k)
+            bytes_per_vector = dimension * BYTES_PER_COMPONENT[vector_type]
+            row = {
+                "dim": dimension,
+                "vector_type": vector_type,
+                "bytes_per_vector": bytes_per_vector,
+                "size_ratio": round(bytes_per_vector / full_bytes, 4),
+                "corpus_vectors_mb": round(bytes_per_vector * len(corpus) / 1024 / 1024, 2),
+                "projected_vectors_gb": round(bytes_per_vector * args.project_rows / 1024 ** 3, 2),
+                f"recall@{args.top_k}": round(recall_at_k(results, ground_truth), 4),
+                "seconds": round(time.perf_counter() - t0, 2),
+            }
+            rows.append(row)
+            print(
+                f"   {dimension:>5}차원 {vector_type:<8} {bytes_per_vector / 1024:>6.1f}KB/벡터 "
+                f"({row['size_ratio']:.1%}) 코퍼스 {row['corpus_vectors_mb']:.1f}MB, "
+                f"{args.project_rows:,}행 환산 {row['projected_vectors_gb']:.2f}GB  "
+                f"recall@{args.top_k}={row[f'recall@{args.top_k}']:.4f}"
+            )
+    return rows
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='임베딩 차원/저장 형식별 메모리와 recall 벤치마크')
+    parser.add_argument('--source', choices=['synthetic', 'collection'], default='synthetic',
+                       help='벡터 출처 (collection: MILVUS_URI의 기존 컬렉션)')
+    parser.add_argument('--collection', default=config.MILVUS_COLLECTION_NAME,
+                       help='--source collection에서 읽을 컬렉션')
+    parser.add_argument('--limit', type=int, default=20000,
+                       help='사용할 벡터 수 (질의 포함)')
+    parser.add_argument('--dims', default='3072,1024,256',
+                       help='비교할 차원 목록 (쉼표 구분)')
+    parser.add_argument('--vector-types', default=','.join(VECTOR_DATA_TYPES),
+                       help='비교할 저장 형식 (쉼표 구분: float32, float16)')
+    parser.add_argument('--queries', type=int, default=200,
+                       help='질의 수 (코퍼스에서 제외한 벡터)')
+    parser.add_argument('--top-k', type=int, default=10,
+                       help='recall@k의 k')
+    parser.add_argument('--project-rows', type=int, default=1_000_000,
+                       help='메모리 환산에 사용할 행 수')
+    parser.add_argument('--clusters', type=int, default=64,
+                       help='합성 데이터 클러스터 수')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                       help='컬렉션 조회 배치 크기')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='난수 시드')
+    parser.add_argument('--json', dest='json_path', default=None,
+                       help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    args.dims = [int(dim) for dim in args.dims.split(',') if dim.strip()]
+    args.vector_types = [vector_type.strip().lower() for vector_type in args.vector_types.split(',')
+                         if vector_type.strip()]
+    unknown = [vector_type for vector_type in args.vector_types if vector_type not in VECTOR_DATA_TYPES]
+    if unknown:
+        parser.error(f"지원하지 않는 저장 형식: {unknown}")
+    if any(not 0 < dim <= DEFAULT_EMBEDDING_DIMENSION for dim in args.dims):
+        parser.error(f"차원은 1~{DEFAULT_EMBEDDING_DIMENSION} 범위여야 합니다: {args.dims}")
+
+    print("📐 임베딩 차원/저장 형식 벤치마크")
+    print(f"   출처: {args.source}, 벡터: {args.limit}개 (질의 {args.queries}개), top_k: {args.top_k}")
+    print(f"   차원: {args.dims}, 저장 형식: {args.vector_types}")
+    print("=" * 50)
+
+    if args.source == 'collection':
+        vectors = collection_embeddings(args.collection, args.limit, args.batch_size)
+    else:
+        vectors = synthetic_embeddings(args.limit, DEFAULT_EMBEDDING_DIMENSION, args.clusters, args.seed)
+    if len(vectors) <= args.queries:
+        print(f"❌ 벡터가 부족합니다: {len(vectors)}개 (질의 {args.queries}개보다 많아야 함)")
+        return 1
+
+    rng = np.random.default_rng(args.seed)
+    query_mask = np.zeros(len(vectors), dtype=bool)
+    query_mask[rng.choice(len(vectors), size=args.queries, replace=False)] = True
+    rows = benchmark(vectors[~query_mask], vectors[query_mask], args)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"💾 결과 저장: {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
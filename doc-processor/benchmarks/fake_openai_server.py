@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+벤치마크용 가짜 Azure OpenAI 서버 (HTTP, 표준 라이브러리 + numpy)
+- 파이프라인의 openai.AzureOpenAI / AsyncAzureOpenAI 클라이언트가 그대로 접속하도록 Azure 경로 형식을 따름
+- 임베딩: 텍스트 해시로 만든 결정적 정규화 벡터 (같은 텍스트 → 같은 벡터), 토큰 수는 글자 수 / 4로 근사
+- Vision: 고정 형식의 설명 텍스트, 토큰 수는 이미지 바이트 크기로 근사
+- 응답 지연(기본 + 지터)과 429 응답 비율을 설정할 수 있어 재시도/rate limit 경로까지 측정 가능
+
+엔드포인트:
+    POST /openai/deployments/{배포}/embeddings          임베딩
+    POST /openai/deployments/{배포}/chat/completions    GPT Vision 설명
+    GET  /stats                                        요청/429/토큰 누적 통계
+
+사용 예:
+    python benchmarks/fake_openai_server.py --port 8799 --vision-latency-ms 800 --rate-429 0.05
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8799 AZURE_OPENAI_KEY=fake python flow/document_processing_pipeline.py
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+# 임베딩 요청에 dimensions가 없을 때의 벡터 차원 (text-embedding-3-large 기본값)
+DEFAULT_DIMENSION = 3072
+
+
+def fake_embedding(text: str, dimension: int) -> np.ndarray:
+    """텍스트 해시를 시드로 한 결정적 정규화 벡터"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """지연/429 설정과 누적 통계를 가진 가짜 Azure OpenAI 서버"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        embedding_latency_ms: float = 50.0,
+        vision_latency_ms: float = 500.0,
+        jitter: float = 0.2,
+        rate_429: float = 0.0,
+        retry_after_seconds: float = 0.5,
+        seed: int = 42,
+    ):
+        super().__init__(address, FakeOpenAIRequestHandler)
+        self.embedding_latency_ms = embedding_latency_ms
+        self.vision_latency_ms = vision_latency_ms
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after_seconds = retry_after_seconds
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {
+            "embedding_requests": 0,
+            "embedding_inputs": 0,
+            "embedding_tokens": 0,
+            "vision_requests": 0,
+            "vision_tokens": 0,
+            "rate_limited": 0,
+        }
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def should_reject(self) -> bool:
+        """429 주입 여부 (설정 비율에 따라)"""
+        with self._lock:
+            return self.rate_429 > 0 and self._rng.random() < self.rate_429
+
+    def delay(self, latency_ms: float):
+        """기본 지연 ± 지터만큼 대기 (요청마다 스레드가 따로 있으므로 동시 요청은 겹쳐서 대기)"""
+        with self._lock:
+            factor = 1.0 + self._rng.uniform(-self.jitter, self.jitter)
+        if latency_ms > 0:
+            time.sleep(latency_ms * factor / 1000.0)
+
+    def start(self) -> "FakeOpenAIServer":
+        """백그라운드 스레드에서 서비스 시작"""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+class FakeOpenAIRequestHandler(BaseHTTPRequestHandler):
+    """Azure OpenAI 요청 처리기"""
+
+    server: FakeOpenAIServer
+    server_version = "FakeAzureOpenAI/1.0"
+    protocol_version = "HTTP/1.1"  # 클라이언트 연결 재사용 (실제 서비스와 같은 keep-alive)
+
+    def _send_json(self, status: HTTPStatus, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _rate_limited(self):
+        self.server.count("rate_limited")
+        retry_after = self.server.retry_after_seconds
+        self._send_json(
+            HTTPStatus.TOO_MANY_REQUESTS,
+            {"error": {"code": "429", "message": "Rate limit is exceeded (benchmark injection)."}},
+            {"retry-after": str(max(1, round(retry_after))), "retry-after-ms": str(int(retry_after * 1000))},
+        )
+
+    def _embeddings(self, deployment: str, params: Dict[str, Any]):
+        inputs = params.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs or [])
+        dimension = int(params.get("dimensions") or DEFAULT_DIMENSION)
+        self.server.delay(self.server.embedding_latency_ms)
+
+        tokens = sum(max(1, len(text) // 4) for text in inputs)
+        data = []
+        for index, text in enumerate(inputs):
+            vector = fake_embedding(str(text), dimension)
+            if params.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        self.server.count("embedding_requests")
+        self.server.count("embedding_inputs", len(inputs))
+        self.server.count("embedding_tokens", tokens)
+        self._send_json(HTTPStatus.OK, {
+            "object": "list",
+            "data": data,
+            "model": deployment,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    def _chat_completions(self, deployment: str, params: Dict[str, Any], body_size: int):
+        self.server.delay(self.server.vision_latency_ms)
+
+        # base64 이미지 크기로 입력 토큰 근사 (실제 과금은 타일 수 기준이지만 벤치마크에는 충분)
+        prompt_tokens = 85 + body_size // 3000
+        content = (
+            f"[벤치마크 설명] 요청 본문 {body_size // 1024}KB의 페이지 이미지입니다. "
+            "도면, 표, 텍스트 블록이 포함되어 있으며 주요 항목은 설비 사양과 점검 절차입니다."
+        )
+        completion_tokens = min(int(params.get("max_tokens") or 1000), len(content) // 2)
+        self.server.count("vision_requests")
+        self.server.count("vision_tokens", prompt_tokens + completion_tokens)
+        self._send_json(HTTPStatus.OK, {
+            "id": f"chatcmpl-bench-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": deployment,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/stats":
+            self._send_json(HTTPStatus.OK, self.server.snapshot())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": {"code": "404", "message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        parts = urlparse(self.path).path.strip("/").split("/")
+        # openai/deployments/{배포}/embeddings | openai/deployments/{배포}/chat/completions
+        if len(parts) < 4 or parts[:2] != ["openai", "deployments"]:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": {"code": "404", "message": "Not found"}})
+            return
+        deployment, route = parts[2], "/".join(parts[3:])
+        if route not in ("embeddings", "chat/completions"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": {"code": "404", "message": f"Unknown route: {route}"}})
+            return
+        try:
+            params = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": {"code": "400", "message": "Invalid JSON"}})
+            return
+
+        if self.server.should_reject():
+            self._rate_limited()
+        elif route == "embeddings":
+            self._embeddings(deployment, params)
+        else:
+            self._chat_completions(deployment, params, length)
+
+    def log_message(self, format, *args):
+        # 요청마다 로그를 남기면 벤치마크 출력이 묻히므로 생략
+        pass
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='벤치마크용 가짜 Azure OpenAI 서버')
+    parser.add_argument('--host', default='127.0.0.1',
+                       help='바인드 주소')
+    parser.add_argument('--port', '-p', type=int, default=8799,
+                       help='포트')
+    parser.add_argument('--embedding-latency-ms', type=float, default=50.0,
+                       help='임베딩 요청 기본 지연(ms)')
+    parser.add_argument('--vision-latency-ms', type=float, default=500.0,
+                       help='Vision 요청 기본 지연(ms)')
+    parser.add_argument('--jitter', type=float, default=0.2,
+                       help='지연 지터 비율 (0.2: ±20%%)')
+    parser.add_argument('--rate-429', type=float, default=0.0,
+                       help='429 응답 비율 (0~1)')
+    parser.add_argument('--retry-after', type=float, default=0.5,
+                       help='429 응답의 Retry-After(초)')
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        (args.host, args.port),
+        embedding_latency_ms=args.embedding_latency_ms,
+        vision_latency_ms=args.vision_latency_ms,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after_seconds=args.retry_after,
+    )
+    print("🤖 가짜 Azure OpenAI 서버")
+    print(f"   주소: {server.endpoint}")
+    print(f"   지연: 임베딩 {args.embedding_latency_ms}ms, Vision {args.vision_latency_ms}ms (±{args.jitter:.0%})")
+    print(f"   429 비율: {args.rate_429:.1%}")
+    print("=" * 50)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n🛑 종료 - {server.snapshot()}")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+문서 처리 파이프라인 벤치마크 (오프라인, 로컬 대체 서비스)
+- 합성 PDF(text/image/mixed, 10~1,000페이지)를 만들어 document_processing_pipeline과
+  batch_document_processing_pipeline을 실제 코드 경로 그대로 실행
+- Azure OpenAI 대신 가짜 서버(fake_openai_server, 지연/429 주입 가능), Milvus 대신 임시 Milvus Lite 파일,
+  PostgreSQL 대신 SQLite 파일(--database sqlite, 기본) 또는 로컬 PostgreSQL(--database postgres, DATABASE_URL)
+- 시나리오마다 새 프로세스에서 빈 캐시/체크포인트/Milvus로 실행하므로 최대 RSS가 시나리오별로 분리됨
+- 처리량(pages/s), 최대 RSS(본 프로세스 / 추출 워커 등 자식 프로세스), 단계별 시간, API 호출/429 수를 보고
+
+사용 예:
+    python benchmarks/pipeline_benchmark.py --kinds text,image,mixed --pages 10,100
+    python benchmarks/pipeline_benchmark.py --kinds mixed --pages 1000 --modes streaming --flows single --report
+    python benchmarks/pipeline_benchmark.py --flows batch --vision-latency-ms 1500 --rate-429 0.05 --json bench.json
+    DATABASE_URL=postgresql://postgres@localhost/bench_db python benchmarks/pipeline_benchmark.py --database postgres
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List
+
+from fake_openai_server import FakeOpenAIServer
+from synthetic_documents import DOCUMENT_KINDS, generate_corpus
+
+# flow 경로 추가 (flow 모듈은 시나리오 프로세스에서 환경 변수 설정 후 import)
+flow_path = Path(__file__).resolve().parent.parent / "flow"
+sys.path.insert(0, str(flow_path))
+
+# 공통 모듈(shared_core)을 찾기 위해 저장소 루트를 sys.path에 추가
+repo_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(repo_root))
+
+PIPELINE_MODES = ("staged", "streaming")
+FLOWS = ("single", "batch")
+
+# 가짜 서버용 배포 이름 (운영 배포 이름과 섞이지 않도록 고정)
+_VISION_DEPLOYMENT = "bench-vision"
+_EMBEDDING_DEPLOYMENT = "bench-embedding"
+
+
+def _peak_rss_mb(who: int) -> float:
+    """getrusage 최대 RSS (Linux는 KB, macOS는 바이트 단위)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def scenario_env(run_dir: Path, endpoint: str, mode: str, database: str) -> Dict[str, str]:
+    """시나리오 프로세스 환경 변수 (모든 로컬 상태를 run_dir 아래로)"""
+    env = {
+        "AZURE_OPENAI_ENDPOINT": endpoint,
+        "AZURE_OPENAI_KEY": "benchmark",
+        "AZURE_OPENAI_DEPLOYMENT_NAME": _VISION_DEPLOYMENT,
+        "AZURE_OPENAI_EMBEDDING_DEPLOYMENT": _EMBEDDING_DEPLOYMENT,
+        "OUTPUT_DIR": str(run_dir / "images"),
+        "DESCRIPTION_CACHE_PATH": str(run_dir / "cache" / "description_cache.db"),
+        "EMBEDDING_CACHE_PATH": str(run_dir / "cache" / "embedding_cache.db"),
+        "LEXICAL_INDEX_PATH": str(run_dir / "cache" / "lexical_index.db"),
+        "INGEST_MANIFEST_PATH": str(run_dir / "cache" / "ingest_manifest.db"),
+        "PAGE_CHECKPOINT_PATH": str(run_dir / "cache" / "page_checkpoints.db"),
+        "PIPELINE_METRICS_TEXTFILE": str(run_dir / "pipeline_metrics.prom"),
+        "PIPELINE_MODE": mode,
+    }
+    if database == "sqlite":
+        env["DATABASE_URL"] = f"sqlite:///{run_dir / 'bench.db'}"
+    return env
+
+
+def run_scenario_process(scenario: Dict[str, Any], env: Dict[str, str], verbose: bool, queue):
+    """시나리오 1개 실행 (새 프로세스, 결과는 queue로 반환)"""
+    os.environ.update(env)
+    # 업로드 사본(uploads/) 등 상대 경로 산출물도 시나리오 디렉터리에 남도록
+    os.chdir(scenario["run_dir"])
+    if not verbose:
+        os.environ.setdefault("PREFECT_LOGGING_LEVEL", "WARNING")
+    # 오프라인 실행 (임시 Prefect 서버의 외부 텔레메트리 전송 끔)
+    os.environ.setdefault("PREFECT_SERVER_ANALYTICS_ENABLED", "false")
+
+    result: Dict[str, Any] = {"status": "failed"}
+    try:
+        # 환경 변수 설정 후 import해야 config가 벤치마크 경로/가짜 서버를 사용
+        from batch_document_processing_pipeline import batch_document_processing_pipeline
+        from database import db_manager
+        from document_processing_pipeline import document_processing_pipeline
+        from prefect import flow
+        from shared_core import get_database_manager
+
+        from config import config
+
+        if not verbose:
+            logging.getLogger().setLevel(logging.WARNING)
+            warnings.simplefilter("ignore")
+        # pymilvus가 MILVUS_URI 환경 변수를 자체 기본 연결(http URI)로 해석하므로 환경 변수 대신 설정값으로 지정
+        config.MILVUS_URI = scenario["milvus_uri"]
+
+        if db_manager.initialize():
+            get_database_manager().create_tables()
+
+        # Prefect 임시 API 서버 기동 비용은 측정에서 제외
+        @flow(name="benchmark_warm_up")
+        def warm_up():
+            return None
+
+        warm_up()
+
+        # Prefect 매개변수 검증은 `max_pages: int = None` 같은 기본값 None을 거부하므로 끔
+        started = time.perf_counter()
+        if scenario["flow"] == "single":
+            flow_result = document_processing_pipeline.with_options(validate_parameters=False)(
+                scenario["document_path"], max_pages=scenario.get("max_pages"), pipeline_mode=scenario["mode"]
+            )
+            status = flow_result.get("status")
+        else:
+            flow_result = batch_document_processing_pipeline.with_options(validate_parameters=False)(
+                scenario["folder_path"], max_pages=scenario.get("max_pages"), max_file_size_mb=100_000,
+                skip_existing=False, pipeline_mode=scenario["mode"]
+            )
+            status = "success" if flow_result.get("status") == "completed" and not flow_result.get("failed_files") \
+                else "failed"
+        wall_seconds = time.perf_counter() - started
+
+        metrics = flow_result.get("metrics") or {}
+        pages = metrics.get("counters", {}).get("pages", 0)
+        result = {
+            "status": status,
+            "error": flow_result.get("error"),
+            "wall_seconds": round(wall_seconds, 3),
+            "pages": pages,
+            "pages_per_second": round(pages / wall_seconds, 3) if wall_seconds > 0 else None,
+            "metrics": metrics,
+        }
+    except Exception as e:
+        result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+    finally:
+        result["peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_SELF)
+        result["peak_rss_children_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+        queue.put(result)
+
+
+def run_scenario(scenario: Dict[str, Any], env: Dict[str, str], verbose: bool, timeout: float) -> Dict[str, Any]:
+    """시나리오를 spawn 프로세스에서 실행 (부모의 import/메모리 상태를 물려받지 않음)"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=run_scenario_process, args=(scenario, env, verbose, queue))
+    process.start()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = queue.get(timeout=1.0)
+            break
+        except queue_module.Empty:
+            if not process.is_alive():
+                result = {"status": "failed", "error": f"시나리오 프로세스 비정상 종료 (exit {process.exitcode})"}
+                break
+            if time.monotonic() > deadline:
+                result = {"status": "failed", "error": f"{timeout:.0f}초 안에 끝나지 않음"}
+                process.terminate()
+                break
+    process.join()
+    return result
+
+
+def build_scenarios(args, documents: List[Path], corpus_dir: Path) -> List[Dict[str, Any]]:
+    """흐름 × 모드 × 문서 조합 (batch는 코퍼스 폴더 전체를 한 번에)"""
+    scenarios = []
+    for mode in args.modes:
+        if "single" in args.flows:
+            for document_path in documents:
+                scenarios.append({
+                    "name": f"single_{mode}_{document_path.stem}",
+                    "flow": "single",
+                    "mode": mode,
+                    "document_path": str(document_path),
+                    "max_pages": args.max_pages,
+                })
+        if "batch" in args.flows:
+            scenarios.append({
+                "name": f"batch_{mode}_{len(documents)}docs",
+                "flow": "batch",
+                "mode": mode,
+                "folder_path": str(corpus_dir),
+                "max_pages": args.max_pages,
+            })
+    return scenarios
+
+
+def format_row(row: Dict[str, Any]) -> str:
+    """시나리오 결과 한 줄 요약"""
+    if row["status"] != "success":
+        return f"   ❌ {row['name']:<32} {row.get('error') or '실패'}"
+    stage_seconds = row["metrics"].get("stage_seconds", {})
+    stages = " ".join(f"{stage}={seconds:.1f}s" for stage, seconds in stage_seconds.items())
+    return (
+        f"   ✅ {row['name']:<32} {row['pages']:>5.0f}p {row['wall_seconds']:>7.1f}s "
+        f"{row['pages_per_second']:>6.2f} pages/s  RSS {row['peak_rss_mb']:.0f}MB"
+        f"(+자식 {row['peak_rss_children_mb']:.0f}MB)  429 {row['api']['rate_limited']}회  {stages}"
+    )
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='문서 처리 파이프라인 벤치마크 (합성 PDF, 로컬 대체 서비스)')
+    parser.add_argument('--kinds', default=','.join(DOCUMENT_KINDS),
+                       help='합성 문서 유형 (쉼표 구분: text, image, mixed)')
+    parser.add_argument('--pages', default='10,100',
+                       help='문서당 페이지 수 목록 (쉼표 구분, 예: 10,100,1000)')
+    parser.add_argument('--modes', default=','.join(PIPELINE_MODES),
+                       help='파이프라인 모드 (쉼표 구분: staged, streaming)')
+    parser.add_argument('--flows', default=','.join(FLOWS),
+                       help='실행할 흐름 (single: 문서별 document_processing_pipeline, batch: 코퍼스 전체 배치)')
+    parser.add_argument('--max-pages', type=int, default=None,
+                       help='문서당 처리할 최대 페이지 수')
+    parser.add_argument('--database', choices=['sqlite', 'postgres'], default='sqlite',
+                       help='메타데이터 DB (postgres는 DATABASE_URL 또는 DATABASE_* 설정 사용, 빈 DB 권장)')
+    parser.add_argument('--embedding-latency-ms', type=float, default=50.0,
+                       help='가짜 임베딩 응답 지연(ms)')
+    parser.add_argument('--vision-latency-ms', type=float, default=500.0,
+                       help='가짜 Vision 응답 지연(ms)')
+    parser.add_argument('--jitter', type=float, default=0.2,
+                       help='응답 지연 지터 비율')
+    parser.add_argument('--rate-429', type=float, default=0.0,
+                       help='가짜 서버 429 응답 비율 (0~1)')
+    parser.add_argument('--retry-after', type=float, default=0.5,
+                       help='429 응답의 Retry-After(초)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='합성 문서/429 주입 난수 시드')
+    parser.add_argument('--timeout', type=float, default=3600.0,
+                       help='시나리오당 제한 시간(초)')
+    parser.add_argument('--work-dir', default=None,
+                       help='작업 디렉터리 (지정 시 종료 후 유지, 코퍼스 재사용)')
+    parser.add_argument('--report', action='store_true',
+                       help='시나리오별 상세 처리량 리포트 출력')
+    parser.add_argument('--verbose', action='store_true',
+                       help='파이프라인/Prefect 로그 출력')
+    parser.add_argument('--json', dest='json_path', default=None,
+                       help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    args.kinds = [kind.strip() for kind in args.kinds.split(',') if kind.strip()]
+    args.modes = [mode.strip().lower() for mode in args.modes.split(',') if mode.strip()]
+    args.flows = [flow.strip().lower() for flow in args.flows.split(',') if flow.strip()]
+    for name, values, allowed in (("문서 유형", args.kinds, DOCUMENT_KINDS),
+                                  ("모드", args.modes, PIPELINE_MODES),
+                                  ("흐름", args.flows, FLOWS)):
+        unknown = [value for value in values if value not in allowed]
+        if unknown:
+            parser.error(f"지원하지 않는 {name}: {unknown}")
+    page_counts = [int(pages) for pages in args.pages.split(',') if pages.strip()]
+
+    work_dir = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix="pipeline_bench_"))
+    corpus_dir = work_dir / "corpus"
+
+    print("🧪 문서 처리 파이프라인 벤치마크")
+    print(f"   문서: {args.kinds} × {page_counts}페이지, 모드: {args.modes}, 흐름: {args.flows}")
+    print(f"   가짜 API 지연: 임베딩 {args.embedding_latency_ms}ms, Vision {args.vision_latency_ms}ms, "
+          f"429 비율 {args.rate_429:.1%}")
+    print(f"   DB: {args.database}, 작업 디렉터리: {work_dir}")
+    print("=" * 50)
+
+    server = FakeOpenAIServer(
+        embedding_latency_ms=args.embedding_latency_ms,
+        vision_latency_ms=args.vision_latency_ms,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after_seconds=args.retry_after,
+        seed=args.seed,
+    ).start()
+
+    rows = []
+    try:
+        print("📄 합성 문서 생성")
+        t0 = time.perf_counter()
+        documents = generate_corpus(corpus_dir, args.kinds, page_counts, args.seed)
+        print(f"   {len(documents)}개 ({sum(path.stat().st_size for path in documents) / 1024 / 1024:.1f}MB, "
+              f"{time.perf_counter() - t0:.1f}초)")
+
+        for scenario in build_scenarios(args, documents, corpus_dir):
+            run_dir = work_dir / "runs" / scenario["name"]
+            shutil.rmtree(run_dir, ignore_errors=True)
+            run_dir.mkdir(parents=True)
+            scenario["run_dir"] = str(run_dir)
+            scenario["milvus_uri"] = str(run_dir / "milvus_lite.db")
+
+            server.reset_stats()
+            result = run_scenario(
+                scenario, scenario_env(run_dir, server.endpoint, scenario["mode"], args.database),
+                args.verbose, args.timeout,
+            )
+            row = {**scenario, **result, "api": server.snapshot()}
+            rows.append(row)
+            print(format_row(row))
+            if args.report and row["status"] == "success":
+                from pipeline_metrics import format_report
+                print("\n".join(f"      {line}" for line in format_report(row["metrics"]).splitlines()))
+    finally:
+        server.stop()
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"💾 결과 저장: {args.json_path}")
+    return 0 if all(row["status"] == "success" for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
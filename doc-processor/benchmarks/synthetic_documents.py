@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+벤치마크용 합성 PDF 생성 (PyMuPDF)
+- text: 본문 텍스트만 있는 페이지 (추출/청킹/임베딩 부하)
+- image: 페이지 대부분을 사진형 이미지가 차지하는 페이지 (렌더링/이미지 인코딩/Vision 부하)
+- mixed: 텍스트 페이지와 이미지 페이지를 번갈아 배치
+- 같은 시드면 같은 파일을 만들고, 페이지마다 내용이 달라 이미지 저장소의 중복 제거에 걸리지 않음
+
+사용 예:
+    python benchmarks/synthetic_documents.py --kind mixed --pages 200 --output ./bench_docs/mixed_200.pdf
+"""
+
+import argparse
+import io
+import random
+import sys
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+
+DOCUMENT_KINDS = ("text", "image", "mixed")
+
+# A4 (pt)
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MARGIN = 56
+
+_WORDS = (
+    "문서 처리 파이프라인 페이지 이미지 임베딩 검색 벡터 인덱스 설명 추출 청크 메타데이터 "
+    "설비 점검 절차 안전 기준 운전 조건 경보 설정 유지보수 교체 주기 부품 사양 도면 "
+    "pipeline document vision embedding milvus chunk throughput latency retry batch "
+    "pressure valve sensor controller ladder logic interlock sequence alarm setpoint"
+).split()
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)) + "."
+
+
+def _text_page(doc: fitz.Document, rng: random.Random, page_number: int):
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    body = "\n\n".join(_paragraph(rng, rng.randint(40, 90)) for _ in range(rng.randint(4, 7)))
+    page.insert_textbox(
+        fitz.Rect(MARGIN, MARGIN, PAGE_WIDTH - MARGIN, MARGIN + 40),
+        f"{page_number}. {_paragraph(rng, 5)}",
+        fontsize=16,
+        fontname="korea",
+    )
+    page.insert_textbox(
+        fitz.Rect(MARGIN, MARGIN + 50, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN),
+        body,
+        fontsize=10,
+        fontname="korea",
+    )
+
+
+def _photo(rng: random.Random, width: int, height: int) -> bytes:
+    """압축이 잘 되지 않는 사진형 이미지 (그라데이션 + 도형 + 노이즈)"""
+    base = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.effect_noise((width, height), rng.randint(30, 70)).convert("RGB")
+    image = Image.blend(base, noise, 0.5)
+    draw = ImageDraw.Draw(image)
+    for _ in range(rng.randint(8, 20)):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randint(20, width // 2), y0 + rng.randint(20, height // 2)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        draw.rectangle((x0, y0, x1, y1), outline=color, width=rng.randint(2, 8))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def _image_page(doc: fitz.Document, rng: random.Random, page_number: int):
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_textbox(
+        fitz.Rect(MARGIN, MARGIN, PAGE_WIDTH - MARGIN, MARGIN + 30),
+        f"그림 {page_number}. {_paragraph(rng, 6)}",
+        fontsize=11,
+        fontname="korea",
+    )
+    page.insert_image(
+        fitz.Rect(MARGIN, MARGIN + 40, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN),
+        stream=_photo(rng, 900, 1200),
+    )
+
+
+def generate_pdf(path: Path, kind: str, pages: int, seed: int = 42) -> Path:
+    """합성 PDF 1개 생성"""
+    if kind not in DOCUMENT_KINDS:
+        raise ValueError(f"지원하지 않는 문서 유형: {kind} (지원: {', '.join(DOCUMENT_KINDS)})")
+    rng = random.Random(f"{kind}:{pages}:{seed}")
+    doc = fitz.open()
+    try:
+        for page_number in range(1, pages + 1):
+            if kind == "text" or (kind == "mixed" and page_number % 2):
+                _text_page(doc, rng, page_number)
+            else:
+                _image_page(doc, rng, page_number)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        doc.save(str(path), garbage=3, deflate=True)
+    finally:
+        doc.close()
+    return path
+
+
+def generate_corpus(folder: Path, kinds, page_counts, seed: int = 42) -> list:
+    """유형 × 페이지 수 조합으로 합성 PDF 생성 → 파일 경로 목록"""
+    return [
+        generate_pdf(folder / f"{kind}_{pages}p.pdf", kind, pages, seed)
+        for kind in kinds
+        for pages in page_counts
+    ]
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='벤치마크용 합성 PDF 생성')
+    parser.add_argument('--kind', choices=DOCUMENT_KINDS, default='mixed',
+                       help='문서 유형')
+    parser.add_argument('--pages', type=int, default=10,
+                       help='페이지 수')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='난수 시드')
+    parser.add_argument('--output', required=True,
+                       help='저장할 PDF 경로')
+    args = parser.parse_args()
+
+    path = generate_pdf(Path(args.output), args.kind, args.pages, args.seed)
+    print(f"📄 생성: {path} ({args.kind}, {args.pages}페이지, {path.stat().st_size / 1024 / 1024:.1f}MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
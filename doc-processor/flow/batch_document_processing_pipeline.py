@@ -11,6 +11,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
+from batch_scheduler import (
+    estimate_document_work,
+    get_page_budget,
+    order_longest_first,
+    vision_concurrency_share,
+)
+
 # 설정 및 데이터베이스
 from config import config
 from database import Document, get_db_session
@@ -23,25 +30,35 @@ from document_processing_pipeline import (
     create_processing_job,
     create_vector_database,
     extract_text_from_document,
+    find_completed_document,
     generate_image_descriptions,
     initialize_database,
-    save_document_chunk,
+    page_vision_metadata,
+    process_document_streaming,
+    save_document_chunks,
+    select_vision_targets,
     update_document_processing_status,
+    update_job_progress,
+)
+from ingest_manifest import file_signature, get_ingest_manifest, md5_file
+from page_checkpoint import clear_checkpoint, resolve_checkpoint_key
+from pipeline_metrics import (
+    PipelineMetrics,
+    format_stage_summary,
+    publish_document_metrics,
+    record_staged_results,
 )
 from prefect import flow, get_run_logger, task
-from prefect.context import get_run_context
+from prefect.runtime import flow_run
 from prefect.task_runners import ConcurrentTaskRunner
 
-# Vector DB (Milvus)
-from pymilvus import Collection, connections
-
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @task(name="폴더_PDF_파일_검색")
-def find_pdf_files(folder_path: str) -> List[str]:
-    """폴더에서 모든 PDF 파일을 찾습니다"""
+def find_pdf_files(folder_path: str, skip_existing: bool = False) -> List[str]:
+    """폴더에서 모든 PDF 파일을 찾습니다 (skip_existing이면 매니페스트 기준 변경 없는 완료 파일 제외)"""
     logger = get_run_logger()
     
     folder = Path(folder_path)
@@ -64,6 +81,13 @@ def find_pdf_files(folder_path: str) -> List[str]:
     pdf_paths = sorted(list(set([str(f) for f in pdf_files])))
     
     logger.info(f"📂 폴더 '{folder_path}'에서 {len(pdf_paths)}개의 PDF 파일 발견")
+    
+    # 수집 매니페스트: stat 시그니처가 같고 처리 완료된 파일은 내용을 읽지 않고 제외
+    manifest = get_ingest_manifest() if skip_existing else None
+    if manifest:
+        pdf_paths, unchanged = manifest.partition_unchanged(pdf_paths)
+        logger.info(f"📒 매니페스트: 변경 없는 완료 파일 {len(unchanged)}개 건너뜀, 처리 대상 {len(pdf_paths)}개")
+    
     for i, pdf_path in enumerate(pdf_paths, 1):
         logger.info(f"   {i}. {Path(pdf_path).name}")
     
@@ -94,10 +118,56 @@ def filter_files_by_size(pdf_files: List[str], max_size_mb: float = 50.0) -> Lis
     logger.info(f"📊 필터링 결과: {len(filtered_files)}/{len(pdf_files)} 파일이 처리 대상")
     return filtered_files
 
+@task(name="배치_작업_계획")
+def plan_batch_schedule(pdf_files: List[str], max_pages: int = None) -> List[Dict[str, Any]]:
+    """문서별 작업량(페이지 수, 파일 크기)을 추정하고 큰 문서부터 처리하도록 정렬"""
+    logger = get_run_logger()
+    
+    schedule = order_longest_first([estimate_document_work(pdf_file, max_pages) for pdf_file in pdf_files])
+    
+    logger.info(f"🗓️ 처리 순서 (큰 문서 우선, 총 {sum(item['pages'] for item in schedule)}페이지):")
+    for i, item in enumerate(schedule, 1):
+        logger.info(f"   {i}. {Path(item['document_path']).name} - {item['pages']}페이지, "
+                    f"{item['file_size'] / (1024 * 1024):.1f}MB")
+    
+    return schedule
+
 @task(name="단일_문서_완전_처리")
-def process_single_document_complete(document_path: str, max_pages: int = None, skip_image_processing: bool = False, document_type: str = 'common') -> Dict[str, Any]:
-    """단일 문서의 전체 처리 과정을 실행하는 태스크"""
+def process_single_document_complete(document_path: str, max_pages: int = None, skip_image_processing: bool = False, document_type: str = 'common',
+                                     pipeline_mode: str = None, scheduled_pages: int = None, vision_concurrency: int = None,
+                                     skip_existing: bool = True) -> Dict[str, Any]:
+    """단일 문서의 전체 처리 과정을 실행하는 태스크 (scheduled_pages만큼 배치 페이지 예산을 확보한 뒤 실행)"""
+    manifest = get_ingest_manifest()
+    # 처리 시작 시점의 시그니처로 기록 (처리 중 파일이 바뀌면 다음 실행에서 다시 처리)
+    try:
+        signature = file_signature(document_path) if manifest else None
+    except OSError:
+        signature = None
+    
+    with get_page_budget().reserve(scheduled_pages or 0):
+        result = _process_single_document(document_path, max_pages, skip_image_processing, document_type,
+                                          pipeline_mode, vision_concurrency, skip_existing)
+    
+    if signature:
+        # PostgreSQL에 문서와 청크가 모두 저장된 경우만 완료로 기록 (그 외에는 다음 실행에서 다시 처리)
+        stored = result["status"] == "skipped" or (
+            result["status"] == "success" and result.get("doc_id") and not result.get("storage_failed")
+        )
+        manifest.record(
+            document_path,
+            signature,
+            status="completed" if stored else "failed",
+            file_hash=result.get("file_hash"),
+            doc_id=result.get("doc_id")
+        )
+    return result
+
+def _process_single_document(document_path: str, max_pages: int = None, skip_image_processing: bool = False, document_type: str = 'common',
+                             pipeline_mode: str = None, vision_concurrency: int = None, skip_existing: bool = True) -> Dict[str, Any]:
+    """단일 문서의 전체 처리 과정"""
     logger = get_run_logger()
+    pipeline_mode = (pipeline_mode or config.PIPELINE_MODE).lower()
+    metrics = PipelineMetrics()
     
     try:
         logger.info(f"🚀 문서 처리 시작: {Path(document_path).name}")
@@ -116,36 +186,116 @@ def process_single_document_complete(document_path: str, max_pages: int = None,
         if not db_initialized:
             logger.warning("⚠️ PostgreSQL 연결 실패, 메타데이터 저장 없이 진행")
         
+        # 이미 완료된 문서인지 파일 해시로 먼저 확인 (파일 전체 로드, 처리 작업 생성 전)
+        file_hash = None
+        if db_initialized and skip_existing:
+            manifest = get_ingest_manifest()
+            file_hash = manifest.resolve_hash(document_path) if manifest else md5_file(document_path)
+            try:
+                existing_doc = find_completed_document(file_hash)
+            except Exception as e:
+                logger.warning(f"⚠️ 완료 문서 조회 실패, 계속 진행: {str(e)}")
+                existing_doc = None
+            if existing_doc:
+                logger.info(f"⏭️ 이미 완료된 문서 건너뛰기: {Path(document_path).name}")
+                return {
+                    "document_path": document_path,
+                    "status": "skipped",
+                    "reason": "already_completed",
+                    "doc_id": existing_doc["document_id"],
+                    "file_hash": file_hash
+                }
+        
         # 문서 메타데이터 생성
         doc_metadata = None
         job_id = None
         if db_initialized:
             try:
-                doc_metadata = create_document_metadata(document_path, document_type)
-                flow_run_context = get_run_context()
-                flow_run_id = str(flow_run_context.flow_run.id) if flow_run_context and flow_run_context.flow_run else "batch_run"
-                job_id = create_processing_job(doc_metadata["doc_id"], flow_run_id)
+                # 위에서 확인한 해시를 넘겨 문서 등록 시 파일을 다시 해시하지 않음
+                doc_metadata = create_document_metadata(document_path, document_type, file_hash)
                 logger.info(f"📋 문서 ID: {doc_metadata['doc_id']}")
                 
-                # 이미 완료된 문서인지 확인
-                if not doc_metadata["is_new"]:
+                # 이미 완료된 문서인지 확인 (처리 작업 로그 생성 전)
+                if doc_metadata["is_duplicate"] and skip_existing:
                     logger.info(f"⏭️ 이미 완료된 문서 건너뛰기: {Path(document_path).name}")
                     return {
                         "document_path": document_path,
                         "status": "skipped",
                         "reason": "already_completed",
-                        "doc_id": doc_metadata["doc_id"]
+                        "doc_id": doc_metadata["doc_id"],
+                        "file_hash": doc_metadata["file_hash"]
                     }
+                
             except Exception as e:
                 logger.warning(f"⚠️ 문서 메타데이터 생성 실패: {str(e)}")
                 db_initialized = False
         
+        # 처리 작업 로그 (실패해도 이미 등록된 문서의 청크/상태 저장은 계속 진행)
+        if doc_metadata:
+            try:
+                # 태스크 안에서는 실행 컨텍스트가 TaskRunContext이므로 runtime API로 상위 flow run id 조회
+                job_id = create_processing_job(doc_metadata["doc_id"], flow_run.id or "batch_run")
+            except Exception as e:
+                logger.warning(f"⚠️ 처리 작업 로그 생성 실패, 작업 로그 없이 진행: {str(e)}")
+        
+        # 페이지 체크포인트 키 (이전 실행이 중간에 실패했으면 단계별로 끝난 페이지부터 이어서 처리)
+        checkpoint_key = resolve_checkpoint_key(document_path, doc_metadata)
+        
+        # 스트리밍 모드: 페이지 단위로 추출~적재를 동시에 진행
+        if pipeline_mode == "streaming":
+            doc_id = doc_metadata["doc_id"] if doc_metadata else None
+            stream_result = process_document_streaming(
+                document_path,
+                doc_id=doc_id,
+                job_id=job_id,
+                max_pages=max_pages,
+                skip_image_processing=skip_image_processing,
+                vision_concurrency=vision_concurrency,
+                checkpoint_key=checkpoint_key
+            )
+            if doc_id:
+                update_document_processing_status(
+                    doc_id,
+                    "completed",
+                    total_pages=stream_result['total_pages'],
+                    processed_pages=stream_result['processed_pages'],
+                    vector_count=stream_result['vector_documents']
+                )
+            if job_id:
+                complete_processing_job(job_id, stream_result['saved_chunks'], stream_result['vector_documents'],
+                                        extra_result={"pipeline_mode": "streaming",
+                                                      "first_page_searchable_seconds": stream_result['first_page_searchable_seconds'],
+                                                      "embedding_cache": stream_result['embedding_cache'],
+                                                      "vision_stats": stream_result['vision_stats'],
+                                                      "vision_skipped_pages": stream_result['vision_skipped_pages'],
+                                                      "metrics": stream_result['metrics']})
+            publish_document_metrics(stream_result['metrics'])
+            clear_checkpoint(checkpoint_key)
+            
+            logger.info(f"✅ 문서 처리 완료 (스트리밍): {Path(document_path).name}")
+            return {
+                "document_path": document_path,
+                "status": "success",
+                "doc_id": doc_id,
+                "file_hash": doc_metadata["file_hash"] if doc_metadata else None,
+                "total_pages": stream_result['total_pages'],
+                "captured_images": len(stream_result['image_paths']),
+                "generated_descriptions": stream_result['generated_descriptions'],
+                "vector_documents": stream_result['vector_documents'],
+                "saved_chunks": stream_result['saved_chunks'],
+                "embedding_cache": stream_result['embedding_cache'],
+                "vision_stats": stream_result['vision_stats'],
+                "metrics": stream_result['metrics'],
+                "processing_time": datetime.now().isoformat()
+            }
+        
         # 1단계: 텍스트 추출
         if job_id:
             update_job_progress(job_id, "텍스트 추출 시작", 0)
             
         logger.info("📄 1단계: 텍스트 추출")
-        text_result = extract_text_from_document(document_path, max_pages)
+        with metrics.stage("extract"):
+            text_result = extract_text_from_document(document_path, max_pages, checkpoint_key=checkpoint_key)
         
         if job_id:
             update_job_progress(job_id, f"텍스트 추출 완료 - {text_result['total_pages']}페이지", 1,
@@ -154,7 +304,7 @@ def process_single_document_complete(document_path: str, max_pages: int = None,
         if skip_image_processing:
             # 이미지 처리 건너뛰기
             logger.info("⏭️ 2-3단계: 이미지 처리 건너뛰기")
-            image_result = {"image_paths": []}
+            image_result = {"image_paths": [], "page_images": []}
             description_result = {"image_descriptions": {}, "total_images": 0}
             
             if job_id:
@@ -166,7 +316,8 @@ def process_single_document_complete(document_path: str, max_pages: int = None,
                 update_job_progress(job_id, "페이지별 이미지 캡처 시작", 1)
                 
             logger.info("🖼️ 2단계: 페이지별 이미지 캡처")
-            image_result = capture_page_images(document_path, max_pages=max_pages)
+            with metrics.stage("render"):
+                image_result = capture_page_images(document_path, max_pages=max_pages, checkpoint_key=checkpoint_key)
             
             if job_id:
                 update_job_progress(job_id, f"이미지 캡처 완료 - {len(image_result['image_paths'])}개", 2,
@@ -177,7 +328,14 @@ def process_single_document_complete(document_path: str, max_pages: int = None,
                 update_job_progress(job_id, "GPT 이미지 설명 생성 시작", 2)
                 
             logger.info("🤖 3단계: GPT 이미지 설명 생성")
-            description_result = generate_image_descriptions(image_result["image_paths"])
+            vision_paths, vision_page_numbers, vision_inputs = select_vision_targets(text_result, image_result["page_images"])
+            logger.info(f"🔎 Vision 사전 분류: {len(vision_paths)}개 페이지 설명 생성, "
+                        f"{len(image_result['image_paths']) - len(vision_paths)}개 페이지 생략 (텍스트 추출로 충분)")
+            with metrics.stage("vision"):
+                description_result = generate_image_descriptions(vision_paths, vision_page_numbers,
+                                                                 concurrency=vision_concurrency,
+                                                                 vision_paths=vision_inputs,
+                                                                 checkpoint_key=checkpoint_key)
             
             if job_id:
                 update_job_progress(job_id, f"GPT 설명 생성 완료 - {description_result['total_images']}개", 3,
@@ -193,6 +351,7 @@ def process_single_document_complete(document_path: str, max_pages: int = None,
             description_result, 
             document_path
         )
+        record_staged_results(metrics, text_result, image_result, description_result, vector_result)
         
         if job_id:
             update_job_progress(job_id, f"Vector DB 구성 완료 - {vector_result['total_documents']}개 벡터", 4,
@@ -201,37 +360,33 @@ def process_single_document_complete(document_path: str, max_pages: int = None,
         
         # 5단계: PostgreSQL에 청크 데이터 저장
         saved_chunks = 0
-        if db_initialized and doc_metadata and vector_result.get("total_documents", 0) > 0:
+        storage_failed = False
+        if db_initialized and doc_metadata:
             logger.info("💾 5단계: PostgreSQL에 청크 데이터 저장")
             try:
-                # Milvus에서 방금 삽입된 데이터를 읽어와서 PostgreSQL에 저장
-                connections.connect("default", uri=config.MILVUS_URI)
-                collection = Collection(config.MILVUS_COLLECTION_NAME)
-                collection.load()
-                
-                # 현재 문서의 모든 청크 데이터 조회
-                results = collection.query(
-                    expr=f'document_path == "{document_path}"',
-                    output_fields=["id", "document_path", "page_number", "content_type", 
-                                 "content", "text_content", "image_description", "image_path"]
-                )
-                
-                for doc_data in results:
+                # Milvus 삽입 시 받은 id와 페이로드로 바로 저장 (컬렉션 재조회 없음)
+                chunks = []
+                for chunk in vector_result["chunks"]:
                     chunk_data = {
-                        "content_type": doc_data.get("content_type", "combined"),
-                        "content": doc_data.get("content", ""),
-                        "text_content": doc_data.get("text_content", ""),
-                        "image_description": doc_data.get("image_description", ""),
-                        "image_path": doc_data.get("image_path", ""),
-                        "milvus_id": str(doc_data.get("id", ""))
+                        "content_type": chunk["content_type"],
+                        "content": chunk["content"],
+                        "text_content": chunk["text_content"],
+                        "image_description": chunk["image_description"],
+                        "image_path": chunk["image_path"],
+                        "milvus_id": chunk["milvus_id"],
+                        "chunk_id": chunk["chunk_id"],
+                        "chunk_index": chunk["chunk_index"],
+                        "chunk_count": chunk["chunk_count"],
+                        "char_start": chunk["char_start"],
+                        "char_end": chunk["char_end"],
+                        "token_count": chunk["token_count"],
+                        **page_vision_metadata(text_result, chunk["page_number"])
                     }
-                    
-                    save_document_chunk(
-                        doc_metadata["doc_id"], 
-                        doc_data.get("page_number", 0), 
-                        chunk_data
-                    )
-                    saved_chunks += 1
+                    chunks.append({"page_number": chunk["page_number"], "chunk_data": chunk_data})
+                with metrics.stage("postgres"):
+                    saved_chunks = save_document_chunks(doc_metadata["doc_id"], chunks)
+                metrics.increment("postgres_rows", saved_chunks)
+                metrics.finish()
                     
                 # 문서 처리 상태 업데이트
                 update_document_processing_status(
@@ -244,65 +399,87 @@ def process_single_document_complete(document_path: str, max_pages: int = None,
                 
                 # 작업 완료 처리
                 if job_id:
-                    complete_processing_job(job_id, saved_chunks, vector_result['total_documents'])
+                    complete_processing_job(job_id, saved_chunks, vector_result['total_documents'],
+                                            extra_result={"embedding_cache": vector_result.get("embedding_cache"),
+                                                          "vision_stats": description_result.get("vision_stats"),
+                                                          "vision_skipped_pages": text_result.get("vision_skipped_pages", 0),
+                                                          "metrics": metrics.to_dict()})
                     
                 logger.info(f"✅ PostgreSQL 저장 완료: {saved_chunks}개 청크")
                 
             except Exception as e:
                 logger.error(f"❌ PostgreSQL 저장 실패: {str(e)}")
-                if doc_metadata and job_id:
-                    try:
-                        update_document_processing_status(doc_metadata["doc_id"], "failed", error_log=str(e))
+                storage_failed = True
+                try:
+                    update_document_processing_status(doc_metadata["doc_id"], "failed", error_log=str(e))
+                    if job_id:
                         complete_processing_job(job_id, saved_chunks, vector_result['total_documents'], str(e))
-                    except:
-                        pass
+                except:
+                    pass
         
         # 성공 결과 반환
+        metrics_data = metrics.to_dict()
+        publish_document_metrics(metrics_data)
+        if not storage_failed:
+            # 문서가 실패로 기록된 경우에는 다음 재시도를 위해 체크포인트 유지
+            clear_checkpoint(checkpoint_key)
         result = {
             "document_path": document_path,
             "status": "success",
             "doc_id": doc_metadata.get("doc_id") if doc_metadata else None,
+            "file_hash": doc_metadata.get("file_hash") if doc_metadata else None,
             "total_pages": text_result['total_pages'],
             "captured_images": len(image_result['image_paths']),
             "generated_descriptions": description_result['total_images'],
             "vector_documents": vector_result['total_documents'],
             "saved_chunks": saved_chunks,
+            "storage_failed": storage_failed,
+            "embedding_cache": vector_result.get("embedding_cache"),
+            "vision_stats": description_result.get("vision_stats"),
+            "metrics": metrics_data,
             "processing_time": datetime.now().isoformat()
         }
         
         logger.info(f"✅ 문서 처리 완료: {Path(document_path).name}")
         logger.info(f"   📊 페이지: {result['total_pages']}, 이미지: {result['captured_images']}, 벡터: {result['vector_documents']}")
+        logger.info(f"   ⏱️ {format_stage_summary(metrics_data)}")
         
         return result
         
     except Exception as e:
         logger.error(f"❌ 문서 처리 실패: {Path(document_path).name} - {str(e)}")
         
-        # 실패 시 메타데이터 업데이트
-        if db_initialized and doc_metadata and job_id:
+        # 실패 시 메타데이터 업데이트 (등록된 문서는 작업 로그가 없어도 실패로 기록)
+        if db_initialized and doc_metadata:
             try:
                 update_document_processing_status(doc_metadata["doc_id"], "failed", error_log=str(e))
-                complete_processing_job(job_id, 0, 0, str(e))
+                if job_id:
+                    complete_processing_job(job_id, 0, 0, str(e))
             except:
                 pass
         
+        metrics.finish()
+        metrics_data = metrics.to_dict()
+        publish_document_metrics(metrics_data, status="failed")
         return {
             "document_path": document_path,
             "status": "failed",
             "error": str(e),
+            "metrics": metrics_data,
             "failure_time": datetime.now().isoformat()
         }
 
 @flow(
     name="batch_document_processing_pipeline",
     description="폴더의 모든 PDF 파일을 일괄 처리하는 배치 파이프라인",
-    task_runner=ConcurrentTaskRunner(max_workers=2)  # 동시 처리 파일 수 제한
+    task_runner=ConcurrentTaskRunner(max_workers=config.BATCH_MAX_CONCURRENT_DOCUMENTS)  # 동시 처리 파일 수 제한
 )
 def batch_document_processing_pipeline(
     folder_path: str,
     max_pages: int = None,
     max_file_size_mb: float = 50.0,
-    skip_existing: bool = True
+    skip_existing: bool = True,
+    pipeline_mode: str = None
 ):
     """
     폴더 배치 문서 처리 파이프라인 메인 함수
@@ -312,6 +489,7 @@ def batch_document_processing_pipeline(
         max_pages: 각 문서당 처리할 최대 페이지 수
         max_file_size_mb: 처리할 최대 파일 크기 (MB)
         skip_existing: 이미 처리된 파일 건너뛰기 여부
+        pipeline_mode: "staged" 또는 "streaming" (기본값: config.PIPELINE_MODE)
     """
     logger = get_run_logger()
     logger.info(f"📁 배치 문서 처리 파이프라인 시작: {folder_path}")
@@ -321,13 +499,15 @@ def batch_document_processing_pipeline(
         raise ValueError("환경 변수 설정을 확인해주세요.")
     
     start_time = datetime.now()
+    # 배치 전체 계측 (문서별 계측 합계, pages_per_second는 배치 벽시계 시간 기준)
+    batch_metrics = PipelineMetrics()
     
     # 1단계: PDF 파일 검색
     logger.info("🔍 1단계: PDF 파일 검색")
-    pdf_files = find_pdf_files(folder_path)
+    pdf_files = find_pdf_files(folder_path, skip_existing=skip_existing)
     
     if not pdf_files:
-        logger.warning(f"⚠️ '{folder_path}' 폴더에서 PDF 파일을 찾을 수 없습니다.")
+        logger.warning(f"⚠️ '{folder_path}' 폴더에서 처리할 PDF 파일을 찾을 수 없습니다. (신규/변경 파일 없음)")
         return {
             "folder_path": folder_path,
             "total_files": 0,
@@ -354,16 +534,32 @@ def batch_document_processing_pipeline(
             "end_time": datetime.now().isoformat()
         }
     
-    # 3단계: 배치 처리 (동시 처리)
-    logger.info(f"⚡ 3단계: {len(filtered_files)}개 파일 배치 처리 시작")
-    
-    # 각 파일을 병렬로 처리 (실제 태스크들 직접 실행)
+    # 3단계: 작업 계획 (큰 문서 우선 정렬)
+    logger.info("🗓️ 3단계: 작업량 추정 및 처리 순서 결정")
+    schedule = plan_batch_schedule(filtered_files, max_pages)
+    vision_concurrency = vision_concurrency_share()
+    # 페이지 예산은 프로세스 전역이므로 이번 실행의 최대 동시 페이지 수만 보고하도록 초기화
+    get_page_budget().reset_peak()
+    
+    # 4단계: 배치 처리 (동시 처리)
+    logger.info(f"⚡ 4단계: {len(filtered_files)}개 파일 배치 처리 시작")
+    logger.info(f"📐 동시 문서 {config.BATCH_MAX_CONCURRENT_DOCUMENTS}개, "
+                f"동시 페이지 {config.BATCH_MAX_PAGES_IN_FLIGHT}페이지 이하")
+    # GPT Vision rate limiter는 프로세스 전역 객체로, 동시에 처리되는 모든 문서가 같은 할당량을 공유
+    logger.info(f"🚦 GPT Vision 공유 한도: {config.VISION_REQUESTS_PER_MINUTE} RPM, "
+                f"{config.VISION_TOKENS_PER_MINUTE} TPM (문서당 동시 요청 {vision_concurrency}개)")
+    
+    # 큰 문서부터 제출, 각 태스크는 페이지 예산을 확보한 뒤 실행
     processing_futures = []
-    for pdf_file in filtered_files:
+    for item in schedule:
         future = process_single_document_complete.submit(
-            pdf_file, 
+            item["document_path"], 
             max_pages=max_pages,
-            skip_image_processing=False
+            skip_image_processing=False,
+            pipeline_mode=pipeline_mode,
+            scheduled_pages=item["pages"],
+            vision_concurrency=vision_concurrency,
+            skip_existing=skip_existing
         )
         processing_futures.append(future)
     
@@ -377,6 +573,11 @@ def batch_document_processing_pipeline(
     
     end_time = datetime.now()
     total_duration = (end_time - start_time).total_seconds()
+    for result in processing_results:
+        if result.get("metrics"):
+            batch_metrics.merge(result["metrics"])
+    batch_metrics.finish()
+    batch_metrics_data = batch_metrics.to_dict()
     
     # 최종 결과
     batch_result = {
@@ -390,12 +591,17 @@ def batch_document_processing_pipeline(
         "start_time": start_time.isoformat(),
         "end_time": end_time.isoformat(),
         "total_duration_seconds": total_duration,
+        "metrics": batch_metrics_data,
         "status": "completed",
         "settings": {
             "max_pages": max_pages,
             "max_file_size_mb": max_file_size_mb,
-            "max_concurrent_workers": 2,
-            "skip_existing": skip_existing
+            "max_concurrent_workers": config.BATCH_MAX_CONCURRENT_DOCUMENTS,
+            "max_pages_in_flight": config.BATCH_MAX_PAGES_IN_FLIGHT,
+            "vision_concurrency_per_document": vision_concurrency,
+            "peak_pages_in_flight": get_page_budget().peak,
+            "skip_existing": skip_existing,
+            "pipeline_mode": pipeline_mode or config.PIPELINE_MODE
         }
     }
     
@@ -403,6 +609,10 @@ def batch_document_processing_pipeline(
     total_pages_processed = sum(r.get("total_pages", 0) for r in successful_files)
     total_vectors_created = sum(r.get("vector_documents", 0) for r in successful_files)
     total_chunks_saved = sum(r.get("saved_chunks", 0) for r in successful_files)
+    embedding_cache_hits = sum((r.get("embedding_cache") or {}).get("hits", 0) for r in successful_files)
+    embedding_cache_misses = sum((r.get("embedding_cache") or {}).get("misses", 0) for r in successful_files)
+    description_cache_hits = sum((r.get("vision_stats") or {}).get("cache_hits", 0) for r in successful_files)
+    description_cache_misses = sum((r.get("vision_stats") or {}).get("cache_misses", 0) for r in successful_files)
     
     # 결과 요약 출력
     logger.info("📊 배치 처리 완료 요약:")
@@ -414,7 +624,10 @@ def batch_document_processing_pipeline(
     logger.info(f"   - 총 페이지: {total_pages_processed}페이지")
     logger.info(f"   - 총 벡터: {total_vectors_created}개")
     logger.info(f"   - 총 청크: {total_chunks_saved}개")
+    logger.info(f"   - 임베딩 캐시: 적중 {embedding_cache_hits}개, 미스 {embedding_cache_misses}개")
+    logger.info(f"   - 페이지 설명 캐시: 적중 {description_cache_hits}개, 미스 {description_cache_misses}개")
     logger.info(f"   - 총 처리 시간: {total_duration:.1f}초")
+    logger.info(f"   - 단계별 시간 (문서 합계): {format_stage_summary(batch_metrics_data)}")
     
     if successful_files:
         logger.info("✅ 성공한 파일들:")
@@ -437,7 +650,11 @@ def batch_document_processing_pipeline(
         "detailed_stats": {
             "total_pages_processed": total_pages_processed,
             "total_vectors_created": total_vectors_created,
-            "total_chunks_saved": total_chunks_saved
+            "total_chunks_saved": total_chunks_saved,
+            "embedding_cache_hits": embedding_cache_hits,
+            "embedding_cache_misses": embedding_cache_misses,
+            "description_cache_hits": description_cache_hits,
+            "description_cache_misses": description_cache_misses
         }
     })
     
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+배치 문서 처리 스케줄러
+- 페이지 수/파일 크기 기준 큰 문서부터 처리 (LPT: Longest Processing Time first) → 전체 완료 시간 단축
+- 동시에 처리 중인 페이지 수 상한(페이지 예산)으로 대용량 폴더 처리 시 메모리 급증 방지
+- 동시 문서 수에 맞춰 문서별 GPT Vision 동시 요청 수를 배분
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import fitz  # PyMuPDF
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# 페이지 수를 읽을 수 없는 파일의 추정치 (페이지당 평균 바이트)
+_ESTIMATED_BYTES_PER_PAGE = 100 * 1024
+
+
+def estimate_document_work(document_path: str, max_pages: int = None) -> Dict[str, Any]:
+    """문서 작업량 추정 (페이지 수는 PDF 헤더만 읽어 확인)"""
+    file_size = Path(document_path).stat().st_size
+    try:
+        with fitz.open(document_path) as doc:
+            page_count = len(doc)
+        estimated = False
+    except Exception as e:
+        logger.warning(f"⚠️ 페이지 수 확인 실패, 파일 크기로 추정: {document_path} ({str(e)})")
+        page_count = max(1, file_size // _ESTIMATED_BYTES_PER_PAGE)
+        estimated = True
+
+    pages = min(page_count, max_pages) if max_pages else page_count
+    return {
+        "document_path": document_path,
+        "file_size": file_size,
+        "page_count": page_count,
+        "pages": pages,
+        "page_count_estimated": estimated,
+    }
+
+
+def order_longest_first(work_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """처리할 페이지 수, 파일 크기 순으로 큰 작업부터 정렬"""
+    return sorted(work_items, key=lambda item: (item["pages"], item["file_size"]), reverse=True)
+
+
+def vision_concurrency_share(max_documents: int = None, total_concurrency: int = None) -> int:
+    """동시 처리 문서 1개당 GPT Vision 동시 요청 수"""
+    max_documents = max_documents or config.BATCH_MAX_CONCURRENT_DOCUMENTS
+    total_concurrency = total_concurrency or config.BATCH_VISION_CONCURRENCY
+    return max(1, total_concurrency // max(1, max_documents))
+
+
+class PageBudget:
+    """동시에 처리 중인 페이지 수 상한 (예산을 넘는 단일 문서는 단독으로만 실행)"""
+
+    def __init__(self, max_pages: int):
+        self.max_pages = max_pages
+        self.in_flight = 0
+        self.peak = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, pages: int):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.in_flight == 0 or self.in_flight + pages <= self.max_pages
+            )
+            self.in_flight += pages
+            self.peak = max(self.peak, self.in_flight)
+
+    def release(self, pages: int):
+        with self._condition:
+            self.in_flight -= pages
+            self._condition.notify_all()
+
+    def reset_peak(self):
+        """최대 동시 페이지 수 기록을 현재 값으로 초기화 (같은 워커에서 배치 flow를 다시 실행할 때)"""
+        with self._condition:
+            self.peak = self.in_flight
+
+    @contextmanager
+    def reserve(self, pages: int):
+        """pages만큼 예산을 확보한 동안 실행"""
+        if not pages:
+            yield
+            return
+        self.acquire(pages)
+        try:
+            yield
+        finally:
+            self.release(pages)
+
+
+_page_budget: Optional[PageBudget] = None
+_page_budget_lock = threading.Lock()
+
+
+def get_page_budget() -> PageBudget:
+    """프로세스 전역 페이지 예산 (배치 내 모든 문서 태스크가 공유)"""
+    global _page_budget
+    if _page_budget is None:
+        with _page_budget_lock:
+            if _page_budget is None:
+                _page_budget = PageBudget(config.BATCH_MAX_PAGES_IN_FLIGHT)
+    return _page_budget
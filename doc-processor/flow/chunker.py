@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+페이지 하위 청크 분할
+- page_extraction.page_units가 만든 fitz 블록(문단)과 표를 단위로 토큰 예산(CHUNK_MAX_TOKENS) 안에서 창을 채우고, 창 사이를 CHUNK_OVERLAP_TOKENS만큼 겹침
+- 창을 넘기는 지점이 문단 중간이면 창 뒤쪽 절반 안의 문단 경계에서 끊음
+- 표는 하나의 단위로 유지하며 겹침에 포함하지 않음 (예산을 넘는 표만 행 단위로 분할)
+- 페이지 전체가 예산 안에 들면 기존과 같은 페이지 통합(combined) 청크 1개 (임베딩 캐시 재사용)
+- 청크 ID는 (문서 경로, 페이지, 청크 유형, 순번)으로 정해지므로 재처리해도 동일
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+from config import config
+from embedding_engine import estimate_tokens
+from vector_store import build_page_document
+
+# 문장 경계 (마침표/물음표/느낌표 뒤 공백, 줄바꿈)
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def stable_chunk_id(document_path: str, page_number: int, chunk_type: str, chunk_index: int) -> str:
+    """문서 경로 해시 + 페이지 + 유형 + 순번으로 만든 고정 청크 ID"""
+    path_key = hashlib.sha1(document_path.encode("utf-8")).hexdigest()[:16]
+    return f"{path_key}_p{page_number}_{chunk_type}_{chunk_index}"
+
+
+# ===============================
+# 단위(문단/표)
+# ===============================
+def text_units(text: str) -> List[Dict[str, str]]:
+    """블록 정보가 없는 텍스트를 빈 줄 기준 문단 단위로 변환"""
+    return [{"text": part.strip(), "kind": "paragraph"} for part in re.split(r"\n\s*\n", text) if part.strip()]
+
+
+# ===============================
+# 단위 → 조각 → 토큰 창
+# ===============================
+def _char_windows(start: int, end: int, max_chars: int) -> List[tuple]:
+    return [(pos, min(pos + max_chars, end)) for pos in range(start, end, max_chars)]
+
+
+def _split_span(text: str, start: int, end: int, pattern: re.Pattern, max_tokens: int) -> List[tuple]:
+    """[start, end) 구간을 pattern 경계로 나누고, 그래도 예산을 넘는 조각은 글자 단위로 나눔"""
+    spans = []
+    pos = start
+    for match in pattern.finditer(text, start, end):
+        if match.start() > pos:
+            spans.append((pos, match.start()))
+        pos = match.end()
+    if pos < end:
+        spans.append((pos, end))
+
+    pieces = []
+    for span_start, span_end in spans:
+        if estimate_tokens(text[span_start:span_end]) <= max_tokens:
+            pieces.append((span_start, span_end))
+        else:
+            # 추정치는 글자당 최대 1토큰이므로 max_tokens - 1 글자면 항상 예산 이내
+            pieces.extend(_char_windows(span_start, span_end, max(1, max_tokens - 1)))
+    return pieces
+
+
+def _pieces(source: str, units: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, Any]]:
+    """단위를 source 내 위치가 있는 조각으로 변환 (문단은 문장 단위, 표는 통째로 또는 행 단위)"""
+    pieces = []
+    pos = 0
+    for unit in units:
+        start = source.find(unit["text"], pos)
+        end = start + len(unit["text"])
+        pos = end
+        if unit["kind"] == "table" and estimate_tokens(unit["text"]) <= max_tokens:
+            spans = [(start, end)]
+        elif unit["kind"] == "table":
+            spans = _split_span(source, start, end, re.compile(r"\n"), max_tokens)
+        else:
+            spans = _split_span(source, start, end, _SENTENCE_BREAK, max_tokens)
+        for index, (span_start, span_end) in enumerate(spans):
+            pieces.append({
+                "start": span_start,
+                "end": span_end,
+                "tokens": estimate_tokens(source[span_start:span_end]),
+                "kind": unit["kind"],
+                "unit_start": index == 0,
+            })
+    return pieces
+
+
+def _tokens(pieces: List[Dict[str, Any]]) -> int:
+    return sum(piece["tokens"] for piece in pieces)
+
+
+def _paragraph_cut(window: List[Dict[str, Any]], max_tokens: int) -> int:
+    """창 뒤쪽 절반 안의 마지막 단위 경계 위치 (없으면 창 전체)"""
+    for cut in range(len(window) - 1, 0, -1):
+        if window[cut]["unit_start"] and _tokens(window[:cut]) >= max_tokens / 2:
+            return cut
+    return len(window)
+
+
+def _overlap_tail(window: List[Dict[str, Any]], overlap_tokens: int) -> List[Dict[str, Any]]:
+    """다음 창 앞에 반복할 끝부분 조각 (표 조각은 반복하지 않음)"""
+    tail = []
+    tokens = 0
+    for piece in reversed(window):
+        if piece["kind"] == "table" or tokens + piece["tokens"] > overlap_tokens:
+            break
+        tail.insert(0, piece)
+        tokens += piece["tokens"]
+    return tail
+
+
+def split_windows(
+    source: str,
+    units: List[Dict[str, str]],
+    max_tokens: int = None,
+    overlap_tokens: int = None,
+) -> List[Dict[str, Any]]:
+    """
+    토큰 창 분할
+
+    Returns:
+        [{"text", "char_start", "char_end", "token_count"}, ...] (char_*는 source 기준 위치)
+    """
+    max_tokens = max_tokens or config.CHUNK_MAX_TOKENS
+    overlap_tokens = config.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+
+    windows = []
+    current: List[Dict[str, Any]] = []
+    for piece in _pieces(source, units, max_tokens):
+        if current and _tokens(current) + piece["tokens"] > max_tokens:
+            cut = _paragraph_cut(current, max_tokens)
+            if _tokens(current[cut:]) + piece["tokens"] > max_tokens:
+                cut = len(current)
+            emitted, rest = current[:cut], current[cut:]
+            windows.append(emitted)
+            current = _overlap_tail(emitted, overlap_tokens) + rest
+            if _tokens(current) + piece["tokens"] > max_tokens:
+                current = rest
+        current.append(piece)
+    if current:
+        windows.append(current)
+
+    return [
+        {
+            "text": source[window[0]["start"]:window[-1]["end"]],
+            "char_start": window[0]["start"],
+            "char_end": window[-1]["end"],
+            "token_count": estimate_tokens(source[window[0]["start"]:window[-1]["end"]]),
+        }
+        for window in windows
+    ]
+
+
+# ===============================
+# 페이지 → 삽입용 청크 행
+# ===============================
+def _with_chunk_fields(document: Dict[str, Any], document_path: str, page_number: int, chunk_index: int,
+                       char_start: int, char_end: int) -> Dict[str, Any]:
+    document.update({
+        "chunk_id": stable_chunk_id(document_path, page_number, document["content_type"], chunk_index),
+        "chunk_index": chunk_index,
+        "char_start": char_start,
+        "char_end": char_end,
+        "token_count": estimate_tokens(document["embedding_input"]),
+    })
+    return document
+
+
+def build_page_chunks(
+    document_path: str,
+    page_number: int,
+    text_content: str = "",
+    image_description: str = "",
+    image_path: str = "",
+    units: Optional[List[Dict[str, str]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    페이지의 삽입용 청크 행 목록 (내용이 없으면 빈 목록)
+
+    페이지 전체가 예산 안에 들거나 분할이 꺼져 있으면 기존과 같은 통합 청크 1개,
+    넘으면 텍스트 창(content_type "text")과 이미지 설명 창(content_type "image")으로 나눕니다.
+    텍스트 청크의 char_start/char_end는 단위를 줄바꿈으로 이은 페이지 텍스트 기준, 이미지 청크는 설명 기준입니다.
+    """
+    combined = build_page_document(document_path, page_number, text_content, image_description, image_path)
+    if combined is None:
+        return []
+
+    if units is None:
+        units = text_units(text_content)
+    source_text = "\n".join(unit["text"] for unit in units)
+
+    if not config.CHUNKING_ENABLED or estimate_tokens(combined["embedding_input"]) <= config.CHUNK_MAX_TOKENS:
+        combined["chunk_count"] = 1
+        return [_with_chunk_fields(combined, document_path, page_number, 0, 0, len(source_text))]
+
+    chunks = []
+    for window in split_windows(source_text, units):
+        chunks.append(_with_chunk_fields({
+            "document_path": document_path,
+            "page_number": page_number,
+            "content_type": "text",
+            "content": f"텍스트: {window['text']}",
+            "embedding_input": f"텍스트: {window['text']}",
+            "text_content": window["text"],
+            "image_description": "",
+            "image_path": "",
+        }, document_path, page_number, len(chunks), window["char_start"], window["char_end"]))
+
+    if combined["image_description"]:
+        description = image_description.strip()
+        for window in split_windows(description, text_units(description)):
+            chunks.append(_with_chunk_fields({
+                "document_path": document_path,
+                "page_number": page_number,
+                "content_type": "image",
+                "content": f"이미지: {window['text']}",
+                "embedding_input": f"이미지: {window['text']}",
+                "text_content": "",
+                "image_description": window["text"],
+                "image_path": combined["image_path"],
+            }, document_path, page_number, len(chunks), window["char_start"], window["char_end"]))
+
+    for chunk in chunks:
+        chunk["chunk_count"] = len(chunks)
+    return chunks
@@ -20,17 +20,102 @@ class Config:
     AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
     AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")  # GPT Vision용
     AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")  # GPT-4 Vision 배포 이름
+
+    # GPT Vision 동시 요청 및 Rate Limit (배치 내 모든 문서가 공유)
+    VISION_MAX_CONCURRENCY = int(os.getenv("VISION_MAX_CONCURRENCY", "8"))  # 문서당 동시 요청 수
+    VISION_REQUESTS_PER_MINUTE = int(os.getenv("VISION_REQUESTS_PER_MINUTE", "60"))  # 배포 RPM 할당량
+    VISION_TOKENS_PER_MINUTE = int(os.getenv("VISION_TOKENS_PER_MINUTE", "60000"))  # 배포 TPM 할당량
+    VISION_MAX_TOKENS = int(os.getenv("VISION_MAX_TOKENS", "1000"))  # 응답 최대 토큰
+    VISION_MAX_RETRIES = int(os.getenv("VISION_MAX_RETRIES", "5"))
+    VISION_BACKOFF_BASE_SECONDS = float(os.getenv("VISION_BACKOFF_BASE_SECONDS", "1.0"))
+    VISION_BACKOFF_MAX_SECONDS = float(os.getenv("VISION_BACKOFF_MAX_SECONDS", "60.0"))
+
+    # GPT Vision 사전 분류 (텍스트 추출만으로 충분한 페이지는 Vision 호출 생략)
+    VISION_CLASSIFIER_ENABLED = os.getenv("VISION_CLASSIFIER_ENABLED", "true").lower() == "true"
+    VISION_MIN_TEXT_DENSITY = float(os.getenv("VISION_MIN_TEXT_DENSITY", "0.4"))  # 1000pt²당 문자 수 (A4 약 200자)
+    VISION_MIN_IMAGE_AREA_RATIO = float(os.getenv("VISION_MIN_IMAGE_AREA_RATIO", "0.05"))  # 페이지 대비 이미지 면적
+    VISION_MIN_DRAWINGS = int(os.getenv("VISION_MIN_DRAWINGS", "30"))  # 도면/다이어그램으로 볼 벡터 드로잉 수
+    VISION_DETECT_TABLES = os.getenv("VISION_DETECT_TABLES", "true").lower() == "true"  # 표가 있으면 Vision 사용
+
+    # 페이지 설명 캐시 (렌더링 이미지 해시 기반, 문서/배치 실행 간 공유)
+    DESCRIPTION_CACHE_ENABLED = os.getenv("DESCRIPTION_CACHE_ENABLED", "true").lower() == "true"
+    DESCRIPTION_CACHE_PATH = os.getenv("DESCRIPTION_CACHE_PATH", "./cache/description_cache.db")
+    DESCRIPTION_CACHE_MAX_MB = int(os.getenv("DESCRIPTION_CACHE_MAX_MB", "256"))
+    DESCRIPTION_CACHE_HASH = os.getenv("DESCRIPTION_CACHE_HASH", "sha256")  # sha256: 정확 일치, phash: 유사 이미지 허용
+    DESCRIPTION_CACHE_PHASH_MAX_DISTANCE = int(os.getenv("DESCRIPTION_CACHE_PHASH_MAX_DISTANCE", "6"))  # 256비트 dHash 해밍 거리
     
     # Azure OpenAI - Embeddings (별도 API 버전)
     AZURE_OPENAI_EMBEDDING_API_VERSION = os.getenv("AZURE_OPENAI_EMBEDDING_API_VERSION", "2023-12-01-preview")  # 임베딩용
     AZURE_OPENAI_EMBEDDING_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")  # 임베딩 모델 배포 이름
-    
+
+    # 임베딩 벡터 차원/저장 형식 (바꾸면 기존 컬렉션은 run_migrate_collection.py로 재투영)
+    EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "3072"))  # 3072 미만이면 API dimensions 파라미터로 축소 (예: 1024, 256)
+    EMBEDDING_VECTOR_TYPE = os.getenv("EMBEDDING_VECTOR_TYPE", "float32").lower()  # float32 | float16 (행당 절반 용량, Milvus 2.4+ 서버 필요)
+
+    # 임베딩 엔진 설정 (요청당 배치 크기 및 동시 요청 수)
+    EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "64"))  # 요청당 최대 입력 수
+    EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))  # 요청당 최대 토큰 수 (추정치)
+    EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))  # 동시 배치 요청 수
+    EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+
+    # 임베딩 캐시 (콘텐츠 해시 기반, 재처리 시 변경된 페이지만 임베딩)
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./cache/embedding_cache.db")
+    EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024"))
+
     # Milvus Lite (파일 기반)
     MILVUS_URI = os.getenv("MILVUS_URI", "./milvus_lite.db")  # 파일 기반 DB
     MILVUS_HOST = os.getenv("MILVUS_HOST", "localhost")  # 백업용 (Docker 사용시)
     MILVUS_PORT = os.getenv("MILVUS_PORT", "19530")     # 백업용 (Docker 사용시)
     MILVUS_COLLECTION_NAME = os.getenv("MILVUS_COLLECTION_NAME", "document_vectors")
     USE_MILVUS_LITE = os.getenv("USE_MILVUS_LITE", "true").lower() == "true"
+    # incremental: 컬렉션 유지 + 문서 단위 삭제/삽입, recreate: 매 실행 시 컬렉션 재생성 (이전 동작)
+    MILVUS_INGEST_MODE = os.getenv("MILVUS_INGEST_MODE", "incremental").lower()
+    MILVUS_INSERT_BATCH_SIZE = int(os.getenv("MILVUS_INSERT_BATCH_SIZE", "256"))  # 삽입 요청당 최대 행 수
+    # 벡터 인덱스 (FLAT | IVF_FLAT | HNSW | AUTOINDEX), 새 컬렉션 생성 또는 run_migrate_collection.py --reindex 시 적용
+    MILVUS_INDEX_TYPE = os.getenv("MILVUS_INDEX_TYPE", "FLAT").upper()
+    MILVUS_IVF_NLIST = int(os.getenv("MILVUS_IVF_NLIST", "1024"))  # IVF 클러스터 수 (행 수의 제곱근 x 4 정도)
+    MILVUS_IVF_NPROBE = int(os.getenv("MILVUS_IVF_NPROBE", "16"))  # 검색 시 탐색할 클러스터 수
+    MILVUS_HNSW_M = int(os.getenv("MILVUS_HNSW_M", "16"))  # 노드당 이웃 수
+    MILVUS_HNSW_EF_CONSTRUCTION = int(os.getenv("MILVUS_HNSW_EF_CONSTRUCTION", "200"))  # 그래프 생성 시 후보 수
+    MILVUS_HNSW_EF = int(os.getenv("MILVUS_HNSW_EF", "64"))  # 검색 시 후보 수 (검색 limit보다 작으면 limit 사용)
+    
+    # 페이지 하위 청크 분할 (토큰 창 + 겹침, 문단/표 경계 인식)
+    CHUNKING_ENABLED = os.getenv("CHUNKING_ENABLED", "true").lower() == "true"  # false: 페이지당 통합 청크 1개
+    CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "800"))  # 청크당 최대 토큰 수 (추정치)
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "100"))  # 이웃 청크와 겹치는 토큰 수
+    CHUNK_TABLE_AWARE = os.getenv("CHUNK_TABLE_AWARE", "true").lower() == "true"  # 표 영역을 하나의 단위로 유지
+    SEARCH_CHUNK_OVERSAMPLE = int(os.getenv("SEARCH_CHUNK_OVERSAMPLE", "4"))  # 페이지로 합치기 전 top_k 대비 청크 검색 배수
+    
+    # 어휘(BM25) 색인 + 하이브리드 검색 (벡터 결과와 RRF 결합)
+    LEXICAL_INDEX_ENABLED = os.getenv("LEXICAL_INDEX_ENABLED", "true").lower() == "true"
+    LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "./cache/lexical_index.db")
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))  # RRF 상수 (클수록 하위 순위 영향이 커짐)
+    HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "1.0"))  # 어휘 검색 결과의 RRF 가중치
+    
+    # 통합 검색(comprehensive_search)에서 실행할 검색 유형과 하이브리드 가중치
+    SEARCH_COMBINED = os.getenv("SEARCH_COMBINED", "true").lower() == "true"  # 통합 벡터 검색
+    SEARCH_TEXT_ONLY = os.getenv("SEARCH_TEXT_ONLY", "true").lower() == "true"  # 텍스트 전용 검색
+    SEARCH_IMAGE_ONLY = os.getenv("SEARCH_IMAGE_ONLY", "true").lower() == "true"  # 이미지 전용 검색
+    SEARCH_HYBRID = os.getenv("SEARCH_HYBRID", "true").lower() == "true"  # 하이브리드 검색 (벡터 + 어휘, RRF)
+    HYBRID_TEXT_WEIGHT = float(os.getenv("HYBRID_TEXT_WEIGHT", "0.5"))  # 텍스트 벡터 결과의 RRF 가중치
+    HYBRID_IMAGE_WEIGHT = float(os.getenv("HYBRID_IMAGE_WEIGHT", "0.5"))  # 이미지 벡터 결과의 RRF 가중치
+    SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", "5"))
+    SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))  # 동시에 실행할 하위 검색 수
+    
+    # 2단계 검색: 1단계는 id/점수/페이지/미리보기만, 전체 필드는 펼친 결과만 id 배치로 조회
+    SNIPPET_MAX_CHARS = int(os.getenv("SNIPPET_MAX_CHARS", "300"))  # 적재 시 저장하는 미리보기 글자 수 (최대 512)
+    SEARCH_SNIPPET_CHARS = int(os.getenv("SEARCH_SNIPPET_CHARS", "160"))  # 검색 응답의 미리보기 글자 수
+    SEARCH_FETCH_BATCH_SIZE = int(os.getenv("SEARCH_FETCH_BATCH_SIZE", "256"))  # 전체 필드 조회 시 질의당 id 수
+    
+    # 상주 검색 서비스 (run_search_service.py)
+    SEARCH_QUERY_CACHE_SIZE = int(os.getenv("SEARCH_QUERY_CACHE_SIZE", "1024"))  # 질의 임베딩 LRU 항목 수 (0: 비활성화)
+    SEARCH_SERVICE_HOST = os.getenv("SEARCH_SERVICE_HOST", "127.0.0.1")
+    SEARCH_SERVICE_PORT = int(os.getenv("SEARCH_SERVICE_PORT", "8765"))
+    
+    # 파이프라인 계측 (단계별 시간/페이지 지연/API 호출 수를 result_data와 Prometheus 텍스트 파일로)
+    PIPELINE_METRICS_TEXTFILE = os.getenv("PIPELINE_METRICS_TEXTFILE", "./cache/pipeline_metrics.prom")  # 빈 값: 파일 기록 안 함
+    PIPELINE_METRICS_WORKER = os.getenv("PIPELINE_METRICS_WORKER", os.getenv("HOSTNAME", "local"))  # worker 레이블 값
     
     # PostgreSQL 데이터베이스 설정
     DATABASE_HOST = os.getenv("DATABASE_HOST", "localhost")
@@ -39,11 +124,14 @@ class Config:
     DATABASE_USERNAME = os.getenv("DATABASE_USERNAME", "postgres")
     DATABASE_PASSWORD = os.getenv("DATABASE_PASSWORD", "password")
     DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false").lower() == "true"
+    DATABASE_URL = os.getenv("DATABASE_URL")  # 지정 시 위 개별 설정 대신 사용 (예: 벤치마크용 sqlite:///bench.db)
     
     # PostgreSQL 연결 문자열
     @property
     def postgres_url(self) -> str:
-        """PostgreSQL 연결 URL 생성"""
+        """PostgreSQL 연결 URL 생성 (DATABASE_URL 지정 시 그대로 사용)"""
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         if not self.DATABASE_PASSWORD:
             return f"postgresql://{self.DATABASE_USERNAME}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         return f"postgresql://{self.DATABASE_USERNAME}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
@@ -51,6 +139,23 @@ class Config:
     # 파일 경로 설정
     OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", "./extracted_image"))
     
+    # 페이지 이미지 렌더링 해상도
+    RENDER_DPI = int(os.getenv("RENDER_DPI", "300"))
+    
+    # 페이지 이미지 저장 (OUTPUT_DIR 아래 콘텐츠 해시 파일명, 원본 + Vision 입력용 + 썸네일)
+    PAGE_IMAGE_FORMAT = os.getenv("PAGE_IMAGE_FORMAT", "webp").lower()  # webp | jpeg
+    PAGE_IMAGE_QUALITY = int(os.getenv("PAGE_IMAGE_QUALITY", "80"))  # 손실 압축 품질 (1~100)
+    PAGE_THUMBNAIL_MAX_SIDE = int(os.getenv("PAGE_THUMBNAIL_MAX_SIDE", "256"))  # 썸네일 긴 변 픽셀
+    VISION_IMAGE_MAX_SIDE = int(os.getenv("VISION_IMAGE_MAX_SIDE", "2048"))  # Vision 입력 이미지가 들어갈 정사각형 한 변
+    VISION_IMAGE_SHORT_SIDE = int(os.getenv("VISION_IMAGE_SHORT_SIDE", "768"))  # Vision 입력 이미지 짧은 변 최대 픽셀
+    
+    # 파이프라인 실행 방식 (staged: 단계별 일괄 처리, streaming: 페이지 단위 스트리밍)
+    PIPELINE_MODE = os.getenv("PIPELINE_MODE", "staged").lower()
+    STREAM_QUEUE_DEPTH = int(os.getenv("STREAM_QUEUE_DEPTH", "8"))  # 단계 사이 큐에 대기할 최대 페이지 수
+    STREAM_EMBED_BATCH_SIZE = int(os.getenv("STREAM_EMBED_BATCH_SIZE", "16"))  # 임베딩 마이크로 배치 크기
+    STREAM_INSERT_BATCH_SIZE = int(os.getenv("STREAM_INSERT_BATCH_SIZE", "16"))  # Milvus/PostgreSQL 적재 마이크로 배치 크기
+    STREAM_FLUSH_SECONDS = float(os.getenv("STREAM_FLUSH_SECONDS", "2.0"))  # 배치가 덜 차도 이 시간 동안 입력이 없으면 내보냄
+    
     # 기본 문서 및 폴더 경로 설정 
     DEFAULT_DOCUMENT_PATH = os.getenv("DEFAULT_DOCUMENT_PATH", "./test.pdf")
     DEFAULT_FOLDER_PATH = os.getenv("DEFAULT_FOLDER_PATH", "./uploads")
@@ -60,6 +165,24 @@ class Config:
     # 문서 처리 제한 설정
     MAX_PAGES_TO_PROCESS = int(os.getenv("MAX_PAGES_TO_PROCESS", "10"))
     
+    # 텍스트 추출 병렬화 (페이지 구간별 프로세스 풀)
+    EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    EXTRACT_PARALLEL_MIN_PAGES = int(os.getenv("EXTRACT_PARALLEL_MIN_PAGES", "50"))  # 이보다 작은 문서는 직렬 처리
+    EXTRACT_SLOW_PAGE_SECONDS = float(os.getenv("EXTRACT_SLOW_PAGE_SECONDS", "1.0"))  # 경고를 남길 페이지별 추출 시간
+    
+    # 배치 스케줄러 (큰 문서 우선, 동시 문서/페이지 수 제한)
+    BATCH_MAX_CONCURRENT_DOCUMENTS = int(os.getenv("BATCH_MAX_CONCURRENT_DOCUMENTS", "2"))
+    BATCH_MAX_PAGES_IN_FLIGHT = int(os.getenv("BATCH_MAX_PAGES_IN_FLIGHT", "200"))  # 동시에 처리 중인 페이지 수 상한
+    BATCH_VISION_CONCURRENCY = int(os.getenv("BATCH_VISION_CONCURRENCY", "16"))  # 배치 전체 GPT Vision 동시 요청 수 (문서별 균등 배분)
+    
+    # 배치 수집 매니페스트 (경로별 stat 시그니처 → 해시/문서 ID/상태, 변경 없는 파일은 읽지 않고 건너뜀)
+    INGEST_MANIFEST_ENABLED = os.getenv("INGEST_MANIFEST_ENABLED", "true").lower() == "true"
+    INGEST_MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", "./cache/ingest_manifest.db")
+    
+    # 페이지 단위 체크포인트 (문서 ID + 파일 해시 키, 실패한 문서를 다시 처리할 때 완료된 페이지의 추출/렌더링/설명/적재 재사용)
+    PAGE_CHECKPOINT_ENABLED = os.getenv("PAGE_CHECKPOINT_ENABLED", "true").lower() == "true"
+    PAGE_CHECKPOINT_PATH = os.getenv("PAGE_CHECKPOINT_PATH", "./cache/page_checkpoints.db")  # 여러 워커가 재시도를 나눠 받으면 공유 볼륨 경로 지정
+    
     @classmethod
     def validate_config(cls) -> bool:
         """필수 환경 변수 검증"""
@@ -96,7 +219,9 @@ class Config:
             "AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_KEY", 
             "AZURE_OPENAI_API_VERSION", "AZURE_OPENAI_DEPLOYMENT_NAME",  # GPT Vision
             "AZURE_OPENAI_EMBEDDING_API_VERSION", "AZURE_OPENAI_EMBEDDING_DEPLOYMENT",  # 임베딩
-            "MILVUS_URI", "MILVUS_COLLECTION_NAME", "OUTPUT_DIR"
+            "EMBEDDING_DIMENSION", "EMBEDDING_VECTOR_TYPE",
+            "MILVUS_URI", "MILVUS_COLLECTION_NAME", "MILVUS_INGEST_MODE", "MILVUS_INDEX_TYPE", "OUTPUT_DIR",
+            "PAGE_IMAGE_FORMAT", "PIPELINE_MODE"
         ]
         
         for var in config_vars:
@@ -4,6 +4,7 @@ PostgreSQL 데이터베이스 모델 및 연결 관리 - 공통 모듈 사용
 """
 
 import logging
+from datetime import datetime
 from typing import Any, Dict, Optional
 
 from config import config
@@ -48,12 +49,7 @@ class PrefectDatabaseManager:
     def _get_database_url_from_config(self) -> str:
         """Prefect 설정에서 데이터베이스 URL 구성"""
         # config.py에서 PostgreSQL 설정 가져오기
-        postgres_config = config.postgres
-        
-        return (
-            f"postgresql://{postgres_config['user']}:{postgres_config['password']}"
-            f"@{postgres_config['host']}:{postgres_config['port']}/{postgres_config['database']}"
-        )
+        return config.postgres_url
     
     def test_connection(self) -> bool:
         """데이터베이스 연결 테스트"""
@@ -69,6 +65,33 @@ def get_db_session():
     from shared_core import get_db_session as base_get_db_session
     return base_get_db_session()
 
+def build_chunk_record(page_number: int, chunk_data: Dict[str, Any], vector_dimension: int,
+                       embedding_model: str = "text-embedding-3-large") -> Dict[str, Any]:
+    """파이프라인 청크 데이터를 DocumentChunkService 저장 형식으로 변환"""
+    return {
+        "page_number": page_number,
+        "chunk_type": chunk_data.get("content_type", "unknown"),
+        "content": chunk_data.get("content", ""),
+        "image_description": chunk_data.get("image_description", ""),
+        "image_path": chunk_data.get("image_path", ""),
+        "milvus_id": chunk_data.get("milvus_id", ""),
+        "chunk_index": chunk_data.get("chunk_index", 0),
+        "char_start": chunk_data.get("char_start"),
+        "char_end": chunk_data.get("char_end"),
+        "token_count": chunk_data.get("token_count"),
+        "embedding_model": embedding_model,
+        "vector_dimension": vector_dimension,
+        "metadata_json": {
+            "processing_timestamp": datetime.utcnow().isoformat(),
+            "vector_type": config.EMBEDDING_VECTOR_TYPE,
+            "milvus_chunk_id": chunk_data.get("chunk_id", ""),
+            "chunk_count": chunk_data.get("chunk_count", 1),
+            "vision_skipped": chunk_data.get("vision_skipped", False),
+            "vision_reason": chunk_data.get("vision_reason", ""),
+            "original_data": chunk_data
+        }
+    }
+
 # 모든 모델과 함수들을 export
 __all__ = [
     "Document",
@@ -76,5 +99,6 @@ __all__ = [
     "ProcessingJob",
     "DocumentMetadata",  # 호환성을 위한 별칭
     "db_manager",
-    "get_db_session"
+    "get_db_session",
+    "build_chunk_record"
 ]
\ No newline at end of file
@@ -8,39 +8,39 @@
 """
 
 import asyncio
-import base64
 import io
 import logging
 import os
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import fitz  # PyMuPDF
-
-# Azure OpenAI (통합 openai 패키지 사용)
-import openai
+from chunker import build_page_chunks
 
 # 환경 설정
 from config import config
 
 # 데이터베이스 관리 (공통 모듈 사용)
-from database import db_manager, get_db_session
-from pdf2image import convert_from_path
+from database import build_chunk_record, db_manager, get_db_session
+from embedding_engine import get_embedding_engine
+from page_checkpoint import clear_checkpoint, open_checkpoint, resolve_checkpoint_key
+from page_extraction import extract_pages, slowest_pages
+from page_image_store import PageImageStore, get_page_image_store
+from page_renderer import iter_page_images
 from PIL import Image
+from pipeline_metrics import (
+    PipelineMetrics,
+    format_stage_summary,
+    publish_document_metrics,
+    record_staged_results,
+)
 from prefect import flow, get_run_logger, task
 from prefect.futures import PrefectFuture
 from prefect.task_runners import ConcurrentTaskRunner
 
-# Vector DB (Milvus)
-from pymilvus import (
-    Collection,
-    CollectionSchema,
-    DataType,
-    FieldSchema,
-    connections,
-    utility,
-)
+from streaming_pipeline import StreamingPagePipeline
 
 from shared_core import (
     Document,
@@ -50,6 +50,15 @@ from shared_core import (
     ProcessingJob,
     ProcessingJobService,
 )
+from vector_searcher import get_vector_searcher
+from vector_store import (
+    EMBEDDING_DIMENSION,
+    EMBEDDING_VECTOR_TYPE,
+    collection_index_type,
+    insert_page_documents,
+    prepare_document_collection,
+)
+from vision_describer import VisionDescriber
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -76,8 +85,8 @@ def initialize_database():
         return False
 
 @task(name="생성_문서_메타데이터")
-def create_document_metadata(document_path: str, document_type: str = 'common') -> Dict[str, Any]:
-    """문서 메타데이터 생성 및 저장 (공통 모듈 사용)"""
+def create_document_metadata(document_path: str, document_type: str = 'common', file_hash: str = None) -> Dict[str, Any]:
+    """문서 메타데이터 생성 및 저장 (공통 모듈 사용, 이미 계산한 file_hash가 있으면 재사용)"""
     logger = get_run_logger()
     
     try:
@@ -90,7 +99,8 @@ def create_document_metadata(document_path: str, document_type: str = 'common')
                 file_path=document_path,
                 user_id="system",  # 시스템 사용자
                 document_type=document_type,
-                is_public=True  # Prefect에서 처리하는 문서는 공개
+                is_public=True,  # Prefect에서 처리하는 문서는 공개
+                file_hash=file_hash
             )
             
             logger.info(f"✅ 문서 메타데이터 생성 완료: {result['document_id']}")
@@ -100,13 +110,28 @@ def create_document_metadata(document_path: str, document_type: str = 'common')
                 "file_size": result["file_size"],
                 "file_type": result["file_type"],
                 "file_hash": result["file_hash"],
-                "status": result["status"]
+                "status": result["status"],
+                "is_duplicate": result.get("is_duplicate", False)
             }
             
     except Exception as e:
         logger.error(f"❌ 문서 메타데이터 생성 실패: {str(e)}")
         raise
 
+@task(name="조회_완료_문서")
+def find_completed_document(file_hash: str) -> Optional[Dict[str, Any]]:
+    """파일 해시로 이미 처리 완료된 문서 조회 (없으면 None)"""
+    logger = get_run_logger()
+    
+    try:
+        with next(get_db_session()) as session:
+            doc_service = DocumentService(session)
+            return doc_service.find_completed_document_by_hash(file_hash)
+            
+    except Exception as e:
+        logger.error(f"❌ 완료 문서 조회 실패: {str(e)}")
+        raise
+
 @task(name="생성_처리_작업_로그")
 def create_processing_job(doc_id: str, flow_run_id: str) -> str:
     """처리 작업 로그 생성 (공통 모듈 사용)"""
@@ -141,18 +166,7 @@ def save_document_chunk(doc_id: str, page_number: int, chunk_data: Dict[str, Any
             
             result = chunk_service.create_chunk(
                 doc_id=doc_id,
-                page_number=page_number,
-                chunk_type=chunk_data.get("content_type", "unknown"),
-                content=chunk_data.get("content", ""),
-                image_description=chunk_data.get("image_description", ""),
-                image_path=chunk_data.get("image_path", ""),
-                milvus_id=chunk_data.get("milvus_id", ""),
-                embedding_model="text-embedding-3-large",
-                vector_dimension=3072,
-                metadata_json={
-                    "processing_timestamp": datetime.utcnow().isoformat(),
-                    "original_data": chunk_data
-                }
+                **build_chunk_record(page_number, chunk_data, EMBEDDING_DIMENSION)
             )
             
             logger.info(f"✅ 문서 청크 저장: {result['chunk_id']}")
@@ -162,6 +176,31 @@ def save_document_chunk(doc_id: str, page_number: int, chunk_data: Dict[str, Any
         logger.error(f"❌ 문서 청크 저장 실패: {str(e)}")
         raise
 
+@task(name="저장_문서_청크_일괄")
+def save_document_chunks(doc_id: str, chunks: List[Dict[str, Any]]) -> int:
+    """문서의 모든 청크를 한 번의 INSERT, 한 트랜잭션으로 저장 (chunks: [{"page_number", "chunk_data"}])
+    
+    Milvus에서 이 문서의 행을 교체한 것과 같이 기존 청크 행도 같은 트랜잭션에서 교체합니다.
+    """
+    logger = get_run_logger()
+    
+    try:
+        with next(get_db_session()) as session:
+            chunk_service = DocumentChunkService(session)
+            
+            chunk_ids = chunk_service.bulk_create_chunks(
+                doc_id,
+                [build_chunk_record(chunk["page_number"], chunk["chunk_data"], EMBEDDING_DIMENSION) for chunk in chunks],
+                replace=True
+            )
+            
+            logger.info(f"✅ 문서 청크 일괄 저장: {len(chunk_ids)}개")
+            return len(chunk_ids)
+            
+    except Exception as e:
+        logger.error(f"❌ 문서 청크 일괄 저장 실패: {str(e)}")
+        raise
+
 @task(name="업데이트_문서_처리_상태")
 def update_document_processing_status(doc_id: str, status: str, **kwargs):
     """문서 처리 상태 업데이트 (공통 모듈 사용)"""
@@ -226,8 +265,9 @@ def update_job_progress(job_id: str, current_step: str, completed_steps: int = N
         return False
 
 @task(name="완료_처리_작업")
-def complete_processing_job(job_id: str, success_count: int, total_count: int, error_message: str = None):
-    """처리 작업 완료"""
+def complete_processing_job(job_id: str, success_count: int, total_count: int, error_message: str = None,
+                            extra_result: dict = None):
+    """처리 작업 완료 (extra_result는 result_data에 병합)"""
     logger = get_run_logger()
     
     try:
@@ -239,7 +279,7 @@ def complete_processing_job(job_id: str, success_count: int, total_count: int, e
             # 작업 상태 업데이트
             job.status = "completed" if error_message is None else "failed"
             job.completed_at = datetime.utcnow()
-            job.completed_steps = 4  # 모든 단계 완료
+            job.completed_steps = job.total_steps or 4  # 모든 단계(스트리밍 모드는 모든 페이지) 완료
             job.current_step = "완료" if error_message is None else f"실패: {error_message}"
             
             # 결과 데이터 저장
@@ -250,6 +290,8 @@ def complete_processing_job(job_id: str, success_count: int, total_count: int, e
                 "duration_seconds": int((datetime.utcnow() - job.started_at).total_seconds()),
                 "completion_time": datetime.utcnow().isoformat()
             }
+            if extra_result:
+                job.result_data.update(extra_result)
             
             if error_message:
                 job.error_message = error_message
@@ -265,39 +307,28 @@ def complete_processing_job(job_id: str, success_count: int, total_count: int, e
 # Azure OpenAI 임베딩 함수 (별도 API 버전 사용)
 # ===============================
 def get_azure_openai_embedding(text: str) -> List[float]:
-    """Azure OpenAI를 사용하여 텍스트 임베딩을 생성합니다. (임베딩 전용 API 버전)"""
-    try:
-        # Azure OpenAI 클라이언트 생성 (새로운 API 방식)
-        client = openai.AzureOpenAI(
-            azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
-            api_key=config.AZURE_OPENAI_KEY,
-            api_version=config.AZURE_OPENAI_EMBEDDING_API_VERSION
-        )
-        
-        logger.info(f"🔗 임베딩 API 버전: {config.AZURE_OPENAI_EMBEDDING_API_VERSION}")
-        
-        response = client.embeddings.create(
-            model=config.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            input=text
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        logger.error(f"❌ 임베딩 생성 실패: {str(e)}")
-        raise
+    """Azure OpenAI를 사용하여 텍스트 임베딩을 생성합니다. (공유 임베딩 엔진 사용)"""
+    return get_embedding_engine().embed_text(text)
 
 # ===============================
 # 1단계: 텍스트 추출 (Azure AI Search)
 # ===============================
 @task(name="extract_text_from_document")
-def extract_text_from_document(document_path: str, max_pages: int = None) -> Dict[str, Any]:
-    """문서에서 텍스트를 추출합니다."""
+def extract_text_from_document(document_path: str, max_pages: int = None,
+                               checkpoint_key: Tuple[str, str] = None) -> Dict[str, Any]:
+    """
+    문서에서 텍스트를 추출합니다.
+
+    checkpoint_key(문서 ID, 파일 해시)가 있으면 체크포인트에 저장된 페이지는 다시 추출하지 않고,
+    처음으로 빠진 페이지부터 추출한 뒤 결과를 체크포인트에 기록합니다.
+    """
     logger = get_run_logger()
     logger.info(f"📄 텍스트 추출 시작: {document_path}")
     
     try:
-        # PDF 파일 열기
-        doc = fitz.open(document_path)
-        total_pages = len(doc)  # 문서 닫기 전에 페이지 수 저장
+        # PDF 파일 열기 (페이지 수만 확인)
+        with fitz.open(document_path) as doc:
+            total_pages = len(doc)
         
         # 처리할 페이지 수 제한
         if max_pages and max_pages < total_pages:
@@ -306,24 +337,40 @@ def extract_text_from_document(document_path: str, max_pages: int = None) -> Dic
         else:
             pages_to_process = total_pages
         
-        extracted_text = {}
-        
-        for page_num in range(pages_to_process):
-            page = doc.load_page(page_num)
-            text = page.get_text()
-            extracted_text[f"page_{page_num + 1}"] = {
-                "text": text,
-                "page_number": page_num + 1,
-                "word_count": len(text.split())
-            }
-        
-        doc.close()
-        
-        logger.info(f"✅ 텍스트 추출 완료: {len(extracted_text)} 페이지")
+        # 체크포인트에서 이어서 추출할 위치 (앞쪽부터 연속으로 저장된 페이지는 재사용)
+        checkpoint = open_checkpoint(checkpoint_key)
+        resumed_pages = []
+        if checkpoint:
+            while len(resumed_pages) < pages_to_process and checkpoint.extraction(len(resumed_pages) + 1):
+                resumed_pages.append({**checkpoint.extraction(len(resumed_pages) + 1), "from_checkpoint": True})
+            if resumed_pages:
+                logger.info(f"♻️ 체크포인트 재사용: {len(resumed_pages)}페이지 추출 건너뛰기")
+        
+        # 큰 문서는 페이지 구간별 프로세스 병렬 추출, 작은 문서는 직렬 추출
+        extraction = extract_pages(document_path, pages_to_process, start=len(resumed_pages))
+        if checkpoint:
+            checkpoint.save_extraction(extraction["pages"])
+        extracted_text = {f"page_{page['page_number']}": page for page in resumed_pages + extraction["pages"]}
+        logger.info(f"⚙️ 추출 방식: {extraction['mode']} (워커 {extraction['workers']}개)")
+        
+        # 비정상적으로 느린 페이지 기록
+        slow_pages = [page for page in extraction["pages"] if page["extract_seconds"] >= config.EXTRACT_SLOW_PAGE_SECONDS]
+        for page in slow_pages:
+            logger.warning(f"🐢 느린 페이지: {page['page_number']}페이지 {page['extract_seconds']:.2f}초")
+        
+        vision_pages = sum(1 for page_data in extracted_text.values() if page_data["needs_vision"])
+        logger.info(f"✅ 텍스트 추출 완료: {len(extracted_text)} 페이지 (Vision 필요 {vision_pages}페이지)")
         return {
             "document_path": document_path,
             "total_pages": total_pages,
             "extracted_text": extracted_text,
+            "vision_pages": vision_pages,
+            "vision_skipped_pages": len(extracted_text) - vision_pages,
+            "extraction_mode": extraction["mode"],
+            "extraction_workers": extraction["workers"],
+            "resumed_pages": len(resumed_pages),
+            "extraction_seconds": round(sum(page["extract_seconds"] for page in extraction["pages"]), 3),
+            "slowest_pages": slowest_pages(extraction["pages"]),
             "extraction_timestamp": datetime.now().isoformat()
         }
         
@@ -331,46 +378,82 @@ def extract_text_from_document(document_path: str, max_pages: int = None) -> Dic
         logger.error(f"❌ 텍스트 추출 실패: {str(e)}")
         raise
 
+def select_vision_targets(text_result: Dict[str, Any], page_images: List[Dict[str, Any]]) -> Tuple[List[str], List[int], List[str]]:
+    """사전 분류 결과 Vision 설명이 필요한 페이지의 (원본 이미지 경로 목록, 페이지 번호 목록, Vision 입력용 경로 목록)"""
+    vision_pages = {
+        page_data["page_number"]
+        for page_data in text_result["extracted_text"].values()
+        if page_data.get("needs_vision", True)
+    }
+    targets = [page_image for page_image in page_images if page_image["page_number"] in vision_pages]
+    return ([target["image_path"] for target in targets], [target["page_number"] for target in targets],
+            [target["vision_path"] for target in targets])
+
+
+def page_vision_metadata(text_result: Dict[str, Any], page_number: int) -> Dict[str, Any]:
+    """청크 메타데이터에 기록할 페이지의 Vision 생략 여부"""
+    page_data = text_result["extracted_text"].get(f"page_{page_number}", {})
+    return {
+        "vision_skipped": not page_data.get("needs_vision", True),
+        "vision_reason": page_data.get("vision_reason", "")
+    }
+
 # ===============================
 # 2단계: 페이지별 이미지 캡처 및 저장
 # ===============================
 @task(name="capture_page_images")
-def capture_page_images(document_path: str, output_dir: str = None, max_pages: int = None) -> Dict[str, Any]:
-    """PDF의 각 페이지를 이미지로 캡처하여 저장합니다."""
+def capture_page_images(document_path: str, output_dir: str = None, max_pages: int = None,
+                        checkpoint_key: Tuple[str, str] = None) -> Dict[str, Any]:
+    """
+    PDF의 각 페이지를 이미지로 캡처하여 저장합니다.
+
+    원본은 콘텐츠 해시 파일명의 WebP/JPEG(PAGE_IMAGE_FORMAT)로 저장하고, Vision 입력용 축소본과 썸네일을 함께 만듭니다.
+    checkpoint_key가 있으면 체크포인트에 기록된 페이지(파일이 남아 있는 경우)는 다시 렌더링하지 않고,
+    새로 렌더링한 페이지는 한 장씩 바로 기록합니다.
+    """
     logger = get_run_logger()
     logger.info(f"️ 페이지별 이미지 캡처 시작: {document_path}")
     
-    if output_dir is None:
-        output_dir = config.OUTPUT_DIR
-    
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+    store = PageImageStore(output_dir) if output_dir is not None else get_page_image_store()
     
     try:
-        # PDF를 이미지로 변환 (페이지 수 제한)
+        # 페이지 단위 스트리밍 렌더링 (한 번에 한 페이지만 메모리에 유지)
         if max_pages:
             logger.info(f"🖼️ 페이지 수 제한: 처음 {max_pages}페이지만 이미지 변환")
-            images = convert_from_path(document_path, dpi=300, first_page=1, last_page=max_pages)
-        else:
-            images = convert_from_path(document_path, dpi=300)
-        
-        image_paths = []
-        document_name = Path(document_path).stem
         
-        for i, image in enumerate(images):
-            # 페이지별 이미지 저장
-            image_filename = f"{document_name}_page_{i+1}.png"
-            image_path = output_path / image_filename
-            image.save(image_path, "PNG", quality=95)
-            image_paths.append(str(image_path))
+        checkpoint = open_checkpoint(checkpoint_key)
+        page_images = []
+        with fitz.open(document_path) as doc:
+            existing = {}
+            if checkpoint:
+                for page_number in range(1, (min(max_pages, len(doc)) if max_pages else len(doc)) + 1):
+                    record = checkpoint.page_image(page_number, store.image_format)
+                    if record:
+                        existing[page_number] = {**record, "reused": True, "bytes_written": 0,
+                                                 "render_seconds": 0.0, "from_checkpoint": True}
+                if existing:
+                    logger.info(f"♻️ 체크포인트 재사용: {len(existing)}페이지 렌더링 건너뛰기")
             
-            logger.info(f"💾 페이지 {i+1} 이미지 저장: {image_path}")
-        
-        logger.info(f"✅ 이미지 캡처 완료: {len(image_paths)}개 페이지")
+            for page_number, page_image in iter_page_images(doc, store, max_pages, existing=existing):
+                page_images.append({"page_number": page_number, **page_image})
+                if page_number in existing:
+                    continue
+                if checkpoint:
+                    checkpoint.save_page_image(page_number, page_image, store.image_format)
+                state = "재사용" if page_image["reused"] else "저장"
+                logger.info(f"💾 페이지 {page_number} 이미지 {state}: {page_image['image_path']}")
+        
+        reused = sum(1 for page_image in page_images if page_image["reused"])
+        logger.info(f"✅ 이미지 캡처 완료: {len(page_images)}개 페이지 (기존 파일 재사용 {reused}개)")
         return {
             "document_path": document_path,
-            "image_paths": image_paths,
-            "output_directory": str(output_path),
+            "image_paths": [page_image["image_path"] for page_image in page_images],
+            "page_images": page_images,
+            "reused_images": reused,
+            "resumed_images": len(existing),
+            "output_directory": str(store.root),
+            "image_format": store.image_format,
+            "render_dpi": config.RENDER_DPI,
             "capture_timestamp": datetime.now().isoformat()
         }
         
@@ -382,73 +465,55 @@ def capture_page_images(document_path: str, output_dir: str = None, max_pages: i
 # 3단계: GPT를 이용한 이미지 설명 생성 (별도 API 버전 사용)
 # ===============================
 @task(name="generate_image_descriptions")
-def generate_image_descriptions(image_paths: List[str]) -> Dict[str, Any]:
-    """이미지들을 GPT Vision API를 통해 설명을 생성합니다. (GPT Vision 전용 API 버전)"""
+def generate_image_descriptions(image_paths: List[str], page_numbers: List[int], concurrency: int = None,
+                                vision_paths: List[str] = None, checkpoint_key: Tuple[str, str] = None) -> Dict[str, Any]:
+    """
+    이미지들을 GPT Vision API를 통해 설명을 생성합니다. (비동기 병렬 요청, 공유 rate limiter 사용)
+
+    vision_paths(Vision 입력용 축소본)가 있으면 원본 대신 전송하며, 결과 키는 원본 경로(image_paths)입니다.
+    checkpoint_key가 있으면 체크포인트에 설명이 있는 페이지는 요청하지 않고, 새 설명은 페이지마다 바로 기록합니다
+    (실패한 설명은 기록하지 않으므로 재시도 시 다시 요청).
+    """
     logger = get_run_logger()
     logger.info(f"🤖 GPT 이미지 설명 생성 시작: {len(image_paths)}개 이미지")
+    logger.info(f"🔗 GPT Vision API 버전: {config.AZURE_OPENAI_API_VERSION}")
     
     try:
-        # Azure OpenAI 클라이언트 생성 (새로운 API 방식)
-        client = openai.AzureOpenAI(
-            azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
-            api_key=config.AZURE_OPENAI_KEY,
-            api_version=config.AZURE_OPENAI_API_VERSION
-        )
-        
-        logger.info(f"🔗 GPT Vision API 버전: {config.AZURE_OPENAI_API_VERSION}")
-        
+        checkpoint = open_checkpoint(checkpoint_key)
         descriptions = {}
-        
-        for image_path in image_paths:
-            try:
-                # 이미지를 base64로 인코딩
-                with open(image_path, "rb") as image_file:
-                    base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-                
-                # GPT Vision API 호출 (새로운 API 방식)
-                response = client.chat.completions.create(
-                    model=config.AZURE_OPENAI_DEPLOYMENT_NAME,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": "이 이미지의 내용을 자세히 설명해주세요. 텍스트, 차트, 그래프, 표 등 모든 요소를 포함하여 설명해주세요."
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/png;base64,{base64_image}"
-                                    }
-                                }
-                            ]
-                        }
-                    ],
-                    max_tokens=1000
-                )
-                
-                description = response.choices[0].message.content
-                descriptions[image_path] = {
-                    "description": description,
-                    "page_number": int(Path(image_path).stem.split('_')[-1].replace('page_', '')),
-                    "generation_timestamp": datetime.now().isoformat()
-                }
-                
-                logger.info(f"📝 페이지 {descriptions[image_path]['page_number']} 설명 생성 완료")
-                
-            except Exception as e:
-                logger.error(f"❌ 이미지 설명 생성 실패 ({image_path}): {str(e)}")
-                descriptions[image_path] = {
-                    "description": f"설명 생성 실패: {str(e)}",
-                    "page_number": 0,
-                    "generation_timestamp": datetime.now().isoformat()
-                }
-        
-        logger.info(f"✅ 이미지 설명 생성 완료: {len(descriptions)}개")
+        pending = list(zip(image_paths, page_numbers))
+        if checkpoint:
+            for image_path, page_number in pending:
+                description = checkpoint.description(page_number)
+                if description is not None:
+                    descriptions[image_path] = {"description": description, "page_number": page_number,
+                                                "from_checkpoint": True}
+            pending = [(image_path, page_number) for image_path, page_number in pending
+                       if image_path not in descriptions]
+            if descriptions:
+                logger.info(f"♻️ 체크포인트 재사용: {len(descriptions)}페이지 설명 요청 건너뛰기")
+        
+        def _save_description(image_path: str, desc_data: Dict[str, Any]):
+            # 실패한 설명(page_number 0)은 기록하지 않음
+            if checkpoint and desc_data["page_number"]:
+                checkpoint.save_description(desc_data["page_number"], desc_data["description"])
+        
+        describer = VisionDescriber(concurrency=concurrency)
+        descriptions.update(describer.describe_images_sync(
+            pending,
+            dict(zip(image_paths, vision_paths)) if vision_paths else None,
+            on_result=_save_description
+        ))
+        
+        logger.info(f"✅ 이미지 설명 생성 완료: {len(descriptions)}개 "
+                    f"(요청 {describer.stats['api_requests']}회, 재시도 {describer.stats['retries']}회, "
+                    f"캐시 적중 {describer.stats['cache_hits']}개, 미스 {describer.stats['cache_misses']}개)")
         return {
             "image_descriptions": descriptions,
             "total_images": len(image_paths),
+            "resumed_descriptions": len(image_paths) - len(pending),
+            "vision_stats": describer.stats,
+            "page_seconds": describer.page_seconds,
             "generation_timestamp": datetime.now().isoformat()
         }
         
@@ -470,131 +535,86 @@ def create_vector_database(
     logger.info(f"🗄️ Vector DB 구성 시작 (Azure OpenAI 임베딩 사용)")
     
     try:
-        # Milvus Lite 연결
-        connections.connect("default", uri=config.MILVUS_URI)
-        
-        # 기존 컬렉션이 있다면 삭제 (차원 불일치 해결)
-        collection_name = config.MILVUS_COLLECTION_NAME
-        if utility.has_collection(collection_name):
-            logger.info(f"🗑️ 기존 컬렉션 삭제: {collection_name}")
-            utility.drop_collection(collection_name)
-        
-        # 컬렉션 스키마 정의 (페이지별 통합 벡터)
-        fields = [
-            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
-            FieldSchema(name="document_path", dtype=DataType.VARCHAR, max_length=500),
-            FieldSchema(name="page_number", dtype=DataType.INT64),
-            FieldSchema(name="content_type", dtype=DataType.VARCHAR, max_length=50),  # "combined"
-            FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=15000),  # 통합 콘텐츠
-            FieldSchema(name="text_content", dtype=DataType.VARCHAR, max_length=10000),  # 원본 텍스트
-            FieldSchema(name="image_description", dtype=DataType.VARCHAR, max_length=10000),  # 이미지 설명
-            FieldSchema(name="image_path", dtype=DataType.VARCHAR, max_length=1000),  # 이미지 파일 경로
-            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=3072)  # Azure OpenAI text-embedding-3-large
-        ]
-        
-        schema = CollectionSchema(fields, "Document processing pipeline vector collection")
-        
-        # 컬렉션 생성
-        collection = Collection(collection_name, schema)
-        
-        # Milvus Lite 최적화 FLAT 벡터 인덱스 생성
-        index_params = {
-            "metric_type": "COSINE",  # Azure OpenAI 임베딩은 코사인 유사도 사용
-            "index_type": "FLAT",     # Milvus Lite에서 최고 성능
-            "params": {}
-        }
-        collection.create_index("embedding", index_params)
-        logger.info(f"📚 새 컬렉션 생성: {collection_name} (3072차원)")
-        
-        # 데이터 준비 - 페이지별 통합 벡터 방식
-        documents_to_insert = []
-        embeddings_to_insert = []
+        # 컬렉션/인덱스는 없을 때만 생성, 이 문서의 기존 행만 삭제 (증분 적재)
+        collection, deleted_count = prepare_document_collection(document_path)
         
         # 페이지별로 텍스트와 이미지 설명을 통합
         page_data_map = {}
         
-        # 텍스트 데이터 수집
+        # 텍스트 데이터 수집 (청크 분할용 문단/표 단위 포함)
         for page_key, page_data in extracted_text["extracted_text"].items():
             page_num = page_data["page_number"]
-            if page_num not in page_data_map:
-                page_data_map[page_num] = {
-                    "text_content": "",
-                    "image_description": "",
-                    "image_path": ""
-                }
-            if page_data["text"].strip():
-                page_data_map[page_num]["text_content"] = page_data["text"][:10000]
+            page_data_map.setdefault(page_num, {"text_content": "", "image_description": "", "image_path": "", "units": None})
+            page_data_map[page_num]["text_content"] = page_data["text"]
+            page_data_map[page_num]["units"] = page_data.get("units")
         
         # 이미지 설명 데이터 수집
         for image_path, desc_data in image_descriptions["image_descriptions"].items():
             page_num = desc_data["page_number"]
-            if page_num not in page_data_map:
-                page_data_map[page_num] = {
-                    "text_content": "",
-                    "image_description": "",
-                    "image_path": ""
-                }
+            page_data_map.setdefault(page_num, {"text_content": "", "image_description": "", "image_path": "", "units": None})
             if desc_data["description"].strip():
-                page_data_map[page_num]["image_description"] = desc_data["description"][:10000]
+                page_data_map[page_num]["image_description"] = desc_data["description"]
                 page_data_map[page_num]["image_path"] = image_path
         
-        # 페이지별 통합 콘텐츠 생성 및 벡터화
+        # 페이지별 청크 생성 (예산 안의 페이지는 통합 청크 1개, 긴 페이지는 토큰 창 단위로 분할)
+        documents_to_insert = []
         for page_num, page_data in page_data_map.items():
-            # 텍스트와 이미지 설명을 결합
-            combined_content = ""
-            if page_data["text_content"]:
-                combined_content += f"텍스트: {page_data['text_content']}"
-            if page_data["image_description"]:
-                if combined_content:
-                    combined_content += " "
-                combined_content += f"이미지: {page_data['image_description']}"
-            
-            if combined_content.strip():
-                embedding = get_azure_openai_embedding(combined_content)
-                
-                documents_to_insert.append({
-                    "document_path": document_path,
-                    "page_number": page_num,
-                    "content_type": "combined",  # 통합된 콘텐츠
-                    "content": combined_content[:15000],  # 더 긴 길이 허용
-                    "text_content": page_data["text_content"][:10000],
-                    "image_description": page_data["image_description"][:10000],
-                    "image_path": page_data["image_path"]
-                })
-                embeddings_to_insert.append(embedding)
+            documents_to_insert.extend(build_page_chunks(document_path, page_num, **page_data))
+        chunked_pages = len({doc["page_number"] for doc in documents_to_insert if doc["chunk_count"] > 1})
+        logger.info(f"✂️ 청크 분할: {len(documents_to_insert)}개 청크 ({chunked_pages}개 페이지 분할)")
+        
+        # 배치 임베딩 생성 (캐시 우선 조회, 청크 순서 보존)
+        embedding_stats = {}
+        started = time.perf_counter()
+        embeddings_to_insert = get_embedding_engine().embed_texts(
+            [doc.pop("embedding_input") for doc in documents_to_insert],
+            stats=embedding_stats
+        )
+        embed_seconds = time.perf_counter() - started
+        logger.info(f"🗃️ 임베딩 캐시: 적중 {embedding_stats.get('cache_hits', 0)}개, "
+                    f"미스 {embedding_stats.get('cache_misses', 0)}개")
         
-        # 데이터 삽입
+        # 데이터 삽입 (반환된 primary key를 청크 저장에 그대로 사용)
+        milvus_ids = []
+        started = time.perf_counter()
         if documents_to_insert:
             # 컬렉션 로드
             collection.load()
             
-            # 데이터 삽입
-            insert_data = [
-                [doc["document_path"] for doc in documents_to_insert],
-                [doc["page_number"] for doc in documents_to_insert],
-                [doc["content_type"] for doc in documents_to_insert],
-                [doc["content"] for doc in documents_to_insert],
-                [doc["text_content"] for doc in documents_to_insert],
-                [doc["image_description"] for doc in documents_to_insert],
-                [doc["image_path"] for doc in documents_to_insert],
-                embeddings_to_insert
-            ]
-            
-            collection.insert(insert_data)
+            milvus_ids = insert_page_documents(collection, documents_to_insert, embeddings_to_insert)
             collection.flush()
             
             logger.info(f"✅ Vector DB 구성 완료: {len(documents_to_insert)}개 항목 삽입")
         else:
             logger.warning("⚠️ 삽입할 데이터가 없습니다.")
+        milvus_seconds = time.perf_counter() - started
         
         return {
             "collection_name": config.MILVUS_COLLECTION_NAME,
             "total_documents": len(documents_to_insert),
             "combined_documents": len([d for d in documents_to_insert if d["content_type"] == "combined"]),
+            "chunked_pages": chunked_pages,
             "embedding_model": "Azure OpenAI text-embedding-3-large",
             "embedding_api_version": config.AZURE_OPENAI_EMBEDDING_API_VERSION,
-            "embedding_dimension": 3072,
-            "structure": "page_combined_vectors",  # 페이지별 통합 벡터 구조
+            "embedding_dimension": EMBEDDING_DIMENSION,
+            "embedding_vector_type": EMBEDDING_VECTOR_TYPE,
+            "index_type": collection_index_type(collection),
+            "ingest_mode": config.MILVUS_INGEST_MODE,
+            "replaced_documents": deleted_count,
+            "structure": "page_sub_chunk_vectors",  # 페이지 하위 청크 벡터 구조
+            # PostgreSQL 청크 저장용 (Milvus 재조회 불필요)
+            "chunks": [
+                {**document, "milvus_id": str(milvus_id)}
+                for document, milvus_id in zip(documents_to_insert, milvus_ids)
+            ],
+            "embedding_cache": {
+                "hits": embedding_stats.get("cache_hits", 0),
+                "misses": embedding_stats.get("cache_misses", 0),
+                "api_requests": embedding_stats.get("api_requests", 0),
+                "tokens": embedding_stats.get("tokens", 0)
+            },
+            # 단계별 소요 시간 (pipeline_metrics 집계용)
+            "stage_seconds": {"embed": round(embed_seconds, 3), "milvus": round(milvus_seconds, 3)},
             "creation_timestamp": datetime.now().isoformat()
         }
         
@@ -604,56 +624,67 @@ def create_vector_database(
 
 
 # ===============================
-# 하이브리드 검색 함수들
+# 스트리밍 모드: 페이지 단위 파이프라인 (1~4단계 + 청크 저장 동시 진행)
 # ===============================
-@task(name="search_combined_vectors")
-def search_combined_vectors(query: str, top_k: int = 5) -> Dict[str, Any]:
-    """통합 벡터에서 검색 (페이지별 통합 검색)"""
+@task(name="process_document_streaming")
+def process_document_streaming(
+    document_path: str,
+    doc_id: str = None,
+    job_id: str = None,
+    max_pages: int = None,
+    skip_image_processing: bool = False,
+    vision_concurrency: int = None,
+    checkpoint_key: Tuple[str, str] = None,
+) -> Dict[str, Any]:
+    """
+    페이지가 추출 → 렌더링 → 설명 → 임베딩 → 적재 단계를 독립적으로 통과하도록 처리합니다.
+
+    checkpoint_key가 있으면 이전 처리에서 단계별로 끝난 페이지는 건너뜁니다.
+    """
     logger = get_run_logger()
-    logger.info(f"🔍 통합 벡터 검색: {query}")
+    logger.info(f"🌊 페이지 스트리밍 처리 시작: {document_path} (큐 깊이 {config.STREAM_QUEUE_DEPTH})")
     
     try:
-        # Milvus Lite 연결
-        connections.connect("default", uri=config.MILVUS_URI)
-        collection = Collection(config.MILVUS_COLLECTION_NAME)
-        collection.load()
-        
-        # 쿼리를 벡터로 변환
-        query_embedding = get_azure_openai_embedding(query)
-        
-        # 검색 실행
-        search_params = {"metric_type": "COSINE", "params": {}}
-        results = collection.search(
-            [query_embedding],
-            "embedding",
-            search_params,
-            limit=top_k,
-            output_fields=["document_path", "page_number", "content_type", "content", 
-                          "text_content", "image_description", "image_path"]
+        pipeline = StreamingPagePipeline(
+            document_path,
+            doc_id=doc_id,
+            job_id=job_id,
+            max_pages=max_pages,
+            skip_image_processing=skip_image_processing,
+            vision_concurrency=vision_concurrency,
+            checkpoint_key=checkpoint_key
         )
+        result = pipeline.run()
         
-        # 결과 정리
-        search_results = []
-        for hits in results:
-            for hit in hits:
-                search_results.append({
-                    "score": float(hit.score),
-                    "document_path": hit.entity.get("document_path"),
-                    "page_number": hit.entity.get("page_number"),
-                    "content_type": hit.entity.get("content_type"),
-                    "content": hit.entity.get("content"),
-                    "text_content": hit.entity.get("text_content"),
-                    "image_description": hit.entity.get("image_description"),
-                    "image_path": hit.entity.get("image_path")
-                })
+        logger.info(f"✅ 페이지 스트리밍 처리 완료: {result['vector_documents']}개 벡터, "
+                    f"첫 페이지 검색 가능까지 {result['first_page_searchable_seconds'] or 0:.1f}초")
+        return result
         
-        logger.info(f"✅ 통합 벡터 검색 완료: {len(search_results)}개 결과")
-        return {
-            "search_type": "combined_vectors",
-            "query": query,
-            "results": search_results,
-            "total_results": len(search_results)
-        }
+    except Exception as e:
+        logger.error(f"❌ 페이지 스트리밍 처리 실패: {str(e)}")
+        raise
+
+
+# ===============================
+# 하이브리드 검색 함수들
+# ===============================
+@task(name="search_combined_vectors")
+def search_combined_vectors(query: str, top_k: int = 5, collapse_pages: bool = True,
+                            full_fields: bool = False) -> Dict[str, Any]:
+    """
+    통합 벡터에서 검색 (collapse_pages면 청크 결과를 페이지 단위로 합침)
+
+    결과는 id/점수/페이지/미리보기(snippet)만 담습니다. 본문은 get_vector_searcher().expand(results)로
+    펼친 결과만 조회하거나, full_fields=True로 처음부터 전체 필드를 받습니다 (다른 검색 태스크도 같음).
+    """
+    logger = get_run_logger()
+    logger.info(f"🔍 통합 벡터 검색: {query}")
+    
+    try:
+        result = get_vector_searcher().search(query, top_k, "combined", collapse_pages, full_fields=full_fields)
+        result["search_type"] = "combined_vectors"
+        logger.info(f"✅ 통합 벡터 검색 완료: {result['total_results']}개 결과 ({_format_timings(result)})")
+        return result
         
     except Exception as e:
         logger.error(f"❌ 통합 벡터 검색 실패: {str(e)}")
@@ -661,53 +692,16 @@ def search_combined_vectors(query: str, top_k: int = 5) -> Dict[str, Any]:
 
 
 @task(name="search_text_only")
-def search_text_only(query: str, top_k: int = 5) -> Dict[str, Any]:
-    """텍스트 콘텐츠만 검색"""
+def search_text_only(query: str, top_k: int = 5, collapse_pages: bool = True,
+                     full_fields: bool = False) -> Dict[str, Any]:
+    """텍스트 콘텐츠만 검색 (collapse_pages면 청크 결과를 페이지 단위로 합침)"""
     logger = get_run_logger()
     logger.info(f"📝 텍스트 전용 검색: {query}")
     
     try:
-        # Milvus Lite 연결
-        connections.connect("default", uri=config.MILVUS_URI)
-        collection = Collection(config.MILVUS_COLLECTION_NAME)
-        collection.load()
-        
-        # 쿼리를 벡터로 변환
-        query_embedding = get_azure_openai_embedding(query)
-        
-        # 검색 실행
-        search_params = {"metric_type": "COSINE", "params": {}}
-        results = collection.search(
-            [query_embedding],
-            "embedding",
-            search_params,
-            limit=top_k,
-            output_fields=["document_path", "page_number", "content_type", "content", 
-                          "text_content", "image_description", "image_path"]
-        )
-        
-        # 텍스트가 있는 결과만 필터링
-        search_results = []
-        for hits in results:
-            for hit in hits:
-                text_content = hit.entity.get("text_content", "")
-                if text_content.strip():  # 텍스트가 있는 경우만
-                    search_results.append({
-                        "score": float(hit.score),
-                        "document_path": hit.entity.get("document_path"),
-                        "page_number": hit.entity.get("page_number"),
-                        "content_type": "text_only",
-                        "text_content": text_content,
-                        "image_path": hit.entity.get("image_path")
-                    })
-        
-        logger.info(f"✅ 텍스트 전용 검색 완료: {len(search_results)}개 결과")
-        return {
-            "search_type": "text_only",
-            "query": query,
-            "results": search_results,
-            "total_results": len(search_results)
-        }
+        result = get_vector_searcher().search(query, top_k, "text_only", collapse_pages, full_fields=full_fields)
+        logger.info(f"✅ 텍스트 전용 검색 완료: {result['total_results']}개 결과 ({_format_timings(result)})")
+        return result
         
     except Exception as e:
         logger.error(f"❌ 텍스트 전용 검색 실패: {str(e)}")
@@ -715,54 +709,16 @@ def search_text_only(query: str, top_k: int = 5) -> Dict[str, Any]:
 
 
 @task(name="search_image_only")
-def search_image_only(query: str, top_k: int = 5) -> Dict[str, Any]:
-    """이미지 설명만 검색"""
+def search_image_only(query: str, top_k: int = 5, collapse_pages: bool = True,
+                      full_fields: bool = False) -> Dict[str, Any]:
+    """이미지 설명만 검색 (collapse_pages면 청크 결과를 페이지 단위로 합침)"""
     logger = get_run_logger()
     logger.info(f"🖼️ 이미지 전용 검색: {query}")
     
     try:
-        # Milvus Lite 연결
-        connections.connect("default", uri=config.MILVUS_URI)
-        collection = Collection(config.MILVUS_COLLECTION_NAME)
-        collection.load()
-        
-        # 쿼리를 벡터로 변환
-        query_embedding = get_azure_openai_embedding(query)
-        
-        # 검색 실행
-        search_params = {"metric_type": "COSINE", "params": {}}
-        results = collection.search(
-            [query_embedding],
-            "embedding",
-            search_params,
-            limit=top_k,
-            output_fields=["document_path", "page_number", "content_type", "content", 
-                          "text_content", "image_description", "image_path"]
-        )
-        
-        # 이미지 설명이 있는 결과만 필터링
-        search_results = []
-        for hits in results:
-            for hit in hits:
-                image_description = hit.entity.get("image_description", "")
-                image_path = hit.entity.get("image_path", "")
-                if image_description.strip() and image_path:  # 이미지 설명과 경로가 있는 경우만
-                    search_results.append({
-                        "score": float(hit.score),
-                        "document_path": hit.entity.get("document_path"),
-                        "page_number": hit.entity.get("page_number"),
-                        "content_type": "image_only",
-                        "image_description": image_description,
-                        "image_path": image_path
-                    })
-        
-        logger.info(f"✅ 이미지 전용 검색 완료: {len(search_results)}개 결과")
-        return {
-            "search_type": "image_only",
-            "query": query,
-            "results": search_results,
-            "total_results": len(search_results)
-        }
+        result = get_vector_searcher().search(query, top_k, "image_only", collapse_pages, full_fields=full_fields)
+        logger.info(f"✅ 이미지 전용 검색 완료: {result['total_results']}개 결과 ({_format_timings(result)})")
+        return result
         
     except Exception as e:
         logger.error(f"❌ 이미지 전용 검색 실패: {str(e)}")
@@ -770,59 +726,59 @@ def search_image_only(query: str, top_k: int = 5) -> Dict[str, Any]:
 
 
 @task(name="hybrid_search")
-def hybrid_search(query: str, top_k: int = 5, text_weight: float = 0.5, image_weight: float = 0.5) -> Dict[str, Any]:
-    """하이브리드 검색: 텍스트와 이미지를 별도 검색 후 결과 통합"""
+def hybrid_search(query: str, top_k: int = 5, text_weight: float = 0.5, image_weight: float = 0.5,
+                  full_fields: bool = False) -> Dict[str, Any]:
+    """
+    하이브리드 검색: 벡터 검색(텍스트/이미지)과 어휘(BM25) 검색 결과를 RRF로 결합
+
+    벡터 검색과 어휘 검색은 동시에 실행하므로 추가 지연은 두 검색 중 느린 쪽에 가깝습니다.
+    text_weight/image_weight는 벡터 텍스트/이미지 순위 목록의 RRF 가중치, 어휘 목록은 HYBRID_LEXICAL_WEIGHT를 사용합니다.
+    """
     logger = get_run_logger()
-    logger.info(f"🔄 하이브리드 검색: {query} (텍스트 가중치: {text_weight}, 이미지 가중치: {image_weight})")
+    logger.info(f"🔄 하이브리드 검색: {query} (텍스트 가중치: {text_weight}, 이미지 가중치: {image_weight}, "
+                f"어휘 가중치: {config.HYBRID_LEXICAL_WEIGHT})")
     
     try:
-        # 텍스트와 이미지를 별도로 검색
-        text_results = search_text_only(query, top_k)
-        image_results = search_image_only(query, top_k)
-        
-        # 결과 통합 및 가중치 적용
-        combined_results = []
-        
-        # 텍스트 결과 추가
-        for result in text_results["results"]:
-            result["weighted_score"] = result["score"] * text_weight
-            result["search_source"] = "text"
-            combined_results.append(result)
-        
-        # 이미지 결과 추가
-        for result in image_results["results"]:
-            result["weighted_score"] = result["score"] * image_weight
-            result["search_source"] = "image"
-            combined_results.append(result)
-        
-        # 가중치 점수로 정렬
-        combined_results.sort(key=lambda x: x["weighted_score"], reverse=True)
-        
-        # 상위 결과만 반환
-        final_results = combined_results[:top_k]
-        
-        logger.info(f"✅ 하이브리드 검색 완료: {len(final_results)}개 통합 결과")
-        return {
-            "search_type": "hybrid",
-            "query": query,
-            "text_results_count": len(text_results["results"]),
-            "image_results_count": len(image_results["results"]),
-            "combined_results": final_results,
-            "total_results": len(final_results),
-            "weights": {"text": text_weight, "image": image_weight}
-        }
+        result = get_vector_searcher().search(query, top_k, "hybrid",
+                                              text_weight=text_weight, image_weight=image_weight,
+                                              full_fields=full_fields)
+        # 이전 결과 형식 유지
+        result["combined_results"] = result.pop("results")
+        logger.info(f"✅ 하이브리드 검색 완료: {result['total_results']}개 통합 결과 ({_format_timings(result)})")
+        return result
         
     except Exception as e:
         logger.error(f"❌ 하이브리드 검색 실패: {str(e)}")
         raise
 
 
-def comprehensive_search(query: str) -> Dict[str, Any]:
-    """통합 검색: 4가지 검색 방식을 모두 실행하고 설정에 따라 결과 반환"""
+def _format_timings(result: Dict[str, Any]) -> str:
+    """단계별 소요 시간 로그 문자열"""
+    timings = result.get("timings_ms", {})
+    return ", ".join(f"{name[:-3]} {value:.0f}ms" for name, value in timings.items() if name.endswith("_ms"))
+
+
+# comprehensive_search 결과 키 → 검색기 검색 유형
+_COMPREHENSIVE_MODES = (
+    ("combined", "combined", "SEARCH_COMBINED", "통합"),
+    ("text_only", "text_only", "SEARCH_TEXT_ONLY", "텍스트"),
+    ("image_only", "image_only", "SEARCH_IMAGE_ONLY", "이미지"),
+    ("hybrid", "hybrid", "SEARCH_HYBRID", "하이브리드"),
+)
+
+
+def comprehensive_search(query: str, full_fields: bool = False) -> Dict[str, Any]:
+    """
+    통합 검색: 설정에서 켜진 검색 방식을 한 번에 실행
+
+    질의 임베딩은 한 번만 생성하고, 겹치는 하위 검색(하이브리드의 텍스트/이미지 검색)은 한 번만 실행하며,
+    남은 Milvus 검색은 동시에 실행한 뒤 결과를 한 번에 조회합니다 (VectorSearcher.search_many).
+    full_fields=False면 결과는 미리보기만 담고, 본문은 VectorSearcher.expand로 펼친 결과만 조회합니다.
+    """
     logger.info(f"🔍 통합 검색 시작: '{query}'")
     
     try:
-        색 = {
+        search_results = {
             "query": query,
             "search_config": {
                 "combined_enabled": config.SEARCH_COMBINED,
@@ -838,67 +794,37 @@ def comprehensive_search(query: str) -> Dict[str, Any]:
             "results": {}
         }
         
-        # 1. 통합 벡터 검색
-        if config.SEARCH_COMBINED:
-            logger.info("1️⃣ 통합 벡터 검색 실행")
-            try:
-                combined_results = search_combined_vectors(query, config.SEARCH_TOP_K)
-                search_results["results"]["combined"] = combined_results
-                logger.info(f"✅ 통합 검색 완료: {combined_results['total_results']}개 결과")
-            except Exception as e:
-                logger.error(f"❌ 통합 검색 실패: {str(e)}")
-                search_results["results"]["combined"] = {"error": str(e)}
-        
-        # 2. 텍스트 전용 검색
-        if config.SEARCH_TEXT_ONLY:
-            logger.info("2️⃣ 텍스트 전용 검색 실행")
-            try:
-                text_results = search_text_only(query, config.SEARCH_TOP_K)
-                search_results["results"]["text_only"] = text_results
-                logger.info(f"✅ 텍스트 검색 완료: {text_results['total_results']}개 결과")
-            except Exception as e:
-                logger.error(f"❌ 텍스트 검색 실패: {str(e)}")
-                search_results["results"]["text_only"] = {"error": str(e)}
-        
-        # 3. 이미지 전용 검색
-        if config.SEARCH_IMAGE_ONLY:
-            logger.info("3️⃣ 이미지 전용 검색 실행")
-            try:
-                image_results = search_image_only(query, config.SEARCH_TOP_K)
-                search_results["results"]["image_only"] = image_results
-                logger.info(f"✅ 이미지 검색 완료: {image_results['total_results']}개 결과")
-            except Exception as e:
-                logger.error(f"❌ 이미지 검색 실패: {str(e)}")
-                search_results["results"]["image_only"] = {"error": str(e)}
-        
-        # 4. 하이브리드 검색
-        if config.SEARCH_HYBRID:
-            logger.info("4️⃣ 하이브리드 검색 실행")
-            try:
-                hybrid_results = hybrid_search(
-                    query, 
-                    config.SEARCH_TOP_K,
-                    config.HYBRID_TEXT_WEIGHT,
-                    config.HYBRID_IMAGE_WEIGHT
-                )
-                search_results["results"]["hybrid"] = hybrid_results
-                logger.info(f"✅ 하이브리드 검색 완료: {hybrid_results['total_results']}개 결과")
-            except Exception as e:
-                logger.error(f"❌ 하이브리드 검색 실패: {str(e)}")
-                search_results["results"]["hybrid"] = {"error": str(e)}
-        
-        # 결과 요약
-        enabled_searches = []
-        if config.SEARCH_COMBINED:
-            enabled_searches.append("통합")
-        if config.SEARCH_TEXT_ONLY:
-            enabled_searches.append("텍스트")
-        if config.SEARCH_IMAGE_ONLY:
-            enabled_searches.append("이미지")
-        if config.SEARCH_HYBRID:
-            enabled_searches.append("하이브리드")
+        enabled_modes = [mode for mode in _COMPREHENSIVE_MODES if getattr(config, mode[2])]
+        if not enabled_modes:
+            logger.warning("⚠️ 켜진 검색 방식이 없습니다.")
+            return search_results
+        
+        searcher = get_vector_searcher()
+        logger.info(f"🧭 검색 계획: {searcher.plan([mode[1] for mode in enabled_modes])}")
+        mode_results = searcher.search_many(
+            query,
+            config.SEARCH_TOP_K,
+            [mode[1] for mode in enabled_modes],
+            text_weight=config.HYBRID_TEXT_WEIGHT,
+            image_weight=config.HYBRID_IMAGE_WEIGHT,
+            full_fields=full_fields
+        )
         
-        logger.info(f"🎯 검색 완료: {', '.join(enabled_searches)} 검색 실행됨")
+        for result_key, search_type, _, label in enabled_modes:
+            result = mode_results[search_type]
+            if "error" in result:
+                logger.error(f"❌ {label} 검색 실패: {result['error']}")
+            elif search_type == "combined":
+                result["search_type"] = "combined_vectors"
+            elif search_type == "hybrid":
+                # 이전 결과 형식 유지
+                result["combined_results"] = result.pop("results")
+            search_results["results"][result_key] = result
+        
+        timings = next((result["timings_ms"] for result in mode_results.values() if "timings_ms" in result), {})
+        search_results["timings_ms"] = timings
+        logger.info(f"🎯 검색 완료: {', '.join(mode[3] for mode in enabled_modes)} 검색 실행됨 "
+                    f"(하위 검색 {timings.get('sub_searches', 0)}개, {_format_timings({'timings_ms': timings})})")
         
         return search_results
         
@@ -907,6 +833,86 @@ def comprehensive_search(query: str) -> Dict[str, Any]:
         raise
 
 
+def _run_streaming_mode(document_path: str, doc_metadata: Optional[Dict[str, Any]], job_id: Optional[str],
+                        max_pages: int, skip_image_processing: bool,
+                        checkpoint_key: Tuple[str, str] = None) -> Dict[str, Any]:
+    """스트리밍 모드 실행 후 staged 모드와 같은 형태의 결과 반환"""
+    logger = get_run_logger()
+    doc_id = doc_metadata["doc_id"] if doc_metadata else None
+    
+    try:
+        stream_result = process_document_streaming(
+            document_path,
+            doc_id=doc_id,
+            job_id=job_id,
+            max_pages=max_pages,
+            skip_image_processing=skip_image_processing,
+            checkpoint_key=checkpoint_key
+        )
+    except Exception as e:
+        if doc_id and job_id:
+            try:
+                update_document_processing_status(doc_id, "failed", error_log=str(e))
+                complete_processing_job(job_id, 0, 0, str(e))
+            except:
+                pass
+        raise
+    
+    if doc_id:
+        update_document_processing_status(
+            doc_id,
+            "completed",
+            total_pages=stream_result['total_pages'],
+            processed_pages=stream_result['processed_pages'],
+            vector_count=stream_result['vector_documents']
+        )
+    if job_id:
+        complete_processing_job(job_id, stream_result['saved_chunks'], stream_result['vector_documents'],
+                                extra_result={"pipeline_mode": "streaming",
+                                              "first_page_searchable_seconds": stream_result['first_page_searchable_seconds'],
+                                              "embedding_cache": stream_result['embedding_cache'],
+                                              "vision_stats": stream_result['vision_stats'],
+                                              "vision_skipped_pages": stream_result['vision_skipped_pages'],
+                                              "metrics": stream_result['metrics']})
+    publish_document_metrics(stream_result['metrics'])
+    clear_checkpoint(checkpoint_key)
+    
+    logger.info("✅ 문서 처리 파이프라인 완료! (스트리밍 모드)")
+    logger.info(f"   - 총 페이지 수: {stream_result['total_pages']}")
+    logger.info(f"   - Vector DB 항목 수: {stream_result['vector_documents']}")
+    logger.info(f"   - PostgreSQL 저장 청크 수: {stream_result['saved_chunks']}")
+    logger.info(f"   - 단계별 시간: {format_stage_summary(stream_result['metrics'])}")
+    
+    return {
+        "document_path": document_path,
+        "document_metadata": doc_metadata,
+        "pipeline_mode": "streaming",
+        "text_extraction": {"total_pages": stream_result['total_pages']},
+        "image_capture": {"image_paths": stream_result['image_paths']},
+        "image_descriptions": {"total_images": stream_result['generated_descriptions'],
+                               "vision_stats": stream_result['vision_stats']},
+        "vector_database": {
+            "collection_name": config.MILVUS_COLLECTION_NAME,
+            "total_documents": stream_result['vector_documents'],
+            "embedding_model": "Azure OpenAI text-embedding-3-large",
+            "embedding_api_version": config.AZURE_OPENAI_EMBEDDING_API_VERSION,
+            "embedding_dimension": EMBEDDING_DIMENSION,
+            "embedding_vector_type": EMBEDDING_VECTOR_TYPE,
+            "ingest_mode": config.MILVUS_INGEST_MODE,
+            "replaced_documents": stream_result['replaced_documents'],
+            "embedding_cache": stream_result['embedding_cache']
+        },
+        "postgresql_storage": {
+            "enabled": doc_id is not None,
+            "saved_chunks": stream_result['saved_chunks'],
+            "job_id": job_id
+        },
+        "streaming": stream_result,
+        "metrics": stream_result['metrics'],
+        "pipeline_completion_time": datetime.now().isoformat(),
+        "status": "success"
+    }
+
 # ===============================
 # 메인 파이프라인 Flow
 # ===============================
@@ -915,7 +921,8 @@ def comprehensive_search(query: str) -> Dict[str, Any]:
     description="4단계 문서 처리 파이프라인: 텍스트 추출 → 이미지 캡처 → GPT 설명 → Vector DB (분리된 API 버전)",
     task_runner=ConcurrentTaskRunner()
 )
-def document_processing_pipeline(document_path: str, skip_image_processing: bool = False, max_pages: int = None, document_type: str = 'common'):
+def document_processing_pipeline(document_path: str, skip_image_processing: bool = False, max_pages: int = None, document_type: str = 'common',
+                                 pipeline_mode: str = None):
     """
     문서 처리 파이프라인 메인 함수
     
@@ -923,9 +930,11 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
         document_path: 처리할 문서 파일 경로
         skip_image_processing: 이미지 처리 단계를 건너뛸지 여부 (기본값: False)
         max_pages: 처리할 최대 페이지 수 (기본값: None, 전체 페이지 처리)
+        pipeline_mode: "staged"(단계별 일괄 처리) 또는 "streaming"(페이지 단위 스트리밍) (기본값: config.PIPELINE_MODE)
     """
     logger = get_run_logger()
     logger.info(f" 문서 처리 파이프라인 시작: {document_path}")
+    pipeline_mode = (pipeline_mode or config.PIPELINE_MODE).lower()
     
     # 환경 변수 검증
     if not config.validate_config():
@@ -961,13 +970,23 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
             logger.warning(f"⚠️ 문서 메타데이터 생성 실패, 계속 진행: {str(e)}")
             db_initialized = False
     
+    # 단계별 시간/처리량 계측 (result_data["metrics"] 및 워커 Prometheus 텍스트 파일)
+    metrics = PipelineMetrics()
     try:
+        # 페이지 체크포인트 키 (실패 후 다시 실행하면 단계별로 끝난 페이지부터 이어서 처리)
+        checkpoint_key = resolve_checkpoint_key(document_path, doc_metadata)
+        
+        if pipeline_mode == "streaming":
+            return _run_streaming_mode(document_path, doc_metadata, job_id, max_pages, skip_image_processing,
+                                       checkpoint_key)
+        
         # 1단계: 텍스트 추출
         if job_id:
             update_job_progress(job_id, "텍스트 추출 시작", 0)
         
         logger.info("📄 1단계: 텍스트 추출 시작")
-        text_result = extract_text_from_document(document_path, max_pages)
+        with metrics.stage("extract"):
+            text_result = extract_text_from_document(document_path, max_pages, checkpoint_key=checkpoint_key)
         
         if job_id:
             update_job_progress(job_id, f"텍스트 추출 완료 - {text_result['total_pages']}페이지", 1, 
@@ -976,7 +995,7 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
         if skip_image_processing:
             # 이미지 처리 건너뛰기
             logger.info("⏭️ 2-3단계: 이미지 처리 건너뛰기")
-            image_result = {"image_paths": []}
+            image_result = {"image_paths": [], "page_images": []}
             description_result = {"image_descriptions": {}, "total_images": 0}
             
             if job_id:
@@ -988,7 +1007,8 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
                 update_job_progress(job_id, "페이지별 이미지 캡처 시작", 1)
                 
             logger.info("🖼️ 2단계: 페이지별 이미지 캡처 시작")
-            image_result = capture_page_images(document_path, max_pages=max_pages)
+            with metrics.stage("render"):
+                image_result = capture_page_images(document_path, max_pages=max_pages, checkpoint_key=checkpoint_key)
             
             if job_id:
                 update_job_progress(job_id, f"이미지 캡처 완료 - {len(image_result['image_paths'])}개", 2,
@@ -999,7 +1019,13 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
                 update_job_progress(job_id, "GPT 이미지 설명 생성 시작", 2)
                 
             logger.info("🤖 3단계: GPT 이미지 설명 생성 시작")
-            description_result = generate_image_descriptions(image_result["image_paths"])
+            vision_paths, vision_page_numbers, vision_inputs = select_vision_targets(text_result, image_result["page_images"])
+            logger.info(f"🔎 Vision 사전 분류: {len(vision_paths)}개 페이지 설명 생성, "
+                        f"{len(image_result['image_paths']) - len(vision_paths)}개 페이지 생략 (텍스트 추출로 충분)")
+            with metrics.stage("vision"):
+                description_result = generate_image_descriptions(vision_paths, vision_page_numbers,
+                                                                 vision_paths=vision_inputs,
+                                                                 checkpoint_key=checkpoint_key)
             
             if job_id:
                 update_job_progress(job_id, f"GPT 설명 생성 완료 - {description_result['total_images']}개", 3,
@@ -1015,6 +1041,8 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
             description_result, 
             document_path
         )
+        # 임베딩/Milvus 시간은 태스크 결과의 stage_seconds로 기록
+        record_staged_results(metrics, text_result, image_result, description_result, vector_result)
         
         if job_id:
             update_job_progress(job_id, f"Vector DB 구성 완료 - {vector_result['total_documents']}개 벡터", 4,
@@ -1023,37 +1051,33 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
         
         # 5단계: PostgreSQL에 청크 데이터 저장
         saved_chunks = 0
-        if db_initialized and doc_metadata and vector_result.get("total_documents", 0) > 0:
+        storage_failed = False
+        if db_initialized and doc_metadata:
             logger.info("💾 5단계: PostgreSQL에 청크 데이터 저장")
             try:
-                # Milvus에서 방금 삽입된 데이터를 읽어와서 PostgreSQL에 저장
-                connections.connect("default", uri=config.MILVUS_URI)
-                collection = Collection(config.MILVUS_COLLECTION_NAME)
-                collection.load()
-                
-                # 현재 문서의 모든 청크 데이터 조회
-                results = collection.query(
-                    expr=f'document_path == "{document_path}"',
-                    output_fields=["id", "document_path", "page_number", "content_type", 
-                                 "content", "text_content", "image_description", "image_path"]
-                )
-                
-                for doc_data in results:
+                # Milvus 삽입 시 받은 id와 페이로드로 바로 저장 (컬렉션 재조회 없음)
+                chunks = []
+                for chunk in vector_result["chunks"]:
                     chunk_data = {
-                        "content_type": doc_data.get("content_type", "combined"),
-                        "content": doc_data.get("content", ""),
-                        "text_content": doc_data.get("text_content", ""),
-                        "image_description": doc_data.get("image_description", ""),
-                        "image_path": doc_data.get("image_path", ""),
-                        "milvus_id": str(doc_data.get("id", ""))
+                        "content_type": chunk["content_type"],
+                        "content": chunk["content"],
+                        "text_content": chunk["text_content"],
+                        "image_description": chunk["image_description"],
+                        "image_path": chunk["image_path"],
+                        "milvus_id": chunk["milvus_id"],
+                        "chunk_id": chunk["chunk_id"],
+                        "chunk_index": chunk["chunk_index"],
+                        "chunk_count": chunk["chunk_count"],
+                        "char_start": chunk["char_start"],
+                        "char_end": chunk["char_end"],
+                        "token_count": chunk["token_count"],
+                        **page_vision_metadata(text_result, chunk["page_number"])
                     }
-                    
-                    chunk_id = save_document_chunk(
-                        doc_metadata["doc_id"], 
-                        doc_data.get("page_number", 0), 
-                        chunk_data
-                    )
-                    saved_chunks += 1
+                    chunks.append({"page_number": chunk["page_number"], "chunk_data": chunk_data})
+                with metrics.stage("postgres"):
+                    saved_chunks = save_document_chunks(doc_metadata["doc_id"], chunks)
+                metrics.increment("postgres_rows", saved_chunks)
+                metrics.finish()
                     
                 # 문서 처리 상태 업데이트
                 update_document_processing_status(
@@ -1066,12 +1090,17 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
                 
                 # 작업 완료 처리
                 if job_id:
-                    complete_processing_job(job_id, saved_chunks, vector_result['total_documents'])
+                    complete_processing_job(job_id, saved_chunks, vector_result['total_documents'],
+                                            extra_result={"embedding_cache": vector_result.get("embedding_cache"),
+                                                          "vision_stats": description_result.get("vision_stats"),
+                                                          "vision_skipped_pages": text_result.get("vision_skipped_pages", 0),
+                                                          "metrics": metrics.to_dict()})
                     
                 logger.info(f"✅ PostgreSQL 저장 완료: {saved_chunks}개 청크")
                 
             except Exception as e:
                 logger.error(f"❌ PostgreSQL 저장 실패: {str(e)}")
+                storage_failed = True
                 if doc_metadata and job_id:
                     try:
                         update_document_processing_status(doc_metadata["doc_id"], "failed", error_log=str(e))
@@ -1080,6 +1109,11 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
                         pass
         
         # 결과 요약
+        metrics_data = metrics.to_dict()
+        publish_document_metrics(metrics_data)
+        if not storage_failed:
+            # 문서가 실패로 기록된 경우에는 다음 재시도를 위해 체크포인트 유지
+            clear_checkpoint(checkpoint_key)
         pipeline_result = {
             "document_path": document_path,
             "document_metadata": doc_metadata,
@@ -1092,6 +1126,7 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
                 "saved_chunks": saved_chunks,
                 "job_id": job_id
             },
+            "metrics": metrics_data,
             "pipeline_completion_time": datetime.now().isoformat(),
             "status": "success"
         }
@@ -1106,11 +1141,14 @@ def document_processing_pipeline(document_path: str, skip_image_processing: bool
         logger.info(f"   - PostgreSQL 저장 청크 수: {saved_chunks}")
         logger.info(f"   - 사용된 임베딩 모델: {vector_result['embedding_model']}")
         logger.info(f"   - 임베딩 API 버전: {vector_result['embedding_api_version']}")
+        logger.info(f"   - 단계별 시간: {format_stage_summary(metrics_data)}")
         
         return pipeline_result
         
     except Exception as e:
         logger.error(f"❌ 파이프라인 실행 실패: {str(e)}")
+        metrics.finish()
+        publish_document_metrics(metrics.to_dict(), status="failed")
         return {
             "document_path": document_path,
             "status": "failed",
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Azure OpenAI 임베딩 엔진
+- 프로세스 단위로 하나의 AzureOpenAI 클라이언트를 재사용 (TLS 연결 재사용)
+- 여러 텍스트를 입력 수/토큰 예산 내에서 하나의 임베딩 요청으로 묶음
+- 배치 요청을 동시성 제한 하에 병렬 전송하고 입력 순서를 보존
+- 콘텐츠 해시 기반 임베딩 캐시를 먼저 조회하여 변경된 텍스트만 API 호출
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import openai
+from config import config
+from local_cache import EmbeddingCache, get_embedding_cache
+
+logger = logging.getLogger(__name__)
+
+# Azure OpenAI text-embedding-3-large 기본 차원 (이보다 작은 EMBEDDING_DIMENSION은 dimensions 파라미터로 요청)
+DEFAULT_EMBEDDING_DIMENSION = 3072
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (한글 등 비 ASCII 문자는 글자당 1토큰, ASCII는 3글자당 1토큰으로 보수적으로 계산)"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return non_ascii + ascii_chars // 3 + 1
+
+
+class EmbeddingEngine:
+    """장기 유지 클라이언트 기반 배치 임베딩 엔진"""
+
+    def __init__(
+        self,
+        deployment: str = None,
+        max_batch_items: int = None,
+        max_batch_tokens: int = None,
+        max_concurrency: int = None,
+        cache: Optional[EmbeddingCache] = None,
+        dimension: int = None,
+    ):
+        self.deployment = deployment or config.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+        self.dimension = dimension or config.EMBEDDING_DIMENSION
+        if not 0 < self.dimension <= DEFAULT_EMBEDDING_DIMENSION:
+            raise ValueError(f"EMBEDDING_DIMENSION은 1~{DEFAULT_EMBEDDING_DIMENSION} 범위여야 합니다: {self.dimension}")
+        self.max_batch_items = max_batch_items or config.EMBEDDING_BATCH_MAX_ITEMS
+        self.max_batch_tokens = max_batch_tokens or config.EMBEDDING_BATCH_MAX_TOKENS
+        self.max_concurrency = max_concurrency or config.EMBEDDING_MAX_CONCURRENCY
+        self.cache = cache
+
+        self._client: Optional[openai.AzureOpenAI] = None
+        self._client_lock = threading.Lock()
+        # 엔진 전체에서 공유되는 실행기: 여러 문서가 동시에 호출해도 동시 요청 수는 max_concurrency로 제한
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="embedding"
+        )
+
+    @property
+    def client(self) -> openai.AzureOpenAI:
+        """AzureOpenAI 클라이언트 (최초 사용 시 한 번만 생성)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = openai.AzureOpenAI(
+                        azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
+                        api_key=config.AZURE_OPENAI_KEY,
+                        api_version=config.AZURE_OPENAI_EMBEDDING_API_VERSION,
+                        max_retries=config.EMBEDDING_MAX_RETRIES,
+                    )
+                    logger.info(f"🔗 임베딩 클라이언트 생성 (API 버전: {config.AZURE_OPENAI_EMBEDDING_API_VERSION})")
+        return self._client
+
+    def embed_text(self, text: str) -> List[float]:
+        """단일 텍스트 임베딩"""
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: List[str], stats: Dict[str, Any] = None) -> List[List[float]]:
+        """
+        여러 텍스트를 배치로 임베딩 (입력 순서 보존)
+
+        Args:
+            texts: 임베딩할 텍스트 목록
+            stats: 전달 시 cache_hits / cache_misses / api_requests / tokens 카운터를 누적
+        """
+        if not texts:
+            return []
+
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+
+        # 1. 캐시 조회
+        keys = None
+        if self.cache is not None:
+            keys = [self.cache.make_key(self.deployment, self.dimension, text) for text in texts]
+            cached = self.cache.get_vectors(keys)
+            for index, key in enumerate(keys):
+                if key in cached:
+                    embeddings[index] = cached[key]
+
+        # 2. 캐시 미스 텍스트만 API 호출 (동일 텍스트는 한 번만 요청)
+        pending: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            if embeddings[index] is None:
+                pending.setdefault(text, []).append(index)
+        pending_texts = list(pending.keys())
+
+        batches = self._build_batches(pending_texts)
+        if batches:
+            logger.info(f"🧮 임베딩 요청: {len(pending_texts)}개 텍스트 → {len(batches)}개 배치 (동시 {self.max_concurrency}개)")
+
+        futures = [
+            (batch, self._executor.submit(self._embed_batch, [pending_texts[i] for i in batch]))
+            for batch in batches
+        ]
+
+        new_vectors: Dict[str, List[float]] = {}
+        tokens = 0
+        for batch, future in futures:
+            vectors, batch_tokens = future.result()
+            tokens += batch_tokens
+            for batch_index, vector in zip(batch, vectors):
+                text = pending_texts[batch_index]
+                for index in pending[text]:
+                    embeddings[index] = vector
+                if keys is not None:
+                    new_vectors[keys[pending[text][0]]] = vector
+
+        # 3. 새 임베딩 캐시에 저장
+        if new_vectors:
+            self.cache.put_vectors(new_vectors)
+
+        if stats is not None:
+            misses = sum(len(indexes) for indexes in pending.values())
+            stats["cache_hits"] = stats.get("cache_hits", 0) + len(texts) - misses
+            stats["cache_misses"] = stats.get("cache_misses", 0) + misses
+            stats["api_requests"] = stats.get("api_requests", 0) + len(batches)
+            stats["tokens"] = stats.get("tokens", 0) + tokens
+        return embeddings
+
+    def _build_batches(self, texts: List[str]) -> List[List[int]]:
+        """입력 수와 토큰 예산을 넘지 않도록 텍스트 인덱스를 배치로 묶음"""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (
+                len(current) >= self.max_batch_items
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_batch(self, inputs: List[str]) -> Tuple[List[List[float]], int]:
+        """하나의 임베딩 요청 실행 (벡터 목록, 사용 토큰 수)"""
+        try:
+            options = {"dimensions": self.dimension} if self.dimension != DEFAULT_EMBEDDING_DIMENSION else {}
+            response = self.client.embeddings.create(model=self.deployment, input=inputs, **options)
+            tokens = response.usage.total_tokens if response.usage else 0
+            # 응답의 index 기준으로 정렬하여 입력 순서 보장
+            vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            if vectors and len(vectors[0]) != self.dimension:
+                # dimensions를 지원하지 않는 모델(ada-002 등)이면 컬렉션 차원과 어긋나므로 적재 전에 중단
+                raise ValueError(f"임베딩 차원 불일치: 응답 {len(vectors[0])}차원, 설정 {self.dimension}차원")
+            return vectors, tokens
+        except Exception as e:
+            logger.error(f"❌ 임베딩 배치 생성 실패 ({len(inputs)}개 입력): {str(e)}")
+            raise
+
+
+_engine: Optional[EmbeddingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_embedding_engine() -> EmbeddingEngine:
+    """프로세스 전역 임베딩 엔진 반환"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = EmbeddingEngine(cache=get_embedding_cache())
+    return _engine
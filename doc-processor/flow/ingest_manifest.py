@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+배치 수집 매니페스트 (SQLite 파일 기반)
+- 파일 경로별 stat 시그니처(크기, mtime_ns, inode) → 파일 해시, 문서 ID, 처리 상태 기록
+- 재실행 시 시그니처가 같고 처리 완료된 파일은 stat 한 번으로 건너뜀 (파일 내용을 읽지 않음)
+- 시그니처가 바뀐 파일만 전체 해시 계산 (스트리밍, DocumentService와 같은 MD5)
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# SQLite 바인딩 변수 제한(999)을 넘지 않도록 IN 절을 나누는 크기
+_SQLITE_IN_CHUNK = 500
+
+
+def md5_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """파일 MD5 해시 (청크 단위로 읽음, DocumentService의 file_hash와 동일한 값)"""
+    digest = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_signature(file_path: str) -> Tuple[int, int, int]:
+    """파일 stat 시그니처 (크기, mtime_ns, inode)"""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class IngestManifest:
+    """경로별 파일 시그니처와 처리 결과를 기록하는 매니페스트"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or config.INGEST_MANIFEST_PATH)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 여러 태스크 스레드에서 공유 (접근은 self._lock으로 직렬화)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS ingest_manifest (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                file_hash TEXT,
+                doc_id TEXT,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return str(Path(file_path).resolve())
+
+    def get_many(self, file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 경로의 매니페스트 항목 조회 (키: 입력 경로)"""
+        keys = {self._key(path): path for path in file_paths}
+        found: Dict[str, Dict[str, Any]] = {}
+        unique_keys = list(keys)
+        with self._lock:
+            for start in range(0, len(unique_keys), _SQLITE_IN_CHUNK):
+                chunk = unique_keys[start:start + _SQLITE_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"""SELECT path, size, mtime_ns, inode, file_hash, doc_id, status
+                        FROM ingest_manifest WHERE path IN ({placeholders})""",
+                    chunk,
+                ).fetchall()
+                for path, size, mtime_ns, inode, file_hash, doc_id, status in rows:
+                    found[keys[path]] = {
+                        "signature": (size, mtime_ns, inode),
+                        "file_hash": file_hash,
+                        "doc_id": doc_id,
+                        "status": status,
+                    }
+        return found
+
+    def partition_unchanged(self, file_paths: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        변경 없이 처리 완료된 파일과 처리할 파일 분리 (파일당 stat 한 번)
+
+        Returns:
+            (처리할 파일 목록, 건너뛸 파일 목록)
+        """
+        entries = self.get_many(file_paths)
+        pending, unchanged = [], []
+        for file_path in file_paths:
+            entry = entries.get(file_path)
+            try:
+                signature = file_signature(file_path)
+            except OSError:
+                pending.append(file_path)
+                continue
+            if entry and entry["status"] == "completed" and entry["signature"] == signature:
+                unchanged.append(file_path)
+            else:
+                pending.append(file_path)
+        return pending, unchanged
+
+    def resolve_hash(self, file_path: str, signature: Tuple[int, int, int] = None) -> str:
+        """파일 해시 반환 (시그니처가 같으면 기록된 해시 재사용, 바뀌었으면 다시 계산하여 기록)"""
+        signature = signature or file_signature(file_path)
+        entry = self.get_many([file_path]).get(file_path)
+        if entry and entry["signature"] == signature and entry["file_hash"]:
+            return entry["file_hash"]
+
+        file_hash = md5_file(file_path)
+        self.record(file_path, signature, status="hashed", file_hash=file_hash)
+        return file_hash
+
+    def record(self, file_path: str, signature: Tuple[int, int, int], status: str,
+               file_hash: str = None, doc_id: str = None):
+        """처리 결과 기록 (해시/문서 ID가 없으면 같은 시그니처의 기존 값 유지)"""
+        size, mtime_ns, inode = signature
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO ingest_manifest (path, size, mtime_ns, inode, file_hash, doc_id, status, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(path) DO UPDATE SET
+                       file_hash = CASE
+                           WHEN excluded.file_hash IS NOT NULL THEN excluded.file_hash
+                           WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns AND inode = excluded.inode
+                               THEN file_hash
+                       END,
+                       doc_id = CASE
+                           WHEN excluded.doc_id IS NOT NULL THEN excluded.doc_id
+                           WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns AND inode = excluded.inode
+                               THEN doc_id
+                       END,
+                       size = excluded.size,
+                       mtime_ns = excluded.mtime_ns,
+                       inode = excluded.inode,
+                       status = excluded.status,
+                       updated_at = excluded.updated_at""",
+                (self._key(file_path), size, mtime_ns, inode, file_hash, doc_id, status, time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """상태별 항목 수"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM ingest_manifest GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+
+_ingest_manifest: Optional[IngestManifest] = None
+_ingest_manifest_lock = threading.Lock()
+
+
+def get_ingest_manifest() -> Optional[IngestManifest]:
+    """프로세스 전역 수집 매니페스트 반환 (비활성화 시 None)"""
+    global _ingest_manifest
+    if not config.INGEST_MANIFEST_ENABLED:
+        return None
+    if _ingest_manifest is None:
+        with _ingest_manifest_lock:
+            if _ingest_manifest is None:
+                _ingest_manifest = IngestManifest()
+    return _ingest_manifest
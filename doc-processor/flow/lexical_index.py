@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+어휘(BM25) 색인 (SQLite FTS5 파일 기반)
+- 청크의 text_content, image_description을 적재 시점에 색인 (문서 단위 삭제 후 추가, 증분)
+- PLC 디바이스 주소/부품 번호(D100.5, %MX100, FX3U-32MR 등)를 하나의 토큰으로 유지하고 구성 요소도 함께 색인
+- 한글은 음절 바이그램으로 색인하여 조사가 붙은 어절도 일치
+- 벡터 검색이 놓치는 정확한 주소/품번 질의를 hybrid_search에서 RRF로 보완
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# SQLite 바인딩 변수 제한(999)을 넘지 않도록 IN 절을 나누는 크기
+_SQLITE_IN_CHUNK = 500
+
+# 영숫자 토큰 (구분자 . - _ / : 로 이어진 주소/품번 포함, 앞의 %는 IEC 직접 주소 표기) 또는 한글 연속 구간
+_TOKEN = re.compile(r"(?P<code>%?[0-9A-Za-z]+(?:[._\-/:][0-9A-Za-z]+)*)|(?P<hangul>[가-힣]+)")
+_CODE_SEPARATORS = re.compile(r"[%._\-/:]+")
+
+# FTS5 토크나이저가 위 토큰을 다시 나누지 않도록 구분자를 토큰 문자로 지정
+_FTS_TOKENIZE = "unicode61 tokenchars '%.-_/:'"
+
+# bm25() 열 가중치 (text_tokens, image_tokens)
+_COLUMN_WEIGHTS = (1.0, 1.0)
+
+_META_FIELDS = ("document_path", "page_number", "chunk_id", "chunk_index", "char_start", "char_end",
+                "content_type", "text_content", "image_description", "image_path")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    색인/질의 공용 토크나이저
+
+    - 주소/품번: 전체 토큰 + 구분자로 나눈 구성 요소 ("%MX100" → "%mx100", "mx100")
+    - 한글: 음절 바이그램 ("모터의" → "모터", "터의")
+    - 그 외 영숫자 단어: 소문자
+    """
+    tokens: List[str] = []
+    for match in _TOKEN.finditer(text or ""):
+        code = match.group("code")
+        if code:
+            code = code.lower()
+            tokens.append(code)
+            parts = [part for part in _CODE_SEPARATORS.split(code) if part]
+            if len(parts) > 1 or (parts and parts[0] != code):
+                tokens.extend(parts)
+            continue
+
+        hangul = match.group("hangul")
+        if len(hangul) == 1:
+            tokens.append(hangul)
+        else:
+            tokens.extend(hangul[i:i + 2] for i in range(len(hangul) - 1))
+    return tokens
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """질의 토큰을 OR로 묶은 FTS5 MATCH 식 (토큰이 없으면 None)"""
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return None
+    return " OR ".join(f'"{token}"' for token in tokens)
+
+
+class LexicalIndex:
+    """청크 단위 BM25 색인"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or config.LEXICAL_INDEX_PATH)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 적재 스레드와 검색 스레드에서 공유 (접근은 self._lock으로 직렬화)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 원본 필드는 일반 테이블에 두고 FTS 테이블은 같은 rowid로 토큰만 보관 (문서 단위 삭제를 인덱스로 처리)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS lexical_chunks (
+                rowid INTEGER PRIMARY KEY,
+                document_path TEXT NOT NULL,
+                page_number INTEGER NOT NULL,
+                chunk_id TEXT,
+                chunk_index INTEGER,
+                char_start INTEGER,
+                char_end INTEGER,
+                content_type TEXT,
+                text_content TEXT,
+                image_description TEXT,
+                image_path TEXT,
+                milvus_id INTEGER
+            )"""
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(lexical_chunks)")}
+        if "milvus_id" not in columns:
+            # milvus_id 도입 전 색인 (값은 --rebuild-lexical 또는 문서 재처리 시 채워짐)
+            self._conn.execute("ALTER TABLE lexical_chunks ADD COLUMN milvus_id INTEGER")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_lexical_chunks_document ON lexical_chunks (document_path)"
+        )
+        self._conn.execute(
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS lexical_fts USING fts5(
+                text_tokens, image_tokens, tokenize = "{_FTS_TOKENIZE}"
+            )"""
+        )
+        self._conn.commit()
+
+    def add_chunks(self, chunks: Iterable[Dict[str, Any]]) -> int:
+        """청크 행 추가 (vector_store 삽입 행과 같은 필드)"""
+        count = 0
+        with self._lock:
+            for chunk in chunks:
+                text_content = chunk.get("text_content") or ""
+                image_description = chunk.get("image_description") or ""
+                if not text_content.strip() and not image_description.strip():
+                    continue
+                cursor = self._conn.execute(
+                    f"""INSERT INTO lexical_chunks ({', '.join(_META_FIELDS)}, milvus_id)
+                        VALUES ({', '.join('?' * (len(_META_FIELDS) + 1))})""",
+                    [chunk.get(field) for field in _META_FIELDS] + [chunk.get("id")],
+                )
+                self._conn.execute(
+                    "INSERT INTO lexical_fts (rowid, text_tokens, image_tokens) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, " ".join(tokenize(text_content)), " ".join(tokenize(image_description))),
+                )
+                count += 1
+            self._conn.commit()
+        return count
+
+    def delete_document(self, document_path: str, keep_pages: Iterable[int] = None) -> int:
+        """문서의 색인 행 삭제 (keep_pages의 페이지 행은 유지)"""
+        keep_pages = set(keep_pages or ())
+        with self._lock:
+            rowids = [rowid for rowid, page_number in self._conn.execute(
+                "SELECT rowid, page_number FROM lexical_chunks WHERE document_path = ?", (document_path,)
+            ) if page_number not in keep_pages]
+            for start in range(0, len(rowids), _SQLITE_IN_CHUNK):
+                chunk = rowids[start:start + _SQLITE_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                self._conn.execute(f"DELETE FROM lexical_fts WHERE rowid IN ({placeholders})", chunk)
+                self._conn.execute(f"DELETE FROM lexical_chunks WHERE rowid IN ({placeholders})", chunk)
+            self._conn.commit()
+        return len(rowids)
+
+    def clear(self):
+        """전체 색인 삭제 (컬렉션 재생성/재색인 시)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM lexical_fts")
+            self._conn.execute("DELETE FROM lexical_chunks")
+            self._conn.commit()
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        BM25 검색 (점수 내림차순 청크 목록)
+
+        Returns:
+            [{"score": float, "id": Milvus id, "document_path", "page_number", "chunk_id", ...}, ...]
+        """
+        match_query = build_match_query(query)
+        if not match_query:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT -bm25(lexical_fts, {', '.join(map(str, _COLUMN_WEIGHTS))}) AS score, c.milvus_id,
+                           {', '.join('c.' + field for field in _META_FIELDS)}
+                    FROM lexical_fts JOIN lexical_chunks AS c ON c.rowid = lexical_fts.rowid
+                    WHERE lexical_fts MATCH ?
+                    ORDER BY score DESC
+                    LIMIT ?""",
+                (match_query, limit),
+            ).fetchall()
+        return [{"score": float(row[0]), "id": row[1], **dict(zip(_META_FIELDS, row[2:]))} for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """색인된 청크/문서 수"""
+        with self._lock:
+            chunks, documents = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT document_path) FROM lexical_chunks"
+            ).fetchone()
+        return {"chunks": chunks, "documents": documents}
+
+
+_lexical_index: Optional[LexicalIndex] = None
+_lexical_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """프로세스 전역 어휘 색인 반환 (비활성화 시 None)"""
+    global _lexical_index
+    if not config.LEXICAL_INDEX_ENABLED:
+        return None
+    if _lexical_index is None:
+        with _lexical_index_lock:
+            if _lexical_index is None:
+                _lexical_index = LexicalIndex()
+    return _lexical_index
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+로컬 영구 캐시 (SQLite 파일 기반)
+- 문서 재처리 시 변경되지 않은 콘텐츠에 대한 API 재호출 방지
+- 임베딩 캐시(텍스트 해시 키), 페이지 설명 캐시(렌더링 이미지 해시 키)
+- 전체 크기 기준 LRU 제거 (last_access 기준)
+- 프로세스 내 적중/미스 카운터 제공
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import config
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# SQLite 바인딩 변수 제한(999)을 넘지 않도록 IN 절을 나누는 크기
+_SQLITE_IN_CHUNK = 500
+
+
+def sha256_text(text: str) -> str:
+    """텍스트 SHA-256 해시"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sha256_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """파일 SHA-256 해시 (청크 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def difference_hash(image_path: str, hash_size: int = 16) -> str:
+    """이미지 dHash (인접 픽셀 밝기 비교, hash_size² 비트를 16진수 문자열로 반환)"""
+    with Image.open(image_path) as image:
+        image = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = list(image.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    """16진수 해시 간 서로 다른 비트 수"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+class SqliteCache:
+    """크기 제한이 있는 SQLite 키-값 캐시"""
+
+    def __init__(self, db_path: str, max_bytes: int, table: str = "cache_entries"):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 여러 태스크 스레드에서 공유 (접근은 self._lock으로 직렬화)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                cache_key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_last_access ON {self.table} (last_access)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """여러 키 조회 (적중한 항목만 반환, 접근 시각 갱신)"""
+        found: Dict[str, bytes] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique_keys), _SQLITE_IN_CHUNK):
+                chunk = unique_keys[start:start + _SQLITE_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT cache_key, value FROM {self.table} WHERE cache_key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET last_access = ? WHERE cache_key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        """여러 항목 저장 후 크기 제한 초과 시 오래된 항목 제거"""
+        now = time.time()
+        rows = [(key, value, len(value), now) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (cache_key, value, size_bytes, last_access) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._evict_if_needed()
+
+    def _evict_if_needed(self):
+        """전체 크기가 제한을 넘으면 최근 접근이 오래된 항목부터 제거 (제한의 90%까지)"""
+        total_bytes = self._conn.execute(
+            f"SELECT COALESCE(SUM(size_bytes), 0) FROM {self.table}"
+        ).fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        target_bytes = int(self.max_bytes * 0.9)
+        to_delete = []
+        for key, size in self._conn.execute(
+            f"SELECT cache_key, size_bytes FROM {self.table} ORDER BY last_access ASC"
+        ):
+            if total_bytes <= target_bytes:
+                break
+            to_delete.append((key,))
+            total_bytes -= size
+
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE cache_key = ?", to_delete)
+        self._conn.commit()
+        logger.info(f"🧹 캐시 정리 ({self.table}): {len(to_delete)}개 항목 제거")
+
+    def stats(self) -> Dict[str, int]:
+        """프로세스 시작 이후 적중/미스 통계"""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class EmbeddingCache(SqliteCache):
+    """(임베딩 배포, 차원, 콘텐츠 SHA-256) 키 기반 임베딩 캐시"""
+
+    def __init__(self, db_path: str = None, max_mb: int = None):
+        super().__init__(
+            db_path or config.EMBEDDING_CACHE_PATH,
+            (max_mb or config.EMBEDDING_CACHE_MAX_MB) * 1024 * 1024,
+            table="embeddings",
+        )
+
+    @staticmethod
+    def make_key(deployment: str, dimension: int, text: str) -> str:
+        """캐시 키 생성"""
+        return f"{deployment}:{dimension}:{sha256_text(text)}"
+
+    def get_vectors(self, keys: List[str]) -> Dict[str, List[float]]:
+        """키 목록으로 벡터 조회"""
+        vectors = {}
+        for key, value in self.get_many(keys).items():
+            vector = array("f")
+            vector.frombytes(value)
+            vectors[key] = vector.tolist()
+        return vectors
+
+    def put_vectors(self, items: Dict[str, List[float]]):
+        """벡터 저장 (float32)"""
+        self.put_many((key, array("f", vector).tobytes()) for key, vector in items.items())
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """프로세스 전역 임베딩 캐시 반환 (비활성화 시 None)"""
+    global _embedding_cache
+    if not config.EMBEDDING_CACHE_ENABLED:
+        return None
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+    return _embedding_cache
+
+
+class DescriptionCache(SqliteCache):
+    """
+    렌더링된 페이지 이미지 해시 기반 GPT Vision 설명 캐시
+
+    기본은 이미지 파일의 정확한 SHA-256으로 조회하며, hash_mode가 "phash"이면
+    정확히 일치하는 항목이 없을 때 dHash 해밍 거리가 max_distance 이하인 항목을 재사용합니다.
+    """
+
+    def __init__(self, db_path: str = None, max_mb: int = None, hash_mode: str = None, max_distance: int = None):
+        super().__init__(
+            db_path or config.DESCRIPTION_CACHE_PATH,
+            (max_mb or config.DESCRIPTION_CACHE_MAX_MB) * 1024 * 1024,
+            table="descriptions",
+        )
+        self.hash_mode = (hash_mode or config.DESCRIPTION_CACHE_HASH).lower()
+        self.max_distance = config.DESCRIPTION_CACHE_PHASH_MAX_DISTANCE if max_distance is None else max_distance
+        self.similar_hits = 0
+        # 근사 조회용 (네임스페이스별 [(dHash, 캐시 키)]), 최초 조회 시 로드
+        self._phash_index: Dict[str, List[Tuple[str, str]]] = {}
+
+        with self._lock:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS description_hashes (
+                    cache_key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    phash TEXT NOT NULL
+                )"""
+            )
+            self._conn.commit()
+
+    def fingerprint(self, image_path: str) -> Dict[str, Optional[str]]:
+        """이미지 지문 (SHA-256, phash 모드일 때만 dHash 포함)"""
+        return {
+            "sha256": sha256_file(image_path),
+            "phash": difference_hash(image_path) if self.hash_mode == "phash" else None,
+        }
+
+    @staticmethod
+    def make_key(namespace: str, fingerprint: Dict[str, Optional[str]]) -> str:
+        """캐시 키 생성 (네임스페이스: 모델/프롬프트 조합)"""
+        return f"{namespace}:{fingerprint['sha256']}"
+
+    def _load_phash_index(self, namespace: str) -> List[Tuple[str, str]]:
+        if namespace not in self._phash_index:
+            rows = self._conn.execute(
+                "SELECT phash, cache_key FROM description_hashes WHERE namespace = ?", (namespace,)
+            ).fetchall()
+            self._phash_index[namespace] = rows
+        return self._phash_index[namespace]
+
+    def _find_similar(self, namespace: str, phash: str) -> Optional[str]:
+        """해밍 거리가 가장 가까운 항목의 캐시 키 (임계값 초과 시 None)"""
+        with self._lock:
+            candidates = list(self._load_phash_index(namespace))
+        best_key, best_distance = None, self.max_distance + 1
+        for candidate_hash, cache_key in candidates:
+            distance = hamming_distance(phash, candidate_hash)
+            if distance < best_distance:
+                best_key, best_distance = cache_key, distance
+        return best_key
+
+    def get_description(self, namespace: str, fingerprint: Dict[str, Optional[str]]) -> Optional[str]:
+        """설명 조회 (정확 일치 우선, phash 모드면 유사 이미지까지)"""
+        key = self.make_key(namespace, fingerprint)
+        found = self.get_many([key])
+        if key in found:
+            return found[key].decode("utf-8")
+
+        if fingerprint.get("phash"):
+            similar_key = self._find_similar(namespace, fingerprint["phash"])
+            if similar_key:
+                # 제거된 항목을 가리킬 수 있으므로 값이 있을 때만 적중으로 처리
+                found = self.get_many([similar_key])
+                if similar_key in found:
+                    with self._lock:
+                        self.similar_hits += 1
+                    return found[similar_key].decode("utf-8")
+                self._remove_phash(namespace, similar_key)
+        return None
+
+    def _remove_phash(self, namespace: str, cache_key: str):
+        """크기 제한으로 제거된 설명을 가리키는 근사 조회 색인 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM description_hashes WHERE cache_key = ?", (cache_key,))
+            self._conn.commit()
+            if namespace in self._phash_index:
+                self._phash_index[namespace] = [
+                    entry for entry in self._phash_index[namespace] if entry[1] != cache_key
+                ]
+
+    def put_description(self, namespace: str, fingerprint: Dict[str, Optional[str]], description: str):
+        """설명 저장 (phash 모드면 근사 조회 색인도 함께 저장)"""
+        key = self.make_key(namespace, fingerprint)
+        self.put_many([(key, description.encode("utf-8"))])
+        if fingerprint.get("phash"):
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO description_hashes (cache_key, namespace, phash) VALUES (?, ?, ?)",
+                    (key, namespace, fingerprint["phash"]),
+                )
+                self._conn.commit()
+                if namespace in self._phash_index:
+                    # 같은 키를 다시 저장하면 DB 행처럼 기존 항목을 교체 (중복 항목이 쌓이지 않도록)
+                    self._phash_index[namespace] = [
+                        entry for entry in self._phash_index[namespace] if entry[1] != key
+                    ] + [(fingerprint["phash"], key)]
+
+    def stats(self) -> Dict[str, int]:
+        return {**super().stats(), "similar_hits": self.similar_hits}
+
+
+_description_cache: Optional[DescriptionCache] = None
+_description_cache_lock = threading.Lock()
+
+
+def get_description_cache() -> Optional[DescriptionCache]:
+    """프로세스 전역 페이지 설명 캐시 반환 (비활성화 시 None)"""
+    global _description_cache
+    if not config.DESCRIPTION_CACHE_ENABLED:
+        return None
+    if _description_cache is None:
+        with _description_cache_lock:
+            if _description_cache is None:
+                _description_cache = DescriptionCache()
+    return _description_cache
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+페이지 단위 처리 체크포인트 (SQLite 파일 기반)
+- (문서 ID, 파일 해시, 페이지 번호)별 추출 결과, 렌더링 이미지 기록, 이미지 설명, 적재 완료 여부 저장
+- 200페이지 중 180페이지에서 실패한 문서를 다시 처리하면 단계마다 완료된 페이지는 건너뛰고 나머지만 처리
+  (재렌더링/GPT Vision 재호출 없음)
+- 키에 파일 해시가 포함되므로 파일 내용이 바뀌면 이전 체크포인트는 쓰이지 않음
+- 문서 처리가 완료되면 해당 문서의 체크포인트 삭제
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import config
+from ingest_manifest import get_ingest_manifest, md5_file
+
+logger = logging.getLogger(__name__)
+
+# 페이지 단계 결과 열 (JSON 직렬화 여부)
+_JSON_COLUMNS = {"extraction": True, "page_image": True, "description": False}
+
+
+class PageCheckpointStore:
+    """페이지 단계 결과 저장소"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or config.PAGE_CHECKPOINT_PATH)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 여러 태스크 스레드에서 공유 (접근은 self._lock으로 직렬화)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS page_checkpoints (
+                doc_id TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                page_number INTEGER NOT NULL,
+                extraction TEXT,
+                page_image TEXT,
+                description TEXT,
+                embedded INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (doc_id, file_hash, page_number)
+            )"""
+        )
+        self._conn.commit()
+
+    def load(self, doc_id: str, file_hash: str) -> Dict[int, Dict[str, Any]]:
+        """문서의 페이지별 체크포인트 조회 → {페이지 번호: {"extraction", "page_image", "description", "embedded"}}"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT page_number, extraction, page_image, description, embedded
+                   FROM page_checkpoints WHERE doc_id = ? AND file_hash = ?""",
+                (doc_id, file_hash),
+            ).fetchall()
+        return {
+            page_number: {
+                "extraction": json.loads(extraction) if extraction else None,
+                "page_image": json.loads(page_image) if page_image else None,
+                "description": description,
+                "embedded": bool(embedded),
+            }
+            for page_number, extraction, page_image, description, embedded in rows
+        }
+
+    def save(self, doc_id: str, file_hash: str, column: str, values: Iterable[Tuple[int, Any]]):
+        """페이지별 단계 결과 기록 (같은 페이지의 다른 단계 결과는 유지)"""
+        if column not in _JSON_COLUMNS:
+            raise ValueError(f"알 수 없는 체크포인트 항목: {column}")
+        now = time.time()
+        rows = [
+            (doc_id, file_hash, page_number,
+             json.dumps(value, ensure_ascii=False) if _JSON_COLUMNS[column] else value, now)
+            for page_number, value in values
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                f"""INSERT INTO page_checkpoints (doc_id, file_hash, page_number, {column}, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(doc_id, file_hash, page_number) DO UPDATE SET
+                        {column} = excluded.{column},
+                        updated_at = excluded.updated_at""",
+                rows,
+            )
+            self._conn.commit()
+
+    def mark_embedded(self, doc_id: str, file_hash: str, page_numbers: Iterable[int]):
+        """Milvus/PostgreSQL 적재가 끝난 페이지 기록"""
+        rows = [(doc_id, file_hash, page_number, time.time()) for page_number in page_numbers]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                """INSERT INTO page_checkpoints (doc_id, file_hash, page_number, embedded, updated_at)
+                   VALUES (?, ?, ?, 1, ?)
+                   ON CONFLICT(doc_id, file_hash, page_number) DO UPDATE SET
+                       embedded = 1,
+                       updated_at = excluded.updated_at""",
+                rows,
+            )
+            self._conn.commit()
+
+    def clear(self, doc_id: str, file_hash: str) -> int:
+        """문서의 체크포인트 삭제 (처리 완료 시)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM page_checkpoints WHERE doc_id = ? AND file_hash = ?", (doc_id, file_hash)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """체크포인트가 남아 있는 문서/페이지 수"""
+        with self._lock:
+            documents, pages = self._conn.execute(
+                "SELECT COUNT(DISTINCT doc_id || ':' || file_hash), COUNT(*) FROM page_checkpoints"
+            ).fetchone()
+        return {"documents": documents, "pages": pages}
+
+
+class DocumentCheckpoint:
+    """문서 1건의 체크포인트 (시작 시 한 번 읽고, 페이지 단계가 끝날 때마다 바로 기록)"""
+
+    def __init__(self, store: PageCheckpointStore, doc_id: str, file_hash: str):
+        self.store = store
+        self.doc_id = doc_id
+        self.file_hash = file_hash
+        self.pages = store.load(doc_id, file_hash)
+
+    def _page(self, page_number: int) -> Dict[str, Any]:
+        return self.pages.get(page_number) or {}
+
+    def extraction(self, page_number: int) -> Optional[Dict[str, Any]]:
+        return self._page(page_number).get("extraction")
+
+    def page_image(self, page_number: int, image_format: str) -> Optional[Dict[str, Any]]:
+        """저장된 렌더링 기록 (같은 DPI/형식이고 파일이 남아 있을 때만)"""
+        record = self._page(page_number).get("page_image")
+        if not record or record.get("render_dpi") != config.RENDER_DPI or record.get("image_format") != image_format:
+            return None
+        if not all(Path(record[key]).exists() for key in ("image_path", "vision_path")):
+            return None
+        return record
+
+    def description(self, page_number: int) -> Optional[str]:
+        return self._page(page_number).get("description")
+
+    def embedded_pages(self) -> Set[int]:
+        return {page_number for page_number, page in self.pages.items() if page["embedded"]}
+
+    def _remember(self, page_number: int, key: str, value: Any):
+        self.pages.setdefault(
+            page_number, {"extraction": None, "page_image": None, "description": None, "embedded": False}
+        )[key] = value
+
+    def save_extraction(self, pages: List[Dict[str, Any]]):
+        """추출 결과 기록 (page_extraction.extract_page 결과 목록)"""
+        values = [(page["page_number"], page) for page in pages]
+        self.store.save(self.doc_id, self.file_hash, "extraction", values)
+        for page_number, page in values:
+            self._remember(page_number, "extraction", page)
+
+    def save_page_image(self, page_number: int, record: Dict[str, Any], image_format: str):
+        record = {**record, "render_dpi": config.RENDER_DPI, "image_format": image_format}
+        self.store.save(self.doc_id, self.file_hash, "page_image", [(page_number, record)])
+        self._remember(page_number, "page_image", record)
+
+    def save_description(self, page_number: int, description: str):
+        self.store.save(self.doc_id, self.file_hash, "description", [(page_number, description)])
+        self._remember(page_number, "description", description)
+
+    def mark_embedded(self, page_numbers: Iterable[int]):
+        page_numbers = list(page_numbers)
+        self.store.mark_embedded(self.doc_id, self.file_hash, page_numbers)
+        for page_number in page_numbers:
+            self._remember(page_number, "embedded", True)
+
+    def clear(self) -> int:
+        self.pages = {}
+        return self.store.clear(self.doc_id, self.file_hash)
+
+
+_page_checkpoint_store: Optional[PageCheckpointStore] = None
+_page_checkpoint_store_lock = threading.Lock()
+
+
+def get_page_checkpoint_store() -> Optional[PageCheckpointStore]:
+    """프로세스 전역 체크포인트 저장소 반환 (비활성화 시 None)"""
+    global _page_checkpoint_store
+    if not config.PAGE_CHECKPOINT_ENABLED:
+        return None
+    if _page_checkpoint_store is None:
+        with _page_checkpoint_store_lock:
+            if _page_checkpoint_store is None:
+                _page_checkpoint_store = PageCheckpointStore()
+    return _page_checkpoint_store
+
+
+def resolve_checkpoint_key(document_path: str, doc_metadata: Dict[str, Any] = None) -> Optional[Tuple[str, str]]:
+    """
+    체크포인트 키 (문서 ID, 파일 해시) - 비활성화 시 None
+
+    PostgreSQL 없이 실행하면 문서 ID는 빈 문자열이고, 파일 해시는 수집 매니페스트(있으면)로 구합니다.
+    재처리 시 DocumentService는 실패/처리 중 문서의 ID를 그대로 쓰므로 재시도 간 키가 유지됩니다.
+    """
+    if not config.PAGE_CHECKPOINT_ENABLED:
+        return None
+    if doc_metadata:
+        return doc_metadata["doc_id"], doc_metadata["file_hash"]
+    manifest = get_ingest_manifest()
+    return "", manifest.resolve_hash(document_path) if manifest else md5_file(document_path)
+
+
+def open_checkpoint(checkpoint_key: Optional[Tuple[str, str]]) -> Optional[DocumentCheckpoint]:
+    """키에 해당하는 문서 체크포인트 (키가 없거나 비활성화 시 None)"""
+    store = get_page_checkpoint_store() if checkpoint_key else None
+    if store is None:
+        return None
+    return DocumentCheckpoint(store, *checkpoint_key)
+
+
+def clear_checkpoint(checkpoint_key: Optional[Tuple[str, str]]) -> int:
+    """문서 처리 완료 후 체크포인트 삭제 (실패해도 처리 결과에는 영향 없음)"""
+    store = get_page_checkpoint_store() if checkpoint_key else None
+    if store is None:
+        return 0
+    try:
+        return store.clear(*checkpoint_key)
+    except Exception as e:
+        logger.warning(f"⚠️ 페이지 체크포인트 삭제 실패: {str(e)}")
+        return 0
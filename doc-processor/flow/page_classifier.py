@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+GPT Vision 사전 분류기
+- 텍스트 추출 단계에서 fitz 페이지 지표만으로 Vision 설명이 필요한 페이지인지 판단
+- 지표: 텍스트 밀도, 삽입 이미지 수/면적, 벡터 드로잉 수, 표 검출
+- page.get_text()로 충분한 텍스트 전용 페이지는 Vision 호출을 생략
+"""
+
+from typing import Any, Dict
+
+import fitz  # PyMuPDF
+from config import config
+
+
+def _image_area_ratio(page: fitz.Page) -> float:
+    """페이지 면적 대비 삽입 이미지가 차지하는 비율 (겹침은 중복 계산될 수 있음)"""
+    page_rect = page.rect
+    page_area = abs(page_rect) or 1.0
+    covered = 0.0
+    for info in page.get_image_info():
+        covered += abs(fitz.Rect(info["bbox"]) & page_rect)
+    return min(1.0, covered / page_area)
+
+
+def _drawing_count(page: fitz.Page) -> int:
+    """벡터 드로잉(패스) 수 (get_cdrawings가 있으면 더 가벼운 쪽 사용)"""
+    get_drawings = getattr(page, "get_cdrawings", None) or page.get_drawings
+    return len(get_drawings())
+
+
+def _table_count(page: fitz.Page) -> int:
+    """표 검출 수 (PyMuPDF 버전에 따라 미지원이면 0)"""
+    try:
+        return len(page.find_tables().tables)
+    except (AttributeError, RuntimeError, ValueError):
+        return 0
+
+
+def may_contain_tables(page: fitz.Page, metrics: Dict[str, Any]) -> bool:
+    """
+    청크 분할용 표 검출 필요 여부
+
+    분류기가 표 검출 전에 판단을 끝냈거나(vector_drawings 등) 분류기/표 검출이 꺼진 경우에도
+    괘선(드로잉)이 있는 페이지는 표 후보로 봅니다.
+    """
+    if "table_count" in metrics:
+        return bool(metrics["table_count"])
+    drawing_count = metrics.get("drawing_count")
+    if drawing_count is None:
+        drawing_count = _drawing_count(page)
+    return bool(drawing_count)
+
+
+def classify_page(page: fitz.Page, text: str = None) -> Dict[str, Any]:
+    """
+    페이지별 Vision 필요 여부 판단
+
+    비용이 낮은 지표부터 계산하며, 판단이 끝나면 나머지 지표는 계산하지 않습니다.
+
+    Returns:
+        {"needs_vision": bool, "reason": str, "metrics": {...}}
+    """
+    if not config.VISION_CLASSIFIER_ENABLED:
+        return {"needs_vision": True, "reason": "classifier_disabled", "metrics": {}}
+
+    if text is None:
+        text = page.get_text()
+    text_chars = len(text.strip())
+    page_area = abs(page.rect) or 1.0
+    metrics = {
+        "text_chars": text_chars,
+        "text_density": round(text_chars / (page_area / 1000.0), 3),  # 1000pt²당 문자 수
+        "image_count": len(page.get_images()),
+    }
+
+    def _result(needs_vision: bool, reason: str) -> Dict[str, Any]:
+        return {"needs_vision": needs_vision, "reason": reason, "metrics": metrics}
+
+    if metrics["image_count"]:
+        metrics["image_area_ratio"] = round(_image_area_ratio(page), 4)
+        if metrics["image_area_ratio"] >= config.VISION_MIN_IMAGE_AREA_RATIO:
+            return _result(True, "images")
+
+    metrics["drawing_count"] = _drawing_count(page)
+    if metrics["drawing_count"] >= config.VISION_MIN_DRAWINGS:
+        return _result(True, "vector_drawings")
+
+    # find_tables(선 기반)는 페이지당 수십~수백 ms가 걸리므로 괘선(드로잉)이 있는 페이지에서만 실행
+    if config.VISION_DETECT_TABLES and metrics["drawing_count"]:
+        metrics["table_count"] = _table_count(page)
+        if metrics["table_count"]:
+            return _result(True, "tables")
+
+    if metrics["text_density"] < config.VISION_MIN_TEXT_DENSITY:
+        # 텍스트가 희박한데 그림 요소가 일부라도 있으면 Vision으로 보완
+        if metrics["image_count"] or metrics["drawing_count"]:
+            return _result(True, "sparse_text")
+        if not text_chars:
+            return _result(False, "blank")
+
+    return _result(False, "text_only")
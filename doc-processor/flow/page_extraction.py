@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+PDF 페이지 텍스트 추출 (프로세스 풀 병렬화)
+- PyMuPDF 텍스트 추출은 CPU 바운드이므로 큰 문서는 페이지 범위를 나눠 여러 프로세스에서 처리
+- 각 워커는 자신의 fitz 문서를 열고 연속된 페이지 구간을 담당, 결과는 페이지 순서로 병합
+- 작은 문서는 프로세스 기동 비용이 더 크므로 기존과 같이 직렬 처리
+- 페이지별 소요 시간을 기록하여 비정상적으로 느린 페이지 추적
+- 청크 분할용 문단/표 단위를 함께 추출 (chunker.build_page_chunks 입력)
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+from config import config
+from page_classifier import classify_page, may_contain_tables
+
+logger = logging.getLogger(__name__)
+
+
+# ===============================
+# 페이지 → 청크 분할 단위(문단/표)
+# ===============================
+def _table_text(table) -> str:
+    """표 셀을 행 단위 텍스트로 변환 (셀 구분: ' | ')"""
+    rows = []
+    for row in table.extract():
+        cells = [" ".join((cell or "").split()) for cell in row]
+        if any(cells):
+            rows.append(" | ".join(cells))
+    return "\n".join(rows)
+
+
+def page_units(page: fitz.Page, blocks: list = None, detect_tables: bool = False) -> List[Dict[str, str]]:
+    """
+    페이지를 청크 분할 단위로 변환 (읽기 순서 유지)
+
+    Returns:
+        [{"text": str, "kind": "paragraph" | "table"}, ...]
+    """
+    if blocks is None:
+        blocks = page.get_text("blocks")
+    text_blocks = [block for block in blocks if block[6] == 0 and block[4].strip()]
+
+    tables = []
+    if detect_tables:
+        try:
+            tables = [(fitz.Rect(table.bbox), table) for table in page.find_tables().tables]
+        except (AttributeError, RuntimeError, ValueError):
+            tables = []
+
+    units = []
+    emitted = set()
+    for block in text_blocks:
+        rect = fitz.Rect(block[:4])
+        center = fitz.Point((rect.x0 + rect.x1) / 2, (rect.y0 + rect.y1) / 2)
+        table_index = next((i for i, (bbox, _) in enumerate(tables) if center in bbox), None)
+        if table_index is None:
+            units.append({"text": block[4].strip(), "kind": "paragraph"})
+        elif table_index not in emitted:
+            # 표 영역의 첫 블록 위치에 표 전체를 하나의 단위로 배치
+            emitted.add(table_index)
+            table_text = _table_text(tables[table_index][1])
+            if table_text:
+                units.append({"text": table_text, "kind": "table"})
+
+    for table_index, (_, table) in enumerate(tables):
+        if table_index not in emitted:
+            table_text = _table_text(table)
+            if table_text:
+                units.append({"text": table_text, "kind": "table"})
+    return units
+
+
+def extract_page(doc: fitz.Document, page_index: int) -> Dict[str, Any]:
+    """페이지 1장의 텍스트 추출 + Vision 사전 분류 + 청크 분할 단위 (staged/streaming 공용)"""
+    started = time.perf_counter()
+    page = doc.load_page(page_index)
+    # 블록 단위로 한 번만 파싱 (페이지 텍스트는 텍스트 블록을 이어 붙인 것과 동일)
+    blocks = page.get_text("blocks")
+    text = "".join(block[4] for block in blocks if block[6] == 0)
+    # Vision 설명 필요 여부 사전 분류 (텍스트 전용 페이지는 GPT Vision 생략)
+    classification = classify_page(page, text)
+    # 청크 분할 단위 (괘선이 있는 페이지는 Vision 판단과 무관하게 표를 검출해 표 영역을 하나의 단위로 묶음)
+    detect_tables = config.CHUNK_TABLE_AWARE and may_contain_tables(page, classification["metrics"])
+    return {
+        "text": text,
+        "units": page_units(page, blocks, detect_tables),
+        "page_number": page_index + 1,
+        "word_count": len(text.split()),
+        "needs_vision": classification["needs_vision"],
+        "vision_reason": classification["reason"],
+        "vision_metrics": classification["metrics"],
+        "extract_seconds": round(time.perf_counter() - started, 4)
+    }
+
+
+def extract_page_range(document_path: str, start: int, stop: int) -> List[Dict[str, Any]]:
+    """[start, stop) 페이지 구간 추출 (워커 프로세스에서 실행)"""
+    with fitz.open(document_path) as doc:
+        return [extract_page(doc, page_index) for page_index in range(start, stop)]
+
+
+def split_page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """페이지 수를 parts개의 연속 구간으로 균등 분할"""
+    parts = max(1, min(parts, page_count))
+    base, remainder = divmod(page_count, parts)
+    ranges, start = [], 0
+    for index in range(parts):
+        stop = start + base + (1 if index < remainder else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """프로세스 전역 추출 풀 (문서 간 재사용, 스레드가 있는 프로세스이므로 spawn 사용)"""
+    global _extraction_pool
+    if _extraction_pool is None:
+        with _extraction_pool_lock:
+            if _extraction_pool is None:
+                _extraction_pool = ProcessPoolExecutor(
+                    max_workers=config.EXTRACT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _extraction_pool
+
+
+def extract_pages(document_path: str, page_count: int, workers: int = None, start: int = 0) -> Dict[str, Any]:
+    """
+    문서 앞쪽 page_count 페이지 중 start번째(0부터) 이후 페이지 추출 (체크포인트 재개 시 start > 0)
+
+    Returns:
+        {"pages": [...페이지 순서...], "mode": "serial" | "process_pool", "workers": int}
+    """
+    workers = workers or config.EXTRACT_WORKERS
+    if workers <= 1 or page_count - start < config.EXTRACT_PARALLEL_MIN_PAGES:
+        return {"pages": extract_page_range(document_path, start, page_count), "mode": "serial", "workers": 1}
+
+    ranges = [(start + range_start, start + range_stop)
+              for range_start, range_stop in split_page_ranges(page_count - start, workers)]
+    pool = get_extraction_pool()
+    futures = [pool.submit(extract_page_range, document_path, start, stop) for start, stop in ranges]
+
+    pages = []
+    for future in futures:  # 구간 순서대로 병합 → 페이지 순서 보존
+        pages.extend(future.result())
+    return {"pages": pages, "mode": "process_pool", "workers": len(ranges)}
+
+
+def slowest_pages(pages: List[Dict[str, Any]], limit: int = 5) -> List[Dict[str, Any]]:
+    """추출 시간이 가장 긴 페이지 목록"""
+    ranked = sorted(pages, key=lambda page: page["extract_seconds"], reverse=True)[:limit]
+    return [{"page_number": page["page_number"], "extract_seconds": page["extract_seconds"]} for page in ranked]
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+페이지 이미지 저장소 (콘텐츠 주소 기반 파일 저장)
+- 원본(master): 렌더링 픽셀의 SHA-256을 파일명으로 하는 WebP/JPEG (PNG 대비 수 배 작음)
+- Vision 입력용(vision): GPT Vision high detail이 실제로 사용하는 크기(2048 안, 짧은 변 768)로 축소
+- 썸네일(thumb): UI 미리보기용
+- 같은 픽셀의 페이지(빈 페이지, 재처리 문서)는 인코딩/쓰기 없이 기존 파일 재사용
+
+디렉터리 구조:
+    {root}/{해시 앞 2자}/{해시}.webp         원본
+    {root}/{해시 앞 2자}/{해시}_v768.webp    Vision 입력용 (짧은 변 크기)
+    {root}/{해시 앞 2자}/{해시}_t256.webp    썸네일 (긴 변 크기)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import fitz  # PyMuPDF
+from config import config
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# 형식별 확장자와 PIL 저장 옵션
+_FORMATS = {
+    "webp": ("webp", {"format": "WEBP", "method": 4}),
+    "jpeg": ("jpg", {"format": "JPEG", "optimize": True, "progressive": True}),
+}
+
+_MIME_TYPES = {".webp": "image/webp", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png"}
+
+
+def image_mime_type(image_path: str) -> str:
+    """확장자로 data URL MIME 타입 결정 (이전에 저장된 PNG 포함)"""
+    return _MIME_TYPES.get(Path(image_path).suffix.lower(), "image/png")
+
+
+def vision_input_size(width: int, height: int, max_side: int = None, short_side: int = None) -> Tuple[int, int]:
+    """
+    GPT Vision high detail 전처리 후 크기
+
+    max_side×max_side 안에 맞춘 뒤 짧은 변을 short_side로 줄입니다 (확대하지 않음).
+    이보다 큰 이미지를 보내도 모델은 이 크기로 줄여서 보므로 업로드 바이트만 늘어납니다.
+    """
+    max_side = max_side or config.VISION_IMAGE_MAX_SIDE
+    short_side = short_side or config.VISION_IMAGE_SHORT_SIDE
+    scale = min(1.0, max_side / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, short_side / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class PageImageStore:
+    """페이지 원본/Vision 입력용/썸네일 이미지 저장소"""
+
+    def __init__(self, root: str = None, image_format: str = None, quality: int = None, thumbnail_side: int = None):
+        self.root = Path(root or config.OUTPUT_DIR)
+        self.image_format = (image_format or config.PAGE_IMAGE_FORMAT).lower()
+        if self.image_format not in _FORMATS:
+            raise ValueError(f"지원하지 않는 이미지 형식: {self.image_format} (지원: {', '.join(_FORMATS)})")
+        self.quality = quality or config.PAGE_IMAGE_QUALITY
+        self.thumbnail_side = thumbnail_side or config.PAGE_THUMBNAIL_MAX_SIDE
+        self.extension, self._save_options = _FORMATS[self.image_format]
+        self.stats = {"stored": 0, "reused": 0, "bytes_written": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _path(self, content_hash: str, suffix: str = "") -> Path:
+        return self.root / content_hash[:2] / f"{content_hash}{suffix}.{self.extension}"
+
+    def _write(self, image: Image.Image, path: Path) -> int:
+        """임시 파일에 쓴 뒤 이름 변경 (동시에 같은 페이지를 저장해도 깨진 파일이 보이지 않음)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        image.save(tmp_path, quality=self.quality, **self._save_options)
+        os.replace(tmp_path, path)
+        return path.stat().st_size
+
+    def put_pixmap(self, pixmap: fitz.Pixmap) -> Dict[str, Any]:
+        """
+        렌더링된 페이지 저장 (원본 + Vision 입력용 + 썸네일)
+
+        Returns:
+            {"content_hash", "image_path", "vision_path", "thumbnail_path", "width", "height", "reused", "bytes_written"}
+        """
+        if pixmap.alpha or pixmap.n != 3:
+            pixmap = fitz.Pixmap(fitz.csRGB, pixmap, 0)
+        width, height = pixmap.width, pixmap.height
+        samples = pixmap.samples
+        content_hash = hashlib.sha256(f"{width}x{height}:".encode("ascii") + samples).hexdigest()
+
+        vision_size = vision_input_size(width, height)
+        paths = {
+            "image_path": self._path(content_hash),
+            "vision_path": self._path(content_hash, f"_v{min(vision_size)}"),
+            "thumbnail_path": self._path(content_hash, f"_t{self.thumbnail_side}"),
+        }
+        missing = [key for key, path in paths.items() if not path.exists()]
+        written = 0
+        if missing:
+            image = Image.frombytes("RGB", (width, height), samples)
+            for key in missing:
+                if key == "image_path":
+                    rendition = image
+                elif key == "vision_path":
+                    rendition = image.resize(vision_size, Image.LANCZOS) if vision_size != (width, height) else image
+                else:
+                    rendition = image.copy()
+                    rendition.thumbnail((self.thumbnail_side, self.thumbnail_side), Image.LANCZOS)
+                written += self._write(rendition, paths[key])
+            self._count("stored")
+            self._count("bytes_written", written)
+        else:
+            self._count("reused")
+
+        return {
+            "content_hash": content_hash,
+            **{key: str(path) for key, path in paths.items()},
+            "width": width,
+            "height": height,
+            "reused": not missing,
+            "bytes_written": written,
+        }
+
+
+_page_image_store: Optional[PageImageStore] = None
+_page_image_store_lock = threading.Lock()
+
+
+def get_page_image_store() -> PageImageStore:
+    """프로세스 전역 페이지 이미지 저장소 (OUTPUT_DIR 기준)"""
+    global _page_image_store
+    if _page_image_store is None:
+        with _page_image_store_lock:
+            if _page_image_store is None:
+                _page_image_store = PageImageStore()
+    return _page_image_store
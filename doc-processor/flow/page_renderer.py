@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+PDF 페이지 이미지 렌더링 (PyMuPDF)
+- 한 번에 한 페이지씩 렌더링 → 저장소에 기록(원본/Vision 입력용/썸네일) → pixmap 해제
+- 문서 페이지 수와 관계없이 메모리 사용량이 페이지 1장 분량으로 유지됨
+"""
+
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import fitz  # PyMuPDF
+from config import config
+from page_image_store import PageImageStore, get_page_image_store
+
+
+def render_page(page: fitz.Page, store: PageImageStore = None, dpi: int = None) -> Dict[str, Any]:
+    """페이지 1장을 지정 DPI로 렌더링하여 저장 (저장소 기록 + render_seconds 반환)"""
+    started = time.perf_counter()
+    pixmap = page.get_pixmap(dpi=dpi or config.RENDER_DPI)
+    try:
+        page_image = (store or get_page_image_store()).put_pixmap(pixmap)
+        page_image["render_seconds"] = time.perf_counter() - started
+        return page_image
+    finally:
+        # 대용량 pixmap 버퍼 즉시 해제
+        pixmap = None
+
+
+def iter_page_images(
+    doc: fitz.Document,
+    store: PageImageStore = None,
+    max_pages: int = None,
+    dpi: int = None,
+    existing: Optional[Dict[int, Dict[str, Any]]] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    열린 fitz 문서의 페이지를 순서대로 렌더링하며 (페이지 번호, 저장소 기록)을 생성
+
+    existing(페이지 번호 → 이전 기록, 체크포인트 재개 시)에 있는 페이지는 렌더링하지 않고 그 기록을 그대로 생성합니다.
+    """
+    existing = existing or {}
+    pages_to_render = len(doc) if not max_pages else min(max_pages, len(doc))
+    for page_index in range(pages_to_render):
+        page_number = page_index + 1
+        if page_number in existing:
+            yield page_number, existing[page_number]
+        else:
+            yield page_number, render_page(doc.load_page(page_index), store, dpi)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+파이프라인 단계별 시간/처리량 계측
+- 단계별 벽시계 시간(extract, render, vision, embed, milvus, postgres)
+- 페이지 단위 지연 히스토그램 (Prometheus 누적 버킷 형식)
+- API 호출 수, 재시도, 토큰, 기록 바이트 등 카운터
+- 문서 1건의 결과는 ProcessingJob.result_data["metrics"]에 저장하고,
+  워커 프로세스 누적값은 Prometheus 텍스트 파일(PIPELINE_METRICS_TEXTFILE)로 내보냄
+  (node_exporter textfile collector 등에서 수집)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("extract", "render", "vision", "embed", "milvus", "postgres")
+
+# 페이지 지연 히스토그램 상한(초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_METRIC_PREFIX = "docpipe"
+
+
+class LatencyHistogram:
+    """고정 버킷 지연 히스토그램 (버킷별 개수, 합계)"""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """버킷 상한 기준 근사 분위수 (+Inf 버킷이면 마지막 상한)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets + (self.buckets[-1],), self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+    def merge(self, data: Dict[str, Any]):
+        """to_dict() 결과를 더함 (버킷이 같을 때만)"""
+        if tuple(data.get("buckets", ())) != self.buckets:
+            logger.warning("⚠️ 버킷이 다른 히스토그램은 합치지 않습니다.")
+            return
+        self.counts = [a + b for a, b in zip(self.counts, data["counts"])]
+        self.count += data["count"]
+        self.sum += data["sum"]
+
+
+class PipelineMetrics:
+    """문서 1건 또는 워커 누적 계측값 (스레드 안전)"""
+
+    def __init__(self):
+        self.stage_seconds: Dict[str, float] = defaultdict(float)
+        self.page_latency: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, float] = defaultdict(int)
+        self.started_at = time.monotonic()
+        self.wall_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """블록 실행 시간을 단계 시간에 더함"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_seconds(name, time.perf_counter() - started)
+
+    def add_stage_seconds(self, name: str, seconds: float):
+        with self._lock:
+            self.stage_seconds[name] += seconds
+
+    def observe_page(self, stage: str, seconds: float):
+        """페이지 1장의 단계 지연 기록"""
+        with self._lock:
+            histogram = self.page_latency.get(stage)
+            if histogram is None:
+                histogram = self.page_latency[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def observe_pages(self, stage: str, seconds: Iterable[float]):
+        for value in seconds:
+            self.observe_page(stage, value)
+
+    def increment(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_counters(self, prefix: str, stats: Optional[Dict[str, Any]]):
+        """기존 통계 딕셔너리(vision_stats, embedding_stats 등)의 숫자 항목을 prefix_이름 카운터로 누적"""
+        for name, value in (stats or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.increment(f"{prefix}_{name}", value)
+
+    def finish(self):
+        """문서 처리 종료 시각 기록 (pages_per_second 계산용)"""
+        self.wall_seconds = time.monotonic() - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """result_data 저장용 요약"""
+        with self._lock:
+            wall_seconds = self.wall_seconds if self.wall_seconds is not None else time.monotonic() - self.started_at
+            pages = self.counters.get("pages", 0)
+            return {
+                "wall_seconds": round(wall_seconds, 3),
+                "pages_per_second": round(pages / wall_seconds, 3) if wall_seconds > 0 else None,
+                "stage_seconds": {name: round(seconds, 3) for name, seconds in self.stage_seconds.items()},
+                "page_latency_seconds": {stage: histogram.to_dict() for stage, histogram in self.page_latency.items()},
+                "counters": {name: value for name, value in self.counters.items()},
+            }
+
+    def merge(self, data: Dict[str, Any]):
+        """다른 계측값(to_dict 결과)을 누적 (워커/배치 합계용)"""
+        with self._lock:
+            for name, seconds in data.get("stage_seconds", {}).items():
+                self.stage_seconds[name] += seconds
+            for stage, histogram_data in data.get("page_latency_seconds", {}).items():
+                histogram = self.page_latency.get(stage)
+                if histogram is None:
+                    histogram = self.page_latency[stage] = LatencyHistogram(histogram_data["buckets"])
+                histogram.merge(histogram_data)
+            for name, value in data.get("counters", {}).items():
+                self.counters[name] += value
+
+
+def record_staged_results(
+    metrics: PipelineMetrics,
+    text_result: Dict[str, Any] = None,
+    image_result: Dict[str, Any] = None,
+    description_result: Dict[str, Any] = None,
+    vector_result: Dict[str, Any] = None,
+) -> PipelineMetrics:
+    """단계별(staged) 태스크 결과에 담긴 페이지 지연과 카운터를 계측값에 반영 (체크포인트에서 재사용한 페이지는 지연 제외)"""
+    if text_result:
+        pages = list(text_result["extracted_text"].values())
+        metrics.increment("pages", len(pages))
+        metrics.increment("resumed_extract", text_result.get("resumed_pages", 0))
+        metrics.observe_pages("extract", [page.get("extract_seconds", 0.0) for page in pages
+                                          if not page.get("from_checkpoint")])
+    if image_result:
+        page_images = image_result.get("page_images", [])
+        metrics.increment("resumed_render", image_result.get("resumed_images", 0))
+        metrics.observe_pages("render", [page_image["render_seconds"] for page_image in page_images
+                                         if not page_image.get("from_checkpoint")])
+        metrics.increment("image_bytes_written", sum(page_image["bytes_written"] for page_image in page_images))
+        metrics.increment("images_reused", sum(1 for page_image in page_images if page_image["reused"]))
+    if description_result:
+        metrics.increment("resumed_vision", description_result.get("resumed_descriptions", 0))
+        metrics.observe_pages("vision", description_result.get("page_seconds", []))
+        metrics.record_counters("vision", description_result.get("vision_stats"))
+    if vector_result:
+        for stage, seconds in vector_result.get("stage_seconds", {}).items():
+            metrics.add_stage_seconds(stage, seconds)
+        metrics.record_counters("embedding", vector_result.get("embedding_cache"))
+        metrics.increment("milvus_rows", vector_result.get("total_documents", 0))
+    return metrics
+
+
+def format_stage_summary(data: Dict[str, Any]) -> str:
+    """로그용 단계 시간 요약 ("extract 1.2s, render 3.4s, ... | 2.10 pages/s")"""
+    stage_seconds = data.get("stage_seconds", {})
+    ordered = [stage for stage in STAGES if stage in stage_seconds]
+    ordered += sorted(stage for stage in stage_seconds if stage not in STAGES)
+    summary = ", ".join(f"{stage} {stage_seconds[stage]:.1f}s" for stage in ordered) or "단계 기록 없음"
+    if data.get("pages_per_second") is not None:
+        summary += f" | {data['pages_per_second']:.2f} pages/s"
+    return summary
+
+
+def format_report(data: Dict[str, Any]) -> str:
+    """
+    처리량 리포트 (run_batch_pipeline.py --report)
+
+    처리량, 단계별 시간과 비중, 단계별 페이지 지연 p50/p95, API 호출/재시도/토큰/기록 바이트
+    """
+    counters = data.get("counters", {})
+    stage_seconds = data.get("stage_seconds", {})
+    total_stage_seconds = sum(stage_seconds.values())
+    lines = [
+        f"처리량: {counters.get('pages', 0):.0f}페이지 / {data.get('wall_seconds', 0):.1f}초"
+        f" = {data.get('pages_per_second') or 0:.2f} pages/s",
+        "단계별 시간 (문서 합계):",
+    ]
+    for stage in [stage for stage in STAGES if stage in stage_seconds] + \
+                 sorted(stage for stage in stage_seconds if stage not in STAGES):
+        share = stage_seconds[stage] / total_stage_seconds * 100 if total_stage_seconds else 0.0
+        lines.append(f"  {stage:<9} {stage_seconds[stage]:>9.1f}초  {share:5.1f}%")
+
+    latency = data.get("page_latency_seconds", {})
+    if latency:
+        lines.append("페이지 지연 (버킷 상한 기준 근사):")
+        for stage in [stage for stage in STAGES if stage in latency]:
+            histogram = latency[stage]
+            lines.append(f"  {stage:<9} p50 ≤ {histogram['p50']}초, p95 ≤ {histogram['p95']}초 "
+                         f"({histogram['count']}페이지)")
+
+    lines += [
+        "API:",
+        f"  Vision   요청 {counters.get('vision_api_requests', 0):.0f}회, "
+        f"재시도 {counters.get('vision_retries', 0):.0f}회, "
+        f"토큰 {counters.get('vision_tokens', 0):.0f}개, "
+        f"캐시 적중 {counters.get('vision_cache_hits', 0):.0f}개",
+        f"  임베딩   요청 {counters.get('embedding_api_requests', 0):.0f}회, "
+        f"토큰 {counters.get('embedding_tokens', 0):.0f}개, "
+        f"캐시 적중 {counters.get('embedding_hits', 0):.0f}개",
+        f"기록: 이미지 {counters.get('image_bytes_written', 0) / (1024 * 1024):.1f}MB "
+        f"(재사용 {counters.get('images_reused', 0):.0f}페이지), "
+        f"Milvus {counters.get('milvus_rows', 0):.0f}행, PostgreSQL {counters.get('postgres_rows', 0):.0f}행",
+    ]
+    return "\n".join(lines)
+
+
+# ===============================
+# Prometheus 텍스트 형식
+# ===============================
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_prometheus(data: Dict[str, Any], labels: Dict[str, str] = None) -> str:
+    """계측값(to_dict 결과)을 Prometheus 텍스트 노출 형식으로 변환"""
+    labels = labels or {}
+    lines: List[str] = []
+
+    name = f"{_METRIC_PREFIX}_stage_seconds_total"
+    lines += [f"# HELP {name} 단계별 누적 처리 시간(초)", f"# TYPE {name} counter"]
+    for stage, seconds in sorted(data.get("stage_seconds", {}).items()):
+        lines.append(f"{name}{_labels({**labels, 'stage': stage})} {seconds}")
+
+    name = f"{_METRIC_PREFIX}_page_latency_seconds"
+    lines += [f"# HELP {name} 페이지 단위 단계 지연(초)", f"# TYPE {name} histogram"]
+    for stage, histogram in sorted(data.get("page_latency_seconds", {}).items()):
+        cumulative = 0
+        for bound, count in zip(histogram["buckets"] + ["+Inf"], histogram["counts"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels({**labels, 'stage': stage, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_sum{_labels({**labels, 'stage': stage})} {histogram['sum']}")
+        lines.append(f"{name}_count{_labels({**labels, 'stage': stage})} {histogram['count']}")
+
+    for counter, value in sorted(data.get("counters", {}).items()):
+        name = f"{_METRIC_PREFIX}_{counter}_total"
+        lines += [f"# TYPE {name} counter", f"{name}{_labels(labels)} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(data: Dict[str, Any], path: str = None, labels: Dict[str, str] = None) -> Path:
+    """Prometheus 텍스트 파일 기록 (임시 파일 후 이름 변경, 수집기가 쓰는 중인 파일을 읽지 않도록)"""
+    path = Path(path or config.PIPELINE_METRICS_TEXTFILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(render_prometheus(data, labels), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+_worker_metrics: Optional[PipelineMetrics] = None
+_worker_metrics_lock = threading.Lock()
+
+
+def get_worker_metrics() -> PipelineMetrics:
+    """워커 프로세스 누적 계측값"""
+    global _worker_metrics
+    if _worker_metrics is None:
+        with _worker_metrics_lock:
+            if _worker_metrics is None:
+                _worker_metrics = PipelineMetrics()
+    return _worker_metrics
+
+
+def publish_document_metrics(data: Dict[str, Any], status: str = "success"):
+    """문서 1건의 계측값을 워커 누적값에 더하고 Prometheus 텍스트 파일 갱신 (설정 시)"""
+    worker_metrics = get_worker_metrics()
+    worker_metrics.merge(data)
+    worker_metrics.increment(f"documents_{status}")
+    if not config.PIPELINE_METRICS_TEXTFILE:
+        return
+    try:
+        write_prometheus_textfile(worker_metrics.to_dict(), labels={"worker": config.PIPELINE_METRICS_WORKER})
+    except Exception as e:
+        # 계측 실패가 문서 처리를 실패시키지 않도록 경고만 남김
+        logger.warning(f"⚠️ 파이프라인 메트릭 파일 기록 실패: {str(e)}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Azure OpenAI 호출용 토큰 버킷 Rate Limiter
+- 분당 요청 수(RPM)와 분당 토큰 수(TPM)를 동시에 제한
+- 스레드 안전: 배치 파이프라인에서 동시에 처리되는 모든 문서(각자 다른 이벤트 루프)가 공유
+- 429 응답의 Retry-After는 limiter 전체를 일시 정지시켜 다른 요청도 함께 대기
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from config import config
+
+
+class TokenBucketRateLimiter:
+    """RPM/TPM 이중 토큰 버킷 (예약 방식: 잔량이 음수가 되면 그만큼 대기)"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_bucket = float(requests_per_minute)
+        self._token_bucket = float(tokens_per_minute)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """경과 시간만큼 버킷 충전 (최대 용량까지)"""
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._request_bucket = min(
+            float(self.requests_per_minute),
+            self._request_bucket + elapsed * self.requests_per_minute / 60.0,
+        )
+        self._token_bucket = min(
+            float(self.tokens_per_minute),
+            self._token_bucket + elapsed * self.tokens_per_minute / 60.0,
+        )
+
+    def reserve(self, tokens: int) -> float:
+        """요청 1건과 토큰을 예약하고 대기해야 할 시간(초)을 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._request_bucket -= 1
+            self._token_bucket -= min(tokens, self.tokens_per_minute)
+
+            wait = max(0.0, self._paused_until - now)
+            if self._request_bucket < 0:
+                wait = max(wait, -self._request_bucket * 60.0 / self.requests_per_minute)
+            if self._token_bucket < 0:
+                wait = max(wait, -self._token_bucket * 60.0 / self.tokens_per_minute)
+            return wait
+
+    async def acquire(self, tokens: int):
+        """예약 후 필요한 만큼 비동기 대기"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """실제 사용 토큰으로 예약량 보정"""
+        with self._lock:
+            self._token_bucket += estimated_tokens - actual_tokens
+
+    def pause(self, seconds: float):
+        """Retry-After 동안 모든 요청 일시 정지"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_vision_limiter: Optional[TokenBucketRateLimiter] = None
+_vision_limiter_lock = threading.Lock()
+
+
+def get_vision_rate_limiter() -> TokenBucketRateLimiter:
+    """프로세스 전역 GPT Vision rate limiter (모든 문서가 공유)"""
+    global _vision_limiter
+    if _vision_limiter is None:
+        with _vision_limiter_lock:
+            if _vision_limiter is None:
+                _vision_limiter = TokenBucketRateLimiter(
+                    config.VISION_REQUESTS_PER_MINUTE, config.VISION_TOKENS_PER_MINUTE
+                )
+    return _vision_limiter
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+페이지 단위 스트리밍 문서 처리
+- 추출·렌더링 → 이미지 설명 → 임베딩 → 적재 단계를 스레드로 실행하고 단계 사이를 크기 제한 큐로 연결
+- 각 페이지가 단계를 독립적으로 통과하므로 문서 전체가 끝나기 전에 앞 페이지부터 검색 가능
+- 메모리 사용량은 문서 페이지 수가 아닌 큐 깊이에 비례
+- 단계 시간은 각 단계가 실제로 일한 시간 (단계가 동시에 진행되므로 합계가 전체 처리 시간보다 클 수 있음)
+- 페이지 체크포인트(checkpoint_key)가 있으면 이전 처리에서 끝난 페이지 단계는 건너뜀 (적재까지 끝난 페이지는 행 유지)
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+from chunker import build_page_chunks
+from config import config
+from database import build_chunk_record, get_db_session
+from embedding_engine import get_embedding_engine
+from page_checkpoint import open_checkpoint
+from page_extraction import extract_page
+from page_image_store import PageImageStore, get_page_image_store
+from page_renderer import render_page
+from pipeline_metrics import PipelineMetrics
+from vector_store import (
+    EMBEDDING_DIMENSION,
+    insert_page_documents,
+    prepare_document_collection,
+)
+from vision_describer import VisionDescriber
+
+from shared_core import DocumentChunkService, ProcessingJobService
+
+logger = logging.getLogger(__name__)
+
+# 단계 종료 신호
+_DONE = object()
+
+# 큐 대기 중 중단 여부를 확인하는 주기 (초)
+_POLL_SECONDS = 0.5
+
+
+class StreamingPagePipeline:
+    """단일 문서를 페이지 단위로 흘려보내는 파이프라인"""
+
+    def __init__(
+        self,
+        document_path: str,
+        doc_id: str = None,
+        job_id: str = None,
+        output_dir: str = None,
+        max_pages: int = None,
+        skip_image_processing: bool = False,
+        queue_depth: int = None,
+        embed_batch_size: int = None,
+        insert_batch_size: int = None,
+        vision_concurrency: int = None,
+        checkpoint_key: Tuple[str, str] = None,
+    ):
+        self.document_path = document_path
+        self.doc_id = doc_id
+        self.job_id = job_id
+        self.image_store = PageImageStore(output_dir) if output_dir else get_page_image_store()
+        self.max_pages = max_pages
+        self.skip_image_processing = skip_image_processing
+        self.queue_depth = queue_depth or config.STREAM_QUEUE_DEPTH
+        self.embed_batch_size = embed_batch_size or config.STREAM_EMBED_BATCH_SIZE
+        self.insert_batch_size = insert_batch_size or config.STREAM_INSERT_BATCH_SIZE
+        self.describer = VisionDescriber(concurrency=vision_concurrency)
+        self.checkpoint = open_checkpoint(checkpoint_key)
+        # 이전 처리에서 Milvus/PostgreSQL 적재까지 끝난 페이지 (recreate 모드는 컬렉션을 새로 만들므로 재사용 안 함)
+        self.embedded_pages = (
+            self.checkpoint.embedded_pages()
+            if self.checkpoint and config.MILVUS_INGEST_MODE != "recreate" else set()
+        )
+        self.resumed_pages = {"extract": 0, "render": 0, "vision": 0, "embed": 0}
+
+        self._stop = threading.Event()
+        self._errors: List[str] = []
+        self._started_at = 0.0
+
+        self.total_pages = 0
+        self.pages_to_process = 0
+        self.image_paths: List[str] = []
+        self.descriptions = 0
+        self.vision_skipped_pages = 0
+        # 완료 페이지 수 (적재 단계와 청크 없는 페이지를 넘기는 임베딩 단계가 함께 갱신)
+        self.inserted_pages = len(self.embedded_pages)
+        self._progress_lock = threading.Lock()
+        self.inserted_chunks = 0
+        self.saved_chunks = 0
+        self.replaced_documents = 0
+        self.first_page_searchable_seconds: Optional[float] = None
+        self.embedding_stats: Dict[str, int] = {}
+        self.metrics = PipelineMetrics()
+
+    # ===============================
+    # 큐 유틸리티
+    # ===============================
+    def _put(self, out_queue: queue.Queue, item: Any):
+        """큐가 가득 차면 대기 (다른 단계 실패 시 중단)"""
+        while not self._stop.is_set():
+            try:
+                out_queue.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, in_queue: queue.Queue, timeout: float = None) -> Any:
+        """큐에서 항목을 꺼냄 (timeout 경과 시 None, 다른 단계 실패 시 _DONE)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stop.is_set():
+            wait = _POLL_SECONDS if deadline is None else min(_POLL_SECONDS, deadline - time.monotonic())
+            if wait <= 0:
+                return None
+            try:
+                return in_queue.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _collect_batch(self, in_queue: queue.Queue, batch_size: int) -> tuple:
+        """마이크로 배치 수집: 배치가 차거나 입력이 잠시 끊기면 반환 → (items, 종료 여부)"""
+        items = []
+        item = self._get(in_queue)
+        while item is not _DONE:
+            items.append(item)
+            if len(items) >= batch_size:
+                return items, False
+            item = self._get(in_queue, timeout=config.STREAM_FLUSH_SECONDS)
+            if item is None:
+                return items, False
+        # 다른 단계가 실패한 경우 남은 항목은 버림
+        return ([] if self._stop.is_set() else items), True
+
+    def _run_stage(self, name: str, stage, out_queue: Optional[queue.Queue]):
+        """단계 실행 래퍼: 실패 시 전체 중단, 정상 종료 시 다음 단계에 종료 신호 전달"""
+        try:
+            stage()
+        except Exception as e:
+            logger.error(f"❌ 스트리밍 단계 실패 ({name}): {str(e)}")
+            self._errors.append(f"{name}: {str(e)}")
+            self._stop.set()
+            return
+        if out_queue is not None:
+            self._put(out_queue, _DONE)
+
+    # ===============================
+    # 단계 1: 텍스트 추출 + 페이지 렌더링
+    # ===============================
+    def _extract_stage(self, out_queue: queue.Queue):
+        """한 번 연 문서에서 페이지별 텍스트 추출과 이미지 렌더링을 함께 수행"""
+        with fitz.open(self.document_path) as doc:
+            self.total_pages = len(doc)
+            self.pages_to_process = min(self.max_pages, self.total_pages) if self.max_pages else self.total_pages
+            self._update_job_progress("페이지 스트리밍 처리 시작")
+
+            for page_index in range(self.pages_to_process):
+                if self._stop.is_set():
+                    return
+                page_number = page_index + 1
+                self.metrics.increment("pages")
+                if page_number in self.embedded_pages:
+                    # 이전 처리에서 적재까지 끝난 페이지는 다음 단계로 보내지 않음
+                    self.resumed_pages["embed"] += 1
+                    continue
+
+                extraction = self.checkpoint.extraction(page_number) if self.checkpoint else None
+                if extraction:
+                    self.resumed_pages["extract"] += 1
+                else:
+                    started = time.perf_counter()
+                    extraction = extract_page(doc, page_index)
+                    extract_seconds = time.perf_counter() - started
+                    self.metrics.add_stage_seconds("extract", extract_seconds)
+                    self.metrics.observe_page("extract", extract_seconds)
+                    if self.checkpoint:
+                        self.checkpoint.save_extraction([extraction])
+                item = {
+                    "page_number": page_number,
+                    "text": extraction["text"],
+                    "units": extraction["units"],
+                    "image_path": "",
+                    "vision_path": "",
+                    "needs_vision": extraction["needs_vision"],
+                    "vision_reason": extraction["vision_reason"],
+                }
+                if not extraction["needs_vision"]:
+                    self.vision_skipped_pages += 1
+
+                if not self.skip_image_processing:
+                    self._attach_page_image(doc, page_index, item)
+
+                self._put(out_queue, item)
+
+    def _attach_page_image(self, doc: fitz.Document, page_index: int, item: Dict[str, Any]):
+        """페이지 이미지(체크포인트 기록 또는 새 렌더링)와 체크포인트의 이미지 설명을 항목에 추가"""
+        page_number = item["page_number"]
+        page_image = self.checkpoint.page_image(page_number, self.image_store.image_format) if self.checkpoint else None
+        if page_image:
+            self.resumed_pages["render"] += 1
+        else:
+            page_image = render_page(doc.load_page(page_index), self.image_store)
+            self.metrics.add_stage_seconds("render", page_image["render_seconds"])
+            self.metrics.observe_page("render", page_image["render_seconds"])
+            self.metrics.increment("image_bytes_written", page_image["bytes_written"])
+            self.metrics.increment("images_reused", int(page_image["reused"]))
+            if self.checkpoint:
+                self.checkpoint.save_page_image(page_number, page_image, self.image_store.image_format)
+        item["image_path"] = page_image["image_path"]
+        item["vision_path"] = page_image["vision_path"]
+        self.image_paths.append(item["image_path"])
+
+        description = self.checkpoint.description(page_number) if self.checkpoint else None
+        if item["needs_vision"] and description is not None:
+            # 설명 단계에서 Vision 요청 없이 그대로 전달
+            item["description"] = description
+            self.resumed_pages["vision"] += 1
+
+    # ===============================
+    # 단계 2: GPT Vision 설명 (asyncio)
+    # ===============================
+    def _describe_stage(self, in_queue: queue.Queue, out_queue: queue.Queue):
+        """이미지 설명을 동시성 제한 하에 생성하며, 끝난 페이지부터 다음 단계로 전달"""
+        if self.skip_image_processing:
+            item = self._get(in_queue)
+            while item is not _DONE:
+                self._put(out_queue, item)
+                item = self._get(in_queue)
+            return
+        asyncio.run(self._describe_pages(in_queue, out_queue))
+
+    async def _describe_pages(self, in_queue: queue.Queue, out_queue: queue.Queue):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.describer.concurrency)
+        client = self.describer.create_client()
+        pending = set()
+        # 요청이 하나라도 진행 중인 구간만 vision 단계 시간으로 기록 (같은 이벤트 루프에서만 갱신)
+        in_flight = {"count": 0, "since": 0.0}
+
+        async def _describe(item: Dict[str, Any]):
+            if in_flight["count"] == 0:
+                in_flight["since"] = time.perf_counter()
+            in_flight["count"] += 1
+            try:
+                try:
+                    desc_data = await self.describer.describe_page(client, item["image_path"], item["page_number"],
+                                                                   item["vision_path"])
+                finally:
+                    in_flight["count"] -= 1
+                    if in_flight["count"] == 0:
+                        self.metrics.add_stage_seconds("vision", time.perf_counter() - in_flight["since"])
+                # 실패한 설명(page_number 0)은 임베딩 대상에서 제외
+                item["description"] = desc_data["description"] if desc_data["page_number"] else ""
+                self.descriptions += 1
+                if self.checkpoint and desc_data["page_number"]:
+                    self.checkpoint.save_description(item["page_number"], item["description"])
+                await loop.run_in_executor(None, self._put, out_queue, item)
+            finally:
+                semaphore.release()
+
+        try:
+            while True:
+                item = await loop.run_in_executor(None, self._get, in_queue)
+                if item is _DONE:
+                    break
+                if not item["needs_vision"] or "description" in item:
+                    # 텍스트 추출로 충분한 페이지와 체크포인트에 설명이 있는 페이지는 Vision 없이 바로 전달
+                    await loop.run_in_executor(None, self._put, out_queue, item)
+                    continue
+                await semaphore.acquire()
+                task = asyncio.create_task(_describe(item))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            await client.close()
+
+    # ===============================
+    # 단계 3: 임베딩 (마이크로 배치)
+    # ===============================
+    def _embed_stage(self, in_queue: queue.Queue, out_queue: queue.Queue):
+        """페이지 청크를 마이크로 배치로 임베딩 (한 페이지의 청크는 순서대로 연속 전달)"""
+        engine = get_embedding_engine()
+        done = False
+        while not done:
+            items, done = self._collect_batch(in_queue, self.embed_batch_size)
+            documents = []
+            empty_pages = []
+            for item in items:
+                chunks = build_page_chunks(
+                    self.document_path,
+                    item["page_number"],
+                    text_content=item["text"],
+                    image_description=item.get("description", ""),
+                    image_path=item["image_path"],
+                    units=item["units"],
+                )
+                if not chunks:
+                    empty_pages.append(item["page_number"])
+                for chunk in chunks:
+                    chunk["vision_skipped"] = not item["needs_vision"]
+                    chunk["vision_reason"] = item["vision_reason"]
+                    documents.append(chunk)
+            if empty_pages:
+                # 빈 페이지 등 청크가 없는 페이지는 적재할 것이 없으므로 여기서 완료 처리
+                self._complete_pages(empty_pages)
+            if not documents:
+                continue
+
+            with self.metrics.stage("embed"):
+                embeddings = engine.embed_texts(
+                    [doc.pop("embedding_input") for doc in documents],
+                    stats=self.embedding_stats
+                )
+            for document, embedding in zip(documents, embeddings):
+                self._put(out_queue, (document, embedding))
+
+    # ===============================
+    # 단계 4: Milvus + PostgreSQL 적재 (마이크로 배치)
+    # ===============================
+    def _insert_stage(self, in_queue: queue.Queue):
+        """Milvus 삽입 후 같은 배치를 DocumentChunk로 저장하고 페이지 진행률 기록"""
+        collection, self.replaced_documents = prepare_document_collection(self.document_path,
+                                                                          keep_pages=self.embedded_pages)
+        collection.load()
+        if self.doc_id:
+            # 고정 청크 ID를 쓰므로 이전 처리의 청크 행을 먼저 제거 (Milvus 행 교체와 동일, 적재가 끝난 페이지는 유지)
+            with next(get_db_session()) as session:
+                DocumentChunkService(session).delete_document_chunks(self.doc_id, keep_pages=list(self.embedded_pages))
+
+        done = False
+        while not done:
+            items, done = self._collect_batch(in_queue, self.insert_batch_size)
+            if not items:
+                continue
+
+            documents = [document for document, _ in items]
+            with self.metrics.stage("milvus"):
+                milvus_ids = insert_page_documents(collection, documents, [embedding for _, embedding in items])
+            self.inserted_chunks += len(documents)
+            # 페이지의 마지막 청크가 적재되면 페이지 완료
+            completed_pages = [doc["page_number"] for doc in documents if doc["chunk_index"] == doc["chunk_count"] - 1]
+            if self.first_page_searchable_seconds is None:
+                self.first_page_searchable_seconds = time.monotonic() - self._started_at
+                logger.info(f"🔎 첫 페이지 검색 가능: {self.first_page_searchable_seconds:.1f}초")
+
+            with self.metrics.stage("postgres"):
+                self._save_chunks(documents, milvus_ids)
+            self._complete_pages(completed_pages)
+
+        with self.metrics.stage("milvus"):
+            collection.flush()
+
+    def _complete_pages(self, page_numbers: List[int]):
+        """페이지 완료 기록: 진행률 갱신 + 체크포인트 적재 완료 표시 (재개 시 건너뜀)"""
+        with self._progress_lock:
+            self.inserted_pages += len(page_numbers)
+            if self.checkpoint:
+                self.checkpoint.mark_embedded(page_numbers)
+            self._update_job_progress(f"페이지 적재 {self.inserted_pages}/{self.pages_to_process}")
+
+    def _save_chunks(self, documents: List[Dict[str, Any]], milvus_ids: List[int]):
+        """적재된 배치를 DocumentChunk로 일괄 저장 (문서 메타데이터가 있을 때만, 배치당 1 트랜잭션)"""
+        if not self.doc_id:
+            return
+        records = []
+        for document, milvus_id in zip(documents, milvus_ids):
+            chunk_data = {
+                "content_type": document["content_type"],
+                "content": document["content"],
+                "text_content": document["text_content"],
+                "image_description": document["image_description"],
+                "image_path": document["image_path"],
+                "milvus_id": str(milvus_id),
+                "chunk_id": document["chunk_id"],
+                "chunk_index": document["chunk_index"],
+                "chunk_count": document["chunk_count"],
+                "char_start": document["char_start"],
+                "char_end": document["char_end"],
+                "token_count": document["token_count"],
+                "vision_skipped": document["vision_skipped"],
+                "vision_reason": document["vision_reason"]
+            }
+            records.append(build_chunk_record(document["page_number"], chunk_data, EMBEDDING_DIMENSION))
+        with next(get_db_session()) as session:
+            chunk_ids = DocumentChunkService(session).bulk_create_chunks(self.doc_id, records)
+        self.saved_chunks += len(chunk_ids)
+
+    def _update_job_progress(self, current_step: str):
+        """페이지 단위 진행률 기록 (total_steps = 처리 대상 페이지 수)"""
+        if not self.job_id:
+            return
+        try:
+            with next(get_db_session()) as session:
+                ProcessingJobService(session).update_job_status(
+                    self.job_id,
+                    "running",
+                    current_step=current_step,
+                    total_steps=self.pages_to_process,
+                    completed_steps=self.inserted_pages,
+                )
+        except Exception as e:
+            # 진행률 업데이트 실패가 전체 파이프라인을 중단시키지 않도록 예외를 삼킴
+            logger.warning(f"⚠️ 작업 진행률 업데이트 실패: {str(e)}")
+
+    # ===============================
+    # 실행
+    # ===============================
+    def run(self) -> Dict[str, Any]:
+        """모든 단계를 동시에 실행하고 결과 요약 반환"""
+        self._started_at = time.monotonic()
+        render_queue = queue.Queue(maxsize=self.queue_depth)
+        described_queue = queue.Queue(maxsize=self.queue_depth)
+        embedded_queue = queue.Queue(maxsize=self.queue_depth)
+
+        stages = [
+            ("extract", lambda: self._extract_stage(render_queue), render_queue),
+            ("describe", lambda: self._describe_stage(render_queue, described_queue), described_queue),
+            ("embed", lambda: self._embed_stage(described_queue, embedded_queue), embedded_queue),
+            ("insert", lambda: self._insert_stage(embedded_queue), None),
+        ]
+        threads = [
+            threading.Thread(target=self._run_stage, args=stage, name=f"stream-{stage[0]}", daemon=True)
+            for stage in stages
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            raise RuntimeError(f"스트리밍 처리 실패 - {'; '.join(self._errors)}")
+
+        duration = time.monotonic() - self._started_at
+        logger.info(f"✅ 스트리밍 처리 완료: {self.inserted_pages}/{self.pages_to_process}페이지 적재 ({duration:.1f}초)")
+        embedding_cache = {
+            "hits": self.embedding_stats.get("cache_hits", 0),
+            "misses": self.embedding_stats.get("cache_misses", 0),
+            "api_requests": self.embedding_stats.get("api_requests", 0),
+            "tokens": self.embedding_stats.get("tokens", 0)
+        }
+        self.metrics.observe_pages("vision", self.describer.page_seconds)
+        if not self.skip_image_processing:
+            self.metrics.record_counters("vision", self.describer.stats)
+        self.metrics.record_counters("embedding", embedding_cache)
+        self.metrics.increment("milvus_rows", self.inserted_chunks)
+        self.metrics.increment("postgres_rows", self.saved_chunks)
+        for stage, pages in self.resumed_pages.items():
+            self.metrics.increment(f"resumed_{stage}", pages)
+        self.metrics.finish()
+        return {
+            "document_path": self.document_path,
+            "total_pages": self.total_pages,
+            "processed_pages": self.pages_to_process,
+            "image_paths": self.image_paths,
+            "generated_descriptions": self.descriptions,
+            "vision_skipped_pages": self.vision_skipped_pages,
+            "vector_documents": self.inserted_chunks,
+            "inserted_pages": self.inserted_pages,
+            "saved_chunks": self.saved_chunks,
+            "replaced_documents": self.replaced_documents,
+            "resumed_pages": self.resumed_pages,
+            "first_page_searchable_seconds": self.first_page_searchable_seconds,
+            "duration_seconds": duration,
+            "queue_depth": self.queue_depth,
+            "embedding_cache": embedding_cache,
+            "vision_stats": None if self.skip_image_processing else self.describer.stats,
+            "metrics": self.metrics.to_dict(),
+        }
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+장기 유지 벡터 검색기
+- Milvus 연결/컬렉션 로드/검색 파라미터 결정을 프로세스당 한 번만 수행 (질의마다 connect/load/flush 하지 않음)
+- 질의 임베딩 LRU (같은 질의 반복 시 임베딩 API와 디스크 캐시 조회 생략)
+- 단계별 소요 시간(embed, search, lexical, hydrate) 반환
+- 여러 검색 유형을 한 번에 실행할 때 질의 임베딩 1회, 겹치는 하위 검색 1회, 결과 조회 1회 (search_many)
+- 2단계 조회: 검색 결과는 id/점수/페이지/미리보기(snippet)만 담고, 전체 필드는 fetch/expand로 펼친 결과만 id 배치 조회
+- 파이프라인 검색 태스크, run_search.py, run_search_service.py(HTTP 데몬)가 공유
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import config
+from embedding_engine import get_embedding_engine
+from lexical_index import get_lexical_index
+from pymilvus import Collection
+from vector_store import (
+    build_search_params,
+    collapse_hits_to_pages,
+    collection_index_type,
+    collection_vector_field,
+    connect_milvus,
+    encode_vectors,
+    make_snippet,
+    reciprocal_rank_fusion,
+    validate_query_embedding_dim,
+)
+
+logger = logging.getLogger(__name__)
+
+# 1단계(검색) 응답 필드: 본문 대신 미리보기만 조회
+SEARCH_LEAN_FIELDS = ["document_path", "page_number", "chunk_id", "chunk_index", "char_start", "char_end",
+                      "content_type", "image_path", "snippet"]
+
+# 2단계(fetch/expand) 또는 full_fields=True 검색의 전체 필드
+SEARCH_OUTPUT_FIELDS = SEARCH_LEAN_FIELDS + ["content", "text_content", "image_description"]
+
+SEARCH_TYPES = ("combined", "text_only", "image_only", "hybrid")
+
+# GPT Vision이 이미지를 인식하지 못했을 때의 응답 (이미지 전용 검색에서 제외)
+_VISION_FAILURE_PREFIX = "죄송합니다. 이미지를 인식할 수 없습니다"
+
+# 벡터 하위 검색별 Milvus 필터 (후처리 대신 검색 시 필터링하여 top_k를 채움)
+VECTOR_FILTERS = {
+    "combined": "",
+    "text_only": 'text_content != ""',
+    "image_only": f'image_description != "" and image_path != "" '
+                  f'and not (image_description like "{_VISION_FAILURE_PREFIX}%")',
+}
+
+# 검색 유형별 하위 검색 (hybrid는 text_only/image_only 벡터 검색 결과를 재사용)
+_SUB_SEARCHES = {
+    "combined": ("combined",),
+    "text_only": ("text_only",),
+    "image_only": ("image_only",),
+    "hybrid": ("text_only", "image_only", "lexical"),
+}
+
+
+def _ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def _payload(row: Dict[str, Any], fields: List[str], snippet_chars: int) -> Dict[str, Any]:
+    payload = {"id": row.get("id"), **{field: row.get(field) for field in fields}}
+    if payload.get("snippet"):
+        payload["snippet"] = payload["snippet"][:snippet_chars]
+    return payload
+
+
+def _lexical_payload(hit: Dict[str, Any], fields: List[str], snippet_chars: int) -> Dict[str, Any]:
+    """어휘 색인 결과를 벡터 결과와 같은 필드로 맞춤 (색인에는 snippet이 없으므로 원문에서 생성)"""
+    row = {**hit, "snippet": make_snippet(hit.get("text_content"), hit.get("image_description"), snippet_chars)}
+    return {"score": hit["score"], **_payload(row, fields, snippet_chars)}
+
+
+class VectorSearcher:
+    """연결/컬렉션을 유지하는 검색기"""
+
+    def __init__(self, collection_name: str = None, query_cache_size: int = None):
+        self.collection_name = collection_name or config.MILVUS_COLLECTION_NAME
+        self.query_cache_size = config.SEARCH_QUERY_CACHE_SIZE if query_cache_size is None else query_cache_size
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+        self.index_type: Optional[str] = None
+        self.vector_dimension: Optional[int] = None
+        self.vector_type: Optional[str] = None
+
+        self._collection: Optional[Collection] = None
+        self._collection_lock = threading.Lock()
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        # 하위 검색(벡터 최대 3개 + 어휘 1개)을 동시에 실행
+        self._executor = ThreadPoolExecutor(max_workers=config.SEARCH_MAX_CONCURRENCY, thread_name_prefix="searcher")
+
+    @property
+    def collection(self) -> Collection:
+        """로드된 컬렉션 (최초 사용 시 한 번만 연결/로드)"""
+        if self._collection is None:
+            with self._collection_lock:
+                if self._collection is None:
+                    self._collection = self._load_collection()
+        return self._collection
+
+    def _load_collection(self) -> Collection:
+        started = time.perf_counter()
+        connect_milvus()
+        collection = Collection(self.collection_name)
+        collection.load()
+        self.index_type = collection_index_type(collection)
+        self.vector_dimension, self.vector_type = collection_vector_field(collection)
+        logger.info(f"🔥 검색 컬렉션 로드: {self.collection_name} "
+                    f"({collection.num_entities}개 행, 인덱스 {self.index_type}, "
+                    f"{self.vector_dimension}차원 {self.vector_type}, {_ms(started):.0f}ms)")
+        return collection
+
+    def warm_up(self):
+        """컬렉션 로드와 임베딩 클라이언트 생성을 미리 수행"""
+        _ = self.collection
+        _ = get_embedding_engine().client
+
+    def reload(self):
+        """컬렉션을 다시 로드 (재색인/마이그레이션 후)"""
+        with self._collection_lock:
+            self._collection = self._load_collection()
+
+    # ===============================
+    # 질의 임베딩 (LRU)
+    # ===============================
+    def embed_query(self, query: str) -> Tuple[List[float], bool]:
+        """질의 임베딩 (LRU 적중 여부 함께 반환)"""
+        with self._query_cache_lock:
+            vector = self._query_cache.get(query)
+            if vector is not None:
+                self._query_cache.move_to_end(query)
+                self.query_cache_hits += 1
+                return vector, True
+            self.query_cache_misses += 1
+
+        vector = get_embedding_engine().embed_text(query)
+        if self.query_cache_size:
+            with self._query_cache_lock:
+                self._query_cache[query] = vector
+                self._query_cache.move_to_end(query)
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return vector, False
+
+    # ===============================
+    # 검색 계획 (질의 임베딩 1회, 하위 검색 중복 제거, 동시 실행, 결과 조회 1회)
+    # ===============================
+    @staticmethod
+    def plan(search_types: List[str]) -> Dict[str, List[str]]:
+        """
+        검색 유형별로 필요한 하위 검색 계산
+
+        Returns:
+            {"vector": 실행할 벡터 하위 검색 목록 (중복 제거), "lexical": 어휘 검색 필요 여부 ([] 또는 ["lexical"])}
+        """
+        vector: List[str] = []
+        lexical: List[str] = []
+        for search_type in search_types:
+            if search_type not in SEARCH_TYPES:
+                raise ValueError(f"지원하지 않는 검색 유형: {search_type} (지원: {', '.join(SEARCH_TYPES)})")
+            for sub_search in _SUB_SEARCHES[search_type]:
+                target = lexical if sub_search == "lexical" else vector
+                if sub_search not in target:
+                    target.append(sub_search)
+        return {"vector": vector, "lexical": lexical}
+
+    def _vector_ids(self, collection: Collection, query_embedding: List[float], sub_search: str,
+                    limit: int) -> Tuple[List[Tuple[int, float]], float]:
+        """벡터 하위 검색 1회 (id와 점수만 반환, 페이로드는 hydrate 단계에서 한 번에 조회)"""
+        started = time.perf_counter()
+        validate_query_embedding_dim(query_embedding, self.vector_dimension)
+        results = collection.search(
+            encode_vectors([query_embedding], self.vector_type),
+            "embedding",
+            build_search_params(self.index_type, limit),
+            limit=limit,
+            expr=VECTOR_FILTERS[sub_search],
+            output_fields=[],
+        )
+        return [(hit.id, float(hit.score)) for hits in results for hit in hits], _ms(started)
+
+    def _hydrate(self, collection: Collection, ids: List[int], fields: List[str]) -> Dict[int, Dict[str, Any]]:
+        """id 목록의 필드를 SEARCH_FETCH_BATCH_SIZE개씩 나눠 조회"""
+        rows: Dict[int, Dict[str, Any]] = {}
+        batch_size = max(1, config.SEARCH_FETCH_BATCH_SIZE)
+        for start in range(0, len(ids), batch_size):
+            batch = [int(hit_id) for hit_id in ids[start:start + batch_size]]
+            for row in collection.query(expr=f"id in {batch}", output_fields=["id"] + fields):
+                rows[row["id"]] = row
+        return rows
+
+    def fetch(self, ids: List[int], fields: List[str] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        2단계 조회: 검색 결과 id의 전체 필드 (호출자가 펼친 결과만)
+
+        Args:
+            ids: 검색 결과의 "id" 목록 (중복/None 무시)
+            fields: 조회할 필드 (기본: SEARCH_OUTPUT_FIELDS)
+
+        Returns:
+            {id: {"id", 필드...}} (삭제/재적재된 id는 빠짐)
+        """
+        fields = list(fields or SEARCH_OUTPUT_FIELDS)
+        unknown = [field for field in fields if field not in SEARCH_OUTPUT_FIELDS]
+        if unknown:
+            raise ValueError(f"조회할 수 없는 필드: {unknown} (지원: {', '.join(SEARCH_OUTPUT_FIELDS)})")
+        ids = list(dict.fromkeys(hit_id for hit_id in ids if hit_id is not None))
+        if not ids:
+            return {}
+        return self._hydrate(self.collection, ids, fields)
+
+    def expand(self, results: List[Dict[str, Any]], fields: List[str] = None) -> List[Dict[str, Any]]:
+        """검색 결과 항목들에 전체 필드를 채움 (id 배치 조회 1회, 항목을 제자리에서 갱신)"""
+        rows = self.fetch([item.get("id") for item in results], fields)
+        for item in results:
+            row = rows.get(item.get("id"))
+            if row:
+                # content_type은 검색 유형별 표시값(text_only 등)을 유지
+                item.update({field: value for field, value in row.items() if field != "content_type"})
+        return results
+
+    def lexical_hits(self, query: str, limit: int) -> Tuple[List[Dict[str, Any]], float]:
+        """어휘(BM25) 검색 청크 결과 (색인이 꺼져 있거나 실패하면 빈 목록)"""
+        started = time.perf_counter()
+        lexical_index = get_lexical_index()
+        try:
+            return (lexical_index.search(query, limit) if lexical_index else []), _ms(started)
+        except Exception as e:
+            logger.warning(f"⚠️ 어휘 검색 실패, 벡터 결과만 사용: {str(e)}")
+            return [], _ms(started)
+
+    def search_many(
+        self,
+        query: str,
+        top_k: int = 5,
+        search_types: List[str] = SEARCH_TYPES,
+        collapse_pages: bool = True,
+        text_weight: float = 0.5,
+        image_weight: float = 0.5,
+        full_fields: bool = False,
+        snippet_chars: int = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 검색 유형을 한 번에 실행
+
+        질의는 한 번만 임베딩하고, 유형 간에 겹치는 하위 검색(예: hybrid의 텍스트/이미지 검색과
+        text_only/image_only)은 한 번만 실행합니다. 남은 Milvus 검색과 어휘 검색은 동시에 실행하고
+        결과 페이로드는 id 합집합으로 한 번만 조회합니다.
+
+        Args:
+            full_fields: False면 SEARCH_LEAN_FIELDS만 조회 (본문은 fetch/expand로), True면 전체 필드
+            snippet_chars: 미리보기 글자 수 (기본: SEARCH_SNIPPET_CHARS)
+
+        Returns:
+            {검색 유형: 결과 또는 {"error": 메시지}} (모든 결과에 공통 timings_ms 포함)
+        """
+        started = time.perf_counter()
+        plan = self.plan(list(search_types))
+        fields = SEARCH_OUTPUT_FIELDS if full_fields else SEARCH_LEAN_FIELDS
+        snippet_chars = snippet_chars or config.SEARCH_SNIPPET_CHARS
+        limit = top_k * config.SEARCH_CHUNK_OVERSAMPLE if collapse_pages or "hybrid" in search_types else top_k
+        timings: Dict[str, Any] = {"sub_searches": len(plan["vector"]) + len(plan["lexical"])}
+        collection = self.collection
+
+        # 1. 어휘 검색은 임베딩을 기다릴 필요가 없으므로 먼저 시작
+        lexical_future = self._executor.submit(self.lexical_hits, query, limit) if plan["lexical"] else None
+
+        step = time.perf_counter()
+        query_embedding, cached = self.embed_query(query)
+        timings["embed_ms"] = _ms(step)
+        timings["embed_cached"] = cached
+
+        # 2. 벡터 하위 검색 동시 실행
+        step = time.perf_counter()
+        vector_futures = {
+            sub_search: self._executor.submit(self._vector_ids, collection, query_embedding, sub_search, limit)
+            for sub_search in plan["vector"]
+        }
+        ranked: Dict[str, List[Tuple[int, float]]] = {}
+        errors: Dict[str, str] = {}
+        for sub_search, future in vector_futures.items():
+            try:
+                ranked[sub_search], timings[f"{sub_search}_search_ms"] = future.result()
+            except Exception as e:
+                logger.error(f"❌ {sub_search} 벡터 검색 실패: {str(e)}")
+                errors[sub_search] = str(e)
+        lexical: List[Dict[str, Any]] = []
+        if lexical_future is not None:
+            lexical, timings["lexical_ms"] = lexical_future.result()
+            lexical = [_lexical_payload(hit, fields, snippet_chars) for hit in lexical]
+        timings["search_ms"] = _ms(step)
+
+        # 3. 결과 조회 1회 (id 합집합)
+        step = time.perf_counter()
+        ids = list(dict.fromkeys(hit_id for hits in ranked.values() for hit_id, _ in hits))
+        payloads = self._hydrate(collection, ids, fields)
+        hits_by_sub_search = {
+            sub_search: [{"score": score, **_payload(payloads[hit_id], fields, snippet_chars)}
+                         for hit_id, score in hits if hit_id in payloads]
+            for sub_search, hits in ranked.items()
+        }
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for search_type in search_types:
+            failed = [sub_search for sub_search in _SUB_SEARCHES[search_type] if sub_search in errors]
+            if failed:
+                results[search_type] = {"error": errors[failed[0]]}
+                continue
+            results[search_type] = self._build_result(
+                query, search_type, hits_by_sub_search, lexical, top_k, collapse_pages, text_weight, image_weight
+            )
+        timings["hydrate_ms"] = _ms(step)
+        timings["fields"] = "full" if full_fields else "lean"
+        timings["total_ms"] = _ms(started)
+
+        for result in results.values():
+            if "error" not in result:
+                result["timings_ms"] = timings
+        return results
+
+    @staticmethod
+    def _build_result(query: str, search_type: str, hits_by_sub_search: Dict[str, List[Dict[str, Any]]],
+                      lexical: List[Dict[str, Any]], top_k: int, collapse_pages: bool,
+                      text_weight: float, image_weight: float) -> Dict[str, Any]:
+        """하위 검색 결과로 검색 유형별 결과 구성"""
+        result: Dict[str, Any] = {"search_type": search_type, "query": query}
+        if search_type == "hybrid":
+            text_results = collapse_hits_to_pages(
+                [{**hit, "content_type": "text_only"} for hit in hits_by_sub_search["text_only"]], top_k)
+            image_results = collapse_hits_to_pages(
+                [{**hit, "content_type": "image_only"} for hit in hits_by_sub_search["image_only"]], top_k)
+            lexical_results = collapse_hits_to_pages(lexical, top_k)
+            results = reciprocal_rank_fusion({
+                "text": (text_weight, text_results),
+                "image": (image_weight, image_results),
+                "lexical": (config.HYBRID_LEXICAL_WEIGHT, lexical_results),
+            }, top_k)
+            for item in results:
+                item["weighted_score"] = item["rrf_score"]
+            result.update({
+                "text_results_count": len(text_results),
+                "image_results_count": len(image_results),
+                "lexical_results_count": len(lexical_results),
+                "weights": {"text": text_weight, "image": image_weight, "lexical": config.HYBRID_LEXICAL_WEIGHT},
+                "fusion": {"method": "rrf", "k": config.HYBRID_RRF_K},
+            })
+        else:
+            hits = hits_by_sub_search[search_type]
+            if search_type != "combined":
+                hits = [{**hit, "content_type": search_type} for hit in hits]
+            results = collapse_hits_to_pages(hits, top_k) if collapse_pages else hits[:top_k]
+        result.update({"results": results, "total_results": len(results)})
+        return result
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        search_type: str = "combined",
+        collapse_pages: bool = True,
+        text_weight: float = 0.5,
+        image_weight: float = 0.5,
+        full_fields: bool = False,
+        snippet_chars: int = None,
+    ) -> Dict[str, Any]:
+        """
+        단일 유형 검색
+
+        Args:
+            search_type: "combined" | "text_only" | "image_only" | "hybrid"
+            collapse_pages: 청크 결과를 페이지 단위로 합침 (hybrid는 항상 페이지 단위)
+            full_fields: 전체 필드 조회 (기본은 id/점수/페이지/미리보기, 본문은 expand로)
+
+        Returns:
+            {"search_type", "query", "results", "total_results", "timings_ms", ...}
+        """
+        result = self.search_many(query, top_k, [search_type], collapse_pages, text_weight, image_weight,
+                                  full_fields, snippet_chars)[search_type]
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """검색기 상태"""
+        return {
+            "collection_name": self.collection_name,
+            "loaded": self._collection is not None,
+            "index_type": self.index_type,
+            "vector_dimension": self.vector_dimension,
+            "vector_type": self.vector_type,
+            "query_cache": {
+                "size": len(self._query_cache),
+                "max_size": self.query_cache_size,
+                "hits": self.query_cache_hits,
+                "misses": self.query_cache_misses,
+            },
+        }
+
+
+_vector_searcher: Optional[VectorSearcher] = None
+_vector_searcher_lock = threading.Lock()
+
+
+def get_vector_searcher() -> VectorSearcher:
+    """프로세스 전역 검색기 (연결/로드된 컬렉션과 질의 LRU 공유)"""
+    global _vector_searcher
+    if _vector_searcher is None:
+        with _vector_searcher_lock:
+            if _vector_searcher is None:
+                _vector_searcher = VectorSearcher()
+    return _vector_searcher
@@ -0,0 +1,602 @@
+#!/usr/bin/env python3
+"""
+Milvus 벡터 컬렉션 관리
+- 컬렉션/인덱스는 최초 1회만 생성 (증분 적재)
+- 문서 재처리 시 해당 문서의 행만 삭제 후 재삽입
+- 스키마 변경은 별도 마이그레이션 명령(run_migrate_collection.py)으로만 수행
+- 벡터 인덱스 유형(FLAT/IVF_FLAT/HNSW/AUTOINDEX)과 검색 파라미터는 설정(MILVUS_INDEX_TYPE)에서 결정
+- 페이지는 여러 청크 행으로 나뉠 수 있으며, 검색 결과는 collapse_hits_to_pages로 페이지 단위로 합침
+- 문서 행 삭제/삽입 시 어휘(BM25) 색인도 함께 갱신 (lexical_index), 하이브리드 검색은 reciprocal_rank_fusion으로 결합
+- 벡터 차원(EMBEDDING_DIMENSION)과 저장 형식(float32/float16)은 설정에서 결정, 바꾸면 마이그레이션이 기존 벡터를 재투영
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from config import config
+from lexical_index import get_lexical_index
+from pymilvus import (
+    Collection,
+    CollectionSchema,
+    DataType,
+    FieldSchema,
+    connections,
+    utility,
+)
+
+logger = logging.getLogger(__name__)
+
+# 스키마가 바뀌면 증가 (컬렉션 description에 기록)
+COLLECTION_SCHEMA_VERSION = 3
+COLLECTION_DESCRIPTION = "Document processing pipeline vector collection"
+
+# Azure OpenAI text-embedding-3-large (EMBEDDING_DIMENSION으로 축소 가능)
+EMBEDDING_DIMENSION = config.EMBEDDING_DIMENSION
+
+# 벡터 필드 저장 형식 (float16은 행당 벡터 용량 절반, 코사인 순위 변화는 미미)
+VECTOR_DATA_TYPES = {"float32": DataType.FLOAT_VECTOR, "float16": DataType.FLOAT16_VECTOR}
+if config.EMBEDDING_VECTOR_TYPE not in VECTOR_DATA_TYPES:
+    raise ValueError(f"지원하지 않는 EMBEDDING_VECTOR_TYPE: {config.EMBEDDING_VECTOR_TYPE} "
+                     f"(지원: {', '.join(VECTOR_DATA_TYPES)})")
+EMBEDDING_VECTOR_TYPE = config.EMBEDDING_VECTOR_TYPE
+
+# snippet 필드에 저장할 수 있는 최대 글자 수 (max_length는 UTF-8 바이트 기준이므로 글자당 4바이트로 계산)
+SNIPPET_FIELD_MAX_CHARS = 512
+
+# Azure OpenAI 임베딩은 코사인 유사도 사용
+METRIC_TYPE = "COSINE"
+SUPPORTED_INDEX_TYPES = ("FLAT", "IVF_FLAT", "HNSW", "AUTOINDEX")
+
+# Milvus 검색 1회의 최대 limit(topk)
+MILVUS_MAX_TOP_K = 16384
+
+
+class CollectionSchemaMismatchError(RuntimeError):
+    """기존 컬렉션 스키마가 현재 파이프라인 스키마와 다를 때 발생"""
+
+
+# 배치에서 여러 문서 스레드가 동시에 연결/컬렉션 생성을 하면 Milvus Lite 기동·생성이 충돌하므로 직렬화
+_setup_lock = threading.Lock()
+
+
+def is_milvus_lite_uri(uri: str = None) -> bool:
+    """로컬 Milvus Lite 파일 URI 여부 (pymilvus와 같이 .db 경로로 판단, 한 파일은 한 프로세스만 열 수 있음)"""
+    return (uri or config.MILVUS_URI).endswith(".db")
+
+
+def connect_milvus(alias: str = "default"):
+    """Milvus Lite 연결"""
+    with _setup_lock:
+        connections.connect(alias, uri=config.MILVUS_URI)
+
+
+def build_collection_schema() -> CollectionSchema:
+    """컬렉션 스키마 정의 (페이지 하위 청크 벡터)"""
+    fields = [
+        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
+        FieldSchema(name="document_path", dtype=DataType.VARCHAR, max_length=500),
+        FieldSchema(name="page_number", dtype=DataType.INT64),
+        FieldSchema(name="chunk_id", dtype=DataType.VARCHAR, max_length=128),  # 고정 청크 ID (v2)
+        FieldSchema(name="chunk_index", dtype=DataType.INT64),  # 페이지 내 청크 순번 (v2)
+        FieldSchema(name="chunk_count", dtype=DataType.INT64),  # 페이지의 청크 수 (v2)
+        FieldSchema(name="char_start", dtype=DataType.INT64),  # 원본(페이지 텍스트/이미지 설명) 내 시작 위치 (v2)
+        FieldSchema(name="char_end", dtype=DataType.INT64),  # 원본 내 끝 위치 (v2)
+        FieldSchema(name="snippet", dtype=DataType.VARCHAR, max_length=SNIPPET_FIELD_MAX_CHARS * 4),  # 검색 결과 미리보기 (v3)
+        FieldSchema(name="content_type", dtype=DataType.VARCHAR, max_length=50),  # "combined" | "text" | "image"
+        FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=15000),  # 통합 콘텐츠
+        FieldSchema(name="text_content", dtype=DataType.VARCHAR, max_length=10000),  # 원본 텍스트
+        FieldSchema(name="image_description", dtype=DataType.VARCHAR, max_length=10000),  # 이미지 설명
+        FieldSchema(name="image_path", dtype=DataType.VARCHAR, max_length=1000),  # 이미지 파일 경로
+        FieldSchema(name="embedding", dtype=VECTOR_DATA_TYPES[EMBEDDING_VECTOR_TYPE], dim=EMBEDDING_DIMENSION)
+    ]
+    return CollectionSchema(fields, f"{COLLECTION_DESCRIPTION} (schema v{COLLECTION_SCHEMA_VERSION})")
+
+
+def build_index_params(index_type: str = None) -> Dict[str, Any]:
+    """벡터 인덱스 파라미터 (기본: MILVUS_INDEX_TYPE)"""
+    index_type = (index_type or config.MILVUS_INDEX_TYPE).upper()
+    if index_type == "IVF_FLAT":
+        params = {"nlist": config.MILVUS_IVF_NLIST}
+    elif index_type == "HNSW":
+        params = {"M": config.MILVUS_HNSW_M, "efConstruction": config.MILVUS_HNSW_EF_CONSTRUCTION}
+    elif index_type in ("FLAT", "AUTOINDEX"):
+        params = {}
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 유형: {index_type} (지원: {', '.join(SUPPORTED_INDEX_TYPES)})")
+    return {
+        "metric_type": METRIC_TYPE,
+        "index_type": index_type,
+        "params": params
+    }
+
+
+def build_search_params(index_type: str = None, limit: int = None) -> Dict[str, Any]:
+    """인덱스 유형에 맞는 검색 파라미터 (HNSW ef는 검색 limit 이상이어야 함)"""
+    index_type = (index_type or config.MILVUS_INDEX_TYPE).upper()
+    if index_type.startswith("IVF"):
+        params = {"nprobe": config.MILVUS_IVF_NPROBE}
+    elif index_type == "HNSW":
+        params = {"ef": max(config.MILVUS_HNSW_EF, limit or 0)}
+    else:
+        # FLAT(전수 검색), AUTOINDEX(서버가 파라미터 결정)
+        params = {}
+    return {"metric_type": METRIC_TYPE, "params": params}
+
+
+def collection_index_type(collection: Collection) -> Optional[str]:
+    """컬렉션 embedding 필드의 인덱스 유형 (인덱스가 없거나 조회 실패 시 None)"""
+    try:
+        for index in collection.indexes:
+            if index.field_name != "embedding":
+                continue
+            params = index.params or {}
+            return str(params.get("index_type") or getattr(index, "index_type", "") or "").upper() or None
+    except Exception:
+        pass
+    return None
+
+
+def collection_search_params(collection: Collection, limit: int = None) -> Dict[str, Any]:
+    """컬렉션에 실제로 생성된 인덱스 기준 검색 파라미터 (조회 실패 시 설정값 기준)"""
+    return build_search_params(collection_index_type(collection), limit)
+
+
+def rebuild_index(collection: Collection, index_type: str = None) -> Dict[str, Any]:
+    """embedding 인덱스를 지정한 유형으로 재생성 (데이터는 유지)"""
+    index_params = build_index_params(index_type)
+    previous = collection_index_type(collection)
+    collection.release()
+    if collection.has_index():
+        collection.drop_index()
+    collection.create_index("embedding", index_params)
+    logger.info(f"🧭 인덱스 재생성: {previous} → {index_params['index_type']} {index_params['params']}")
+    return {"previous_index_type": previous, **index_params}
+
+
+def _create_collection(collection_name: str) -> Collection:
+    """컬렉션과 인덱스 생성"""
+    collection = Collection(collection_name, build_collection_schema())
+    index_params = build_index_params()
+    collection.create_index("embedding", index_params)
+    logger.info(
+        f"📚 새 컬렉션 생성: {collection_name} "
+        f"(schema v{COLLECTION_SCHEMA_VERSION}, {EMBEDDING_DIMENSION}차원 {EMBEDDING_VECTOR_TYPE}, "
+        f"{index_params['index_type']} 인덱스)"
+    )
+    return collection
+
+
+def _field_signature(schema: CollectionSchema) -> List[tuple]:
+    """스키마 비교용 필드 요약 (이름, 타입, 차원)"""
+    signature = []
+    for field in schema.fields:
+        params = getattr(field, "params", None) or {}
+        signature.append((field.name, field.dtype, int(params.get("dim", 0) or 0)))
+    return signature
+
+
+def schema_is_current(collection: Collection) -> bool:
+    """기존 컬렉션이 현재 스키마와 일치하는지 확인"""
+    return _field_signature(collection.schema) == _field_signature(build_collection_schema())
+
+
+# ===============================
+# 벡터 차원/저장 형식
+# ===============================
+def collection_vector_field(collection: Collection) -> Tuple[int, str]:
+    """컬렉션 embedding 필드의 (차원, 저장 형식)"""
+    for field in collection.schema.fields:
+        if field.name == "embedding":
+            params = getattr(field, "params", None) or {}
+            vector_type = "float16" if field.dtype == DataType.FLOAT16_VECTOR else "float32"
+            return int(params.get("dim", 0) or 0), vector_type
+    raise CollectionSchemaMismatchError(f"컬렉션 '{collection.name}'에 embedding 필드가 없습니다.")
+
+
+def encode_vectors(vectors: Iterable[Sequence[float]], vector_type: str = None) -> List[Any]:
+    """삽입/검색용 벡터 변환 (float16 필드는 numpy float16 배열로 전달해야 함)"""
+    if (vector_type or EMBEDDING_VECTOR_TYPE) == "float16":
+        return [np.asarray(vector, dtype=np.float16) for vector in vectors]
+    return [vector.tolist() if isinstance(vector, np.ndarray) else vector for vector in vectors]
+
+
+def decode_vector(value: Any) -> np.ndarray:
+    """query 결과의 벡터 값을 float32 배열로 (float16 필드는 바이트열로 반환될 수 있음)"""
+    if isinstance(value, list) and len(value) == 1 and isinstance(value[0], (bytes, bytearray)):
+        value = value[0]
+    if isinstance(value, (bytes, bytearray)):
+        return np.frombuffer(value, dtype=np.float16).astype(np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def reproject_embedding(vector: Any, dimension: int) -> np.ndarray:
+    """
+    임베딩을 dimension 차원으로 재투영 (앞쪽 dimension개 성분을 남기고 L2 정규화)
+
+    text-embedding-3 계열은 앞쪽 성분에 정보가 몰리도록 학습되어 있어, API dimensions 파라미터와
+    같은 방식으로 줄어든 벡터가 됩니다. 차원을 늘리는 것은 불가능하므로 재처리(재임베딩)가 필요합니다.
+    """
+    vector = decode_vector(vector)
+    if dimension > len(vector):
+        raise ValueError(f"{len(vector)}차원 벡터를 {dimension}차원으로 늘릴 수 없습니다. 문서 재처리가 필요합니다.")
+    truncated = vector[:dimension]
+    norm = float(np.linalg.norm(truncated))
+    return truncated / norm if norm else truncated
+
+
+def validate_query_embedding_dim(query_embedding: Sequence[float], dimension: int):
+    """질의 임베딩 차원이 컬렉션 벡터 차원과 같은지 확인 (다르면 Milvus 검색 오류 대신 원인을 알려줌)"""
+    if len(query_embedding) != dimension:
+        raise ValueError(
+            f"질의 임베딩 차원({len(query_embedding)})이 컬렉션 벡터 차원({dimension})과 다릅니다. "
+            f"EMBEDDING_DIMENSION을 컬렉션에 맞추거나 'python run_migrate_collection.py'로 재투영하세요."
+        )
+
+
+def ensure_collection(collection_name: str = None) -> Collection:
+    """컬렉션이 없으면 생성하고, 있으면 스키마 일치 여부만 확인"""
+    collection_name = collection_name or config.MILVUS_COLLECTION_NAME
+
+    with _setup_lock:
+        if not utility.has_collection(collection_name):
+            return _create_collection(collection_name)
+        collection = Collection(collection_name)
+
+    if not schema_is_current(collection):
+        dimension, vector_type = collection_vector_field(collection)
+        raise CollectionSchemaMismatchError(
+            f"컬렉션 '{collection_name}' 스키마가 현재 버전(v{COLLECTION_SCHEMA_VERSION}, "
+            f"{EMBEDDING_DIMENSION}차원 {EMBEDDING_VECTOR_TYPE})과 다릅니다 (컬렉션: {dimension}차원 {vector_type}). "
+            f"'python run_migrate_collection.py'로 마이그레이션 후 다시 실행하세요."
+        )
+
+    index_type = collection_index_type(collection)
+    if index_type and index_type != config.MILVUS_INDEX_TYPE:
+        # 인덱스 재생성은 전체 벡터를 다시 읽으므로 자동으로 하지 않음
+        logger.warning(
+            f"⚠️ 컬렉션 '{collection_name}' 인덱스({index_type})가 설정값({config.MILVUS_INDEX_TYPE})과 다릅니다. "
+            f"'python run_migrate_collection.py --reindex'로 재생성할 수 있습니다."
+        )
+    return collection
+
+
+def quote_expr_string(value: str) -> str:
+    """Milvus 필터 표현식용 문자열 리터럴"""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def delete_document_vectors(collection: Collection, document_path: str, keep_pages: Iterable[int] = None) -> int:
+    """특정 문서의 기존 벡터 행만 삭제 (keep_pages의 페이지 행은 유지)"""
+    expr = f"document_path == {quote_expr_string(document_path)}"
+    if keep_pages:
+        expr += f" and page_number not in [{', '.join(str(page) for page in sorted(keep_pages))}]"
+    result = collection.delete(expr=expr)
+    deleted_count = getattr(result, "delete_count", 0) or 0
+    if deleted_count:
+        logger.info(f"🗑️ 기존 문서 벡터 삭제: {document_path} ({deleted_count}개)")
+    return deleted_count
+
+
+def prepare_document_collection(document_path: str, collection_name: str = None,
+                                keep_pages: Iterable[int] = None) -> Tuple[Collection, int]:
+    """
+    문서 적재 준비: 컬렉션 확보 후 이 문서의 기존 행 삭제 (recreate 모드는 컬렉션 재생성)
+
+    keep_pages: 이전 처리에서 적재가 끝난 페이지 (체크포인트 재개 시 해당 페이지 행은 유지, incremental 모드 전용)
+    """
+    collection_name = collection_name or config.MILVUS_COLLECTION_NAME
+    connect_milvus()
+
+    # recreate 모드: 이전 동작과 같이 컬렉션을 매번 재생성
+    if config.MILVUS_INGEST_MODE == "recreate" and utility.has_collection(collection_name):
+        logger.info(f"🗑️ 기존 컬렉션 삭제: {collection_name}")
+        utility.drop_collection(collection_name)
+        _update_lexical_index("clear")
+
+    collection = ensure_collection(collection_name)
+    deleted_count = delete_document_vectors(collection, document_path, keep_pages)
+    _update_lexical_index("delete_document", document_path, keep_pages)
+    return collection, deleted_count
+
+
+def _update_lexical_index(method: str, *args) -> Any:
+    """어휘 색인 갱신 (실패해도 벡터 적재는 계속, 불일치는 run_migrate_collection.py --rebuild-lexical로 복구)"""
+    lexical_index = get_lexical_index()
+    if lexical_index is None:
+        return None
+    try:
+        return getattr(lexical_index, method)(*args)
+    except Exception as e:
+        logger.warning(f"⚠️ 어휘 색인 갱신 실패 ({method}): {str(e)}")
+        return None
+
+
+def build_page_document(
+    document_path: str,
+    page_number: int,
+    text_content: str = "",
+    image_description: str = "",
+    image_path: str = "",
+) -> Optional[Dict[str, Any]]:
+    """페이지 텍스트와 이미지 설명을 통합한 삽입용 행 생성 (내용이 없으면 None)"""
+    text_content = text_content[:10000] if text_content.strip() else ""
+    image_description = image_description[:10000] if image_description.strip() else ""
+    if not image_description:
+        image_path = ""
+
+    # 텍스트와 이미지 설명을 결합
+    combined_content = ""
+    if text_content:
+        combined_content += f"텍스트: {text_content}"
+    if image_description:
+        if combined_content:
+            combined_content += " "
+        combined_content += f"이미지: {image_description}"
+
+    if not combined_content.strip():
+        return None
+
+    return {
+        "document_path": document_path,
+        "page_number": page_number,
+        "content_type": "combined",  # 통합된 콘텐츠
+        "content": combined_content[:15000],
+        "embedding_input": combined_content,  # 임베딩 입력 (삽입 전 제거)
+        "text_content": text_content,
+        "image_description": image_description,
+        "image_path": image_path or ""
+    }
+
+
+def make_snippet(text_content: str = "", image_description: str = "", max_chars: int = None) -> str:
+    """검색 결과 미리보기 (텍스트 우선, 없으면 이미지 설명, 공백 정리 후 max_chars까지)"""
+    max_chars = min(max_chars or config.SNIPPET_MAX_CHARS, SNIPPET_FIELD_MAX_CHARS)
+    source = text_content if (text_content or "").strip() else (image_description or "")
+    return " ".join(source.split())[:max_chars]
+
+
+def insert_page_documents(
+    collection: Collection,
+    documents: List[Dict[str, Any]],
+    embeddings: List[List[float]],
+    batch_size: int = None,
+) -> List[int]:
+    """청크 행을 batch_size개씩 나눠 삽입 후 Milvus id 목록 반환 (documents 순서와 동일)"""
+    batch_size = batch_size or config.MILVUS_INSERT_BATCH_SIZE
+    field_names = [f.name for f in build_collection_schema().fields if not f.auto_id and f.name != "embedding"]
+
+    for doc in documents:
+        doc.setdefault("snippet", make_snippet(doc["text_content"], doc["image_description"]))
+
+    primary_keys: List[int] = []
+    for start in range(0, len(documents), batch_size):
+        rows = [
+            {**{name: doc[name] for name in field_names}, "embedding": embedding}
+            for doc, embedding in zip(documents[start:start + batch_size],
+                                      encode_vectors(embeddings[start:start + batch_size]))
+        ]
+        result = collection.insert(rows)
+        primary_keys.extend(result.primary_keys)
+
+    # 어휘 색인에도 Milvus id를 함께 기록 (검색 2단계에서 id로 전체 필드 조회)
+    _update_lexical_index("add_chunks", [{**doc, "id": pk} for doc, pk in zip(documents, primary_keys)])
+    return primary_keys
+
+
+def collapse_hits_to_pages(hits: List[Dict[str, Any]], top_k: int = None) -> List[Dict[str, Any]]:
+    """
+    청크 검색 결과를 페이지 단위로 합침
+
+    hits는 점수 내림차순이어야 하며, 페이지별 최고 점수 청크를 대표로 남기고
+    matched_chunks(일치한 청크 수)와 chunk_ids를 추가합니다.
+    """
+    pages: Dict[tuple, Dict[str, Any]] = {}
+    for hit in hits:
+        key = (hit.get("document_path"), hit.get("page_number"))
+        page = pages.get(key)
+        if page is None:
+            pages[key] = {**hit, "matched_chunks": 1, "chunk_ids": [hit.get("chunk_id")]}
+        else:
+            page["matched_chunks"] += 1
+            page["chunk_ids"].append(hit.get("chunk_id"))
+    collapsed = list(pages.values())
+    return collapsed[:top_k] if top_k else collapsed
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, Tuple[float, List[Dict[str, Any]]]],
+    top_k: int = None,
+    k: int = None,
+) -> List[Dict[str, Any]]:
+    """
+    순위 목록들을 RRF(Reciprocal Rank Fusion)로 결합
+
+    점수 척도가 다른 검색(코사인 유사도, BM25)을 순위만으로 합칩니다.
+    페이지별 점수는 sum(weight / (k + rank))이며, 같은 페이지의 결과는 비어 있는 필드를 서로 채웁니다.
+
+    Args:
+        ranked_lists: {출처: (가중치, 페이지 단위 결과 목록)}
+    """
+    k = k or config.HYBRID_RRF_K
+    fused: Dict[tuple, Dict[str, Any]] = {}
+    for source, (weight, hits) in ranked_lists.items():
+        for rank, hit in enumerate(hits, start=1):
+            key = (hit.get("document_path"), hit.get("page_number"))
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = {**hit, "rrf_score": 0.0, "source_ranks": {}, "source_scores": {}}
+            else:
+                for field, value in hit.items():
+                    if value and not entry.get(field):
+                        entry[field] = value
+            entry["rrf_score"] += weight / (k + rank)
+            entry["source_ranks"][source] = rank
+            entry["source_scores"][source] = hit.get("score")
+
+    results = sorted(fused.values(), key=lambda entry: entry["rrf_score"], reverse=True)
+    for entry in results:
+        entry["search_source"] = "+".join(entry["source_ranks"])
+    return results[:top_k] if top_k else results
+
+
+def rebuild_lexical_index(collection_name: str = None, batch_size: int = 500) -> int:
+    """컬렉션의 모든 행으로 어휘 색인 재구성 (색인 도입 전 적재된 문서, 불일치 복구용)"""
+    lexical_index = get_lexical_index()
+    if lexical_index is None:
+        raise RuntimeError("LEXICAL_INDEX_ENABLED=false 입니다.")
+
+    collection = Collection(collection_name or config.MILVUS_COLLECTION_NAME)
+    collection.load()
+    lexical_index.clear()
+
+    indexed = 0
+    iterator = collection.query_iterator(
+        batch_size=batch_size,
+        output_fields=["id", "document_path", "page_number", "chunk_id", "chunk_index", "char_start", "char_end",
+                       "content_type", "text_content", "image_description", "image_path"],
+    )
+    try:
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+            indexed += lexical_index.add_chunks(rows)
+    finally:
+        iterator.close()
+    logger.info(f"🔤 어휘 색인 재구성 완료: {indexed}개 청크")
+    return indexed
+
+
+# ===============================
+# 스키마 마이그레이션 (명시적 명령 전용)
+# ===============================
+def _default_field_value(field: FieldSchema, row: Dict[str, Any]) -> Any:
+    """이전 스키마에 없던 필드의 기본값 (v1 행은 페이지 전체를 담은 청크 1개로 변환, v2 행은 snippet 생성)"""
+    if field.name == "chunk_id":
+        # chunker.stable_chunk_id와 같은 형식
+        path_key = hashlib.sha1(row["document_path"].encode("utf-8")).hexdigest()[:16]
+        return f"{path_key}_p{row['page_number']}_{row.get('content_type', 'combined')}_0"
+    if field.name == "chunk_count":
+        return 1
+    if field.name == "char_end":
+        return len(row.get("text_content", ""))
+    if field.name == "snippet":
+        return make_snippet(row.get("text_content", ""), row.get("image_description", ""))
+    if field.dtype == DataType.VARCHAR:
+        return ""
+    if field.dtype in (DataType.INT64, DataType.INT32, DataType.INT16, DataType.INT8):
+        return 0
+    if field.dtype in (DataType.FLOAT, DataType.DOUBLE):
+        return 0.0
+    raise ValueError(f"필드 '{field.name}'의 기본값을 정할 수 없습니다. 재처리가 필요합니다.")
+
+
+def _copy_rows(
+    source: Collection,
+    target: Collection,
+    batch_size: int,
+    row_transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> Dict[int, int]:
+    """
+    source의 모든 행을 target 스키마로 변환하여 복사 (이전 id → 새 id 매핑 반환)
+
+    벡터 차원/형식이 다르면 reproject_embedding으로 재투영하고, float16 벡터는 삽입 형식으로 다시 변환합니다.
+    """
+    target_fields = [f for f in target.schema.fields if not f.auto_id]
+    target_dimension, target_vector_type = collection_vector_field(target)
+    convert_vectors = (collection_vector_field(source) != (target_dimension, target_vector_type)
+                       or target_vector_type == "float16")
+    id_mapping: Dict[int, int] = {}
+
+    source.load()
+    iterator = source.query_iterator(batch_size=batch_size, output_fields=["*"])
+    try:
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+
+            new_rows = []
+            for row in rows:
+                if row_transform:
+                    row = row_transform(row)
+                if convert_vectors:
+                    row = {**row, "embedding": encode_vectors(
+                        [reproject_embedding(row["embedding"], target_dimension)], target_vector_type)[0]}
+                new_rows.append({
+                    f.name: row[f.name] if f.name in row else _default_field_value(f, row)
+                    for f in target_fields
+                })
+
+            result = target.insert(new_rows)
+            for row, new_id in zip(rows, result.primary_keys):
+                id_mapping[row["id"]] = new_id
+    finally:
+        iterator.close()
+
+    target.flush()
+    return id_mapping
+
+
+def migrate_collection(
+    collection_name: str = None,
+    batch_size: int = 500,
+    row_transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    기존 컬렉션을 현재 스키마로 마이그레이션
+
+    임시 컬렉션으로 복사 → 기존 컬렉션 삭제 → 현재 스키마로 재생성 → 다시 복사 순으로 진행합니다.
+    Milvus auto_id로 인해 행 id가 바뀌므로 이전 id → 새 id 매핑을 함께 반환합니다.
+    """
+    collection_name = collection_name or config.MILVUS_COLLECTION_NAME
+    if not utility.has_collection(collection_name):
+        _create_collection(collection_name)
+        return {"collection_name": collection_name, "status": "created", "migrated_rows": 0, "id_mapping": {}}
+
+    collection = Collection(collection_name)
+    previous_vector = collection_vector_field(collection)
+    vector = (EMBEDDING_DIMENSION, EMBEDDING_VECTOR_TYPE)
+    if schema_is_current(collection) and row_transform is None:
+        logger.info(f"✅ 컬렉션 '{collection_name}'은 이미 최신 스키마입니다.")
+        return {"collection_name": collection_name, "status": "up_to_date", "migrated_rows": 0, "id_mapping": {},
+                "previous_vector": previous_vector, "vector": vector}
+    if previous_vector[0] < EMBEDDING_DIMENSION:
+        # 복사 도중 실패하지 않도록 시작 전에 확인
+        raise ValueError(f"컬렉션 벡터({previous_vector[0]}차원)를 {EMBEDDING_DIMENSION}차원으로 늘릴 수 없습니다. "
+                         f"--recreate 후 문서를 재처리하세요.")
+    if previous_vector != vector:
+        logger.info(f"📐 벡터 재투영: {previous_vector[0]}차원 {previous_vector[1]} → {vector[0]}차원 {vector[1]}")
+
+    staging_name = f"{collection_name}__migrating"
+    if utility.has_collection(staging_name):
+        utility.drop_collection(staging_name)
+
+    # 1. 현재 스키마로 임시 컬렉션 생성 후 변환 복사
+    staging = _create_collection(staging_name)
+    staging_mapping = _copy_rows(collection, staging, batch_size, row_transform)
+    logger.info(f"📦 임시 컬렉션으로 복사 완료: {len(staging_mapping)}개 행")
+
+    # 2. 기존 컬렉션 교체
+    utility.drop_collection(collection_name)
+    migrated = _create_collection(collection_name)
+    final_mapping = _copy_rows(staging, migrated, batch_size)
+    utility.drop_collection(staging_name)
+
+    id_mapping = {
+        old_id: final_mapping[staging_id]
+        for old_id, staging_id in staging_mapping.items()
+        if staging_id in final_mapping
+    }
+    logger.info(f"✅ 컬렉션 마이그레이션 완료: {collection_name} ({len(id_mapping)}개 행)")
+    return {
+        "collection_name": collection_name,
+        "status": "migrated",
+        "migrated_rows": len(id_mapping),
+        "id_mapping": id_mapping,
+        "previous_vector": previous_vector,
+        "vector": vector,
+    }
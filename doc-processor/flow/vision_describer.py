@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+GPT Vision 이미지 설명 생성 (asyncio 기반)
+- 문서 내 페이지 이미지를 동시성 제한 하에 병렬 요청
+- 공유 토큰 버킷 limiter로 RPM/TPM 준수
+- 429 응답은 Retry-After를 따르고, 일시적 오류는 지터가 포함된 지수 백오프로 재시도
+- 렌더링 이미지 해시 기반 설명 캐시로 동일(유사) 페이지는 API 호출 생략
+- 원본 대신 Vision 입력용 축소본(page_image_store)을 전송하여 업로드 바이트와 지연 감소
+"""
+
+import asyncio
+import base64
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import openai
+from config import config
+from local_cache import DescriptionCache, get_description_cache, sha256_text
+from page_image_store import image_mime_type, vision_input_size
+from PIL import Image
+from rate_limiter import TokenBucketRateLimiter, get_vision_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+VISION_PROMPT = "이 이미지의 내용을 자세히 설명해주세요. 텍스트, 차트, 그래프, 표 등 모든 요소를 포함하여 설명해주세요."
+
+# 재시도 대상 일시적 오류 (429는 별도 처리)
+_TRANSIENT_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError)
+
+
+def run_coroutine_sync(coro):
+    """동기 코드(Prefect 태스크)에서 코루틴 실행 (이미 실행 중인 루프가 있으면 별도 스레드 사용)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def estimate_vision_tokens(image_path: str, max_tokens: int) -> int:
+    """요청 토큰 추정 (high detail 이미지 타일 + 프롬프트 + 최대 출력 토큰)"""
+    try:
+        with Image.open(image_path) as image:
+            width, height = image.size
+    except Exception:
+        width, height = 2048, 2048
+
+    # 2048x2048 안에 맞춘 뒤 짧은 변을 768로 축소, 512px 타일당 170토큰 + 기본 85토큰
+    width, height = vision_input_size(width, height, 2048, 768)
+    tiles = -(-width // 512) * -(-height // 512)
+    return 85 + 170 * tiles + 100 + max_tokens
+
+
+def parse_retry_after(error: openai.APIStatusError) -> Optional[float]:
+    """429 응답 헤더에서 재시도 대기 시간(초) 추출"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class VisionDescriber:
+    """페이지 이미지 설명 생성기"""
+
+    def __init__(
+        self,
+        concurrency: int = None,
+        limiter: TokenBucketRateLimiter = None,
+        max_retries: int = None,
+        max_tokens: int = None,
+        cache: Optional[DescriptionCache] = None,
+    ):
+        self.concurrency = concurrency or config.VISION_MAX_CONCURRENCY
+        self.limiter = limiter or get_vision_rate_limiter()
+        self.max_retries = config.VISION_MAX_RETRIES if max_retries is None else max_retries
+        self.max_tokens = max_tokens or config.VISION_MAX_TOKENS
+        self.cache = cache if cache is not None else get_description_cache()
+        # 배포/프롬프트/출력 길이가 바뀌면 기존 캐시 항목을 재사용하지 않음
+        self.cache_namespace = f"{config.AZURE_OPENAI_DEPLOYMENT_NAME}:{self.max_tokens}:{sha256_text(VISION_PROMPT)[:12]}"
+        self.stats = {
+            "api_requests": 0, "retries": 0, "rate_limited": 0, "tokens": 0, "failures": 0,
+            "cache_hits": 0, "cache_misses": 0,
+        }
+        # 페이지별 설명 소요 시간(초, 캐시 적중 포함) - 파이프라인 계측의 페이지 지연 히스토그램용
+        self.page_seconds: List[float] = []
+        self._stats_lock = threading.Lock()
+        # 같은 이미지를 동시에 요청하지 않도록 진행 중인 요청 공유 (캐시 키 → Future)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def create_client(self) -> openai.AsyncAzureOpenAI:
+        """비동기 클라이언트 생성 (재시도는 이 클래스에서 직접 처리)"""
+        return openai.AsyncAzureOpenAI(
+            azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
+            api_key=config.AZURE_OPENAI_KEY,
+            api_version=config.AZURE_OPENAI_API_VERSION,
+            max_retries=0,
+        )
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        """지터 포함 지수 백오프 (full jitter)"""
+        ceiling = min(config.VISION_BACKOFF_MAX_SECONDS, config.VISION_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    async def describe_image(self, client: openai.AsyncAzureOpenAI, image_path: str) -> str:
+        """이미지 1장 설명 생성 (rate limit 및 재시도 포함)"""
+        with open(image_path, "rb") as image_file:
+            base64_image = base64.b64encode(image_file.read()).decode('utf-8')
+        mime_type = image_mime_type(image_path)
+
+        estimated_tokens = estimate_vision_tokens(image_path, self.max_tokens)
+
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(estimated_tokens)
+            try:
+                self._count("api_requests")
+                response = await client.chat.completions.create(
+                    model=config.AZURE_OPENAI_DEPLOYMENT_NAME,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": VISION_PROMPT},
+                                {
+                                    "type": "image_url",
+                                    "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}
+                                }
+                            ]
+                        }
+                    ],
+                    max_tokens=self.max_tokens
+                )
+                if response.usage:
+                    self.limiter.settle(estimated_tokens, response.usage.total_tokens)
+                    self._count("tokens", response.usage.total_tokens)
+                return response.choices[0].message.content
+
+            except openai.RateLimitError as e:
+                self._count("rate_limited")
+                if attempt >= self.max_retries:
+                    raise
+                wait = parse_retry_after(e)
+                if wait is None:
+                    wait = self._backoff_seconds(attempt)
+                else:
+                    # 서버가 지정한 대기 시간은 모든 요청에 적용 + 동시 재시도 분산용 지터
+                    self.limiter.pause(wait)
+                    wait += random.uniform(0, 1.0)
+                self._count("retries")
+                logger.warning(f"⏳ GPT Vision 429 응답, {wait:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(wait)
+
+            except _TRANSIENT_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                wait = self._backoff_seconds(attempt)
+                self._count("retries")
+                logger.warning(f"⏳ GPT Vision 일시 오류 ({type(e).__name__}), {wait:.1f}초 후 재시도")
+                await asyncio.sleep(wait)
+
+        raise RuntimeError("GPT Vision 재시도 횟수 초과")
+
+    async def describe_image_cached(self, client: openai.AsyncAzureOpenAI, image_path: str) -> str:
+        """설명 캐시 조회 후 없으면 API 호출 (동일 이미지의 동시 요청은 1회로 합침)"""
+        if self.cache is None:
+            return await self.describe_image(client, image_path)
+
+        fingerprint = self.cache.fingerprint(image_path)
+        cache_key = self.cache.make_key(self.cache_namespace, fingerprint)
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self._count("cache_hits")
+            return await asyncio.shield(inflight)
+
+        description = self.cache.get_description(self.cache_namespace, fingerprint)
+        if description is not None:
+            self._count("cache_hits")
+            return description
+
+        self._count("cache_misses")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            description = await self.describe_image(client, image_path)
+            self.cache.put_description(self.cache_namespace, fingerprint, description)
+            future.set_result(description)
+            return description
+        except Exception as e:
+            future.set_exception(e)
+            # 대기 중인 요청이 없으면 예외 미조회 경고가 나지 않도록 처리
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    async def describe_page(self, client: openai.AsyncAzureOpenAI, image_path: str, page_number: int,
+                            vision_path: str = None) -> Dict[str, Any]:
+        """
+        페이지 이미지 1장의 설명 결과 생성 (실패 시 page_number 0과 실패 메시지 기록)
+
+        vision_path가 있으면 원본(image_path) 대신 Vision 입력용 축소본을 전송하고 캐시 키로 사용합니다.
+        """
+        started = time.perf_counter()
+        try:
+            description = await self.describe_image_cached(client, vision_path or image_path)
+            logger.info(f"📝 페이지 {page_number} 설명 생성 완료")
+        except Exception as e:
+            self._count("failures")
+            logger.error(f"❌ 이미지 설명 생성 실패 ({image_path}): {str(e)}")
+            description = f"설명 생성 실패: {str(e)}"
+            page_number = 0
+        with self._stats_lock:
+            self.page_seconds.append(time.perf_counter() - started)
+        return {
+            "description": description,
+            "page_number": page_number,
+            "generation_timestamp": datetime.now().isoformat()
+        }
+
+    async def describe_images(self, items: List[Tuple[str, int]], vision_paths: Dict[str, str] = None,
+                              on_result: Callable[[str, Dict[str, Any]], None] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        (이미지 경로, 페이지 번호) 목록의 설명을 동시성 제한 하에 생성 (결과 키는 이미지 경로)
+
+        on_result가 있으면 페이지 설명이 끝날 때마다 (이미지 경로, 결과)로 호출합니다 (체크포인트 기록용).
+        """
+        vision_paths = vision_paths or {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        client = self.create_client()
+
+        async def _describe(image_path: str, page_number: int) -> Tuple[str, Dict[str, Any]]:
+            async with semaphore:
+                result = await self.describe_page(client, image_path, page_number, vision_paths.get(image_path))
+            if on_result:
+                on_result(image_path, result)
+            return image_path, result
+
+        try:
+            results = await asyncio.gather(*(_describe(path, page) for path, page in items))
+        finally:
+            await client.close()
+        return dict(results)
+
+    def describe_images_sync(self, items: List[Tuple[str, int]], vision_paths: Dict[str, str] = None,
+                             on_result: Callable[[str, Dict[str, Any]], None] = None) -> Dict[str, Dict[str, Any]]:
+        """동기 코드용 래퍼"""
+        return run_coroutine_sync(self.describe_images(items, vision_paths, on_result))
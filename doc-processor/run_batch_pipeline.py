@@ -15,6 +15,7 @@ parent_dir = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from batch_document_processing_pipeline import batch_document_processing_pipeline
+from pipeline_metrics import format_report
 
 
 def main():
@@ -36,6 +37,16 @@ def main():
                        type=float, 
                        default=50.0,
                        help='처리할 최대 파일 크기 (MB)')
+    parser.add_argument('--mode', '-m',
+                       choices=['staged', 'streaming'],
+                       default=None,
+                       help='파이프라인 실행 방식 (기본값: PIPELINE_MODE 환경 변수)')
+    parser.add_argument('--force',
+                       action='store_true',
+                       help='이미 처리된 파일도 다시 처리 (수집 매니페스트/중복 체크 무시)')
+    parser.add_argument('--report',
+                       action='store_true',
+                       help='처리량 리포트 출력 (pages/sec, 단계별 시간, 페이지 지연 p50/p95, API 호출/토큰/기록 바이트)')
     
     args = parser.parse_args()
     folder_path = args.folder
@@ -50,9 +61,10 @@ def main():
         # 배치 처리 실행
         result = batch_document_processing_pipeline(
             folder_path=folder_path,
-            max_pages=5,
-            max_file_size_mb=50.0,
-            skip_existing=True
+            max_pages=args.max_pages,
+            max_file_size_mb=args.max_file_size,
+            skip_existing=not args.force,
+            pipeline_mode=args.mode
         )
         
         # 결과 출력
@@ -72,6 +84,10 @@ def main():
             print(f"   - 생성된 벡터: {stats['total_vectors_created']}개")
             print(f"   - 저장된 청크: {stats['total_chunks_saved']}개")
         
+        if args.report and result.get('metrics'):
+            print(f"\n⏱️ 처리량 리포트:")
+            print(format_report(result['metrics']))
+        
         return 0
         
     except Exception as e:
@@ -39,6 +39,10 @@ def main():
                        type=int, 
                        default=config.MAX_PAGES_TO_PROCESS,
                        help='처리할 최대 페이지 수')
+    parser.add_argument('--mode', '-m',
+                       choices=['staged', 'streaming'],
+                       default=config.PIPELINE_MODE,
+                       help='파이프라인 실행 방식 (staged: 단계별 일괄, streaming: 페이지 단위 스트리밍)')
     
     args = parser.parse_args()
     document_path = args.document
@@ -46,13 +50,15 @@ def main():
     print(f"🚀 문서 처리 파이프라인 시작")
     print(f"📄 처리할 문서: {document_path}")
     print(f"📊 페이지 처리 제한: {args.max_pages}페이지")
+    print(f"🌊 실행 방식: {args.mode}")
     
     try:
         # 파이프라인 실행 (이미지 처리 포함, 명령행 인수에서 페이지 수 가져오기)
         result = document_processing_pipeline(
             document_path, 
             skip_image_processing=False, 
-            max_pages=args.max_pages
+            max_pages=args.max_pages,
+            pipeline_mode=args.mode
         )
         
         if result["status"] == "success":
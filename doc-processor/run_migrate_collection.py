@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Milvus 컬렉션 스키마 마이그레이션 스크립트
+- 파이프라인은 컬렉션을 자동으로 삭제/재생성하지 않으므로 스키마 변경 시 이 명령을 명시적으로 실행
+- 기존 행을 현재 스키마로 복사하며, 바뀐 Milvus id를 DOCUMENT_CHUNKS.milvus_id에 반영 (선택)
+  어휘 색인이 켜져 있으면 새 id로 다시 구성
+- EMBEDDING_DIMENSION/EMBEDDING_VECTOR_TYPE을 바꾼 경우 기존 벡터를 재투영 (앞쪽 성분 + 정규화, API 재호출 없음)
+  --update-chunks 시 DOCUMENT_CHUNKS.vector_dimension도 갱신 (차원을 늘리는 것은 재처리 필요)
+- --reindex: 데이터는 그대로 두고 벡터 인덱스만 MILVUS_INDEX_TYPE(또는 --index-type)으로 재생성
+- --rebuild-lexical: 컬렉션 행으로 어휘(BM25) 색인 재구성
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# flow 경로 추가
+flow_path = Path(__file__).parent / "flow"
+sys.path.insert(0, str(flow_path))
+
+# 공통 모듈을 찾기 위해 상위 경로를 sys.path에 추가
+parent_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from config import config
+from lexical_index import get_lexical_index
+from pymilvus import utility
+from vector_store import (
+    SUPPORTED_INDEX_TYPES,
+    connect_milvus,
+    ensure_collection,
+    migrate_collection,
+    rebuild_index,
+    rebuild_lexical_index,
+)
+
+
+def update_chunk_milvus_ids(id_mapping: dict, vector_dimension: int = None, batch_size: int = 500) -> int:
+    """PostgreSQL DocumentChunk의 milvus_id를 새 id로 갱신 (vector_dimension 지정 시 함께 갱신)"""
+    from database import db_manager
+    from sqlalchemy import case, update
+
+    from shared_core import DocumentChunk, get_database_manager
+
+    if not db_manager.initialize():
+        print("⚠️ PostgreSQL 연결 실패: milvus_id 갱신을 건너뜁니다.")
+        return 0
+
+    mapping = [(str(old_id), str(new_id)) for old_id, new_id in id_mapping.items()]
+    updated = 0
+    with get_database_manager().session_scope() as session:
+        # 배치마다 UPDATE 1회 (CASE로 이전 id → 새 id 매핑)
+        for start in range(0, len(mapping), batch_size):
+            batch = dict(mapping[start:start + batch_size])
+            values = {"milvus_id": case(batch, value=DocumentChunk.milvus_id)}
+            if vector_dimension:
+                values["vector_dimension"] = vector_dimension
+            result = session.execute(
+                update(DocumentChunk)
+                .where(DocumentChunk.milvus_id.in_(list(batch)))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+    return updated
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='Milvus 컬렉션 스키마 마이그레이션')
+    parser.add_argument('--collection', '-c',
+                       default=config.MILVUS_COLLECTION_NAME,
+                       help='마이그레이션할 컬렉션 이름')
+    parser.add_argument('--batch-size', '-b',
+                       type=int,
+                       default=500,
+                       help='복사 배치 크기')
+    parser.add_argument('--update-chunks',
+                       action='store_true',
+                       help='PostgreSQL DOCUMENT_CHUNKS의 milvus_id를 새 id로 갱신')
+    parser.add_argument('--recreate',
+                       action='store_true',
+                       help='기존 데이터를 버리고 빈 컬렉션으로 재생성 (문서 재처리 필요)')
+    parser.add_argument('--reindex',
+                       action='store_true',
+                       help='데이터는 유지하고 벡터 인덱스만 재생성')
+    parser.add_argument('--index-type',
+                       choices=SUPPORTED_INDEX_TYPES,
+                       default=None,
+                       help='--reindex에 사용할 인덱스 유형 (기본: MILVUS_INDEX_TYPE)')
+    parser.add_argument('--rebuild-lexical',
+                       action='store_true',
+                       help='컬렉션 행으로 어휘(BM25) 색인 재구성')
+
+    args = parser.parse_args()
+
+    print("🧬 Milvus 컬렉션 마이그레이션")
+    print(f"   URI: {config.MILVUS_URI}")
+    print(f"   컬렉션: {args.collection}")
+    print(f"   벡터: {config.EMBEDDING_DIMENSION}차원 {config.EMBEDDING_VECTOR_TYPE}")
+    print("=" * 50)
+
+    try:
+        connect_milvus()
+
+        if args.recreate:
+            if utility.has_collection(args.collection):
+                utility.drop_collection(args.collection)
+                print(f"🗑️ 기존 컬렉션 삭제: {args.collection}")
+            ensure_collection(args.collection)
+            lexical_index = get_lexical_index()
+            if lexical_index is not None:
+                lexical_index.clear()
+            print("✅ 빈 컬렉션 재생성 완료")
+            return 0
+
+        if args.rebuild_lexical:
+            indexed = rebuild_lexical_index(args.collection, batch_size=args.batch_size)
+            print(f"✅ 어휘 색인 재구성 완료: {indexed}개 청크")
+            return 0
+
+        if args.reindex:
+            collection = ensure_collection(args.collection)
+            result = rebuild_index(collection, args.index_type)
+            print(f"✅ 인덱스 재생성 완료: {result['previous_index_type']} → {result['index_type']} {result['params']}")
+            return 0
+
+        result = migrate_collection(args.collection, batch_size=args.batch_size)
+        print(f"✅ 상태: {result['status']}, 이전된 행: {result['migrated_rows']}개")
+        reprojected = result.get("previous_vector") and result["previous_vector"] != result["vector"]
+        if result["status"] == "migrated" and reprojected:
+            (old_dim, old_type), (new_dim, new_type) = result["previous_vector"], result["vector"]
+            print(f"📐 벡터 재투영: {old_dim}차원 {old_type} → {new_dim}차원 {new_type}")
+
+        if args.update_chunks and result["id_mapping"]:
+            updated = update_chunk_milvus_ids(result["id_mapping"], result["vector"][0] if reprojected else None,
+                                              batch_size=args.batch_size)
+            print(f"💾 DOCUMENT_CHUNKS milvus_id 갱신: {updated}개")
+
+        # 어휘 색인도 Milvus id를 보관하므로 이전 후 다시 구성 (2단계 조회가 새 id를 사용)
+        if result["status"] == "migrated" and get_lexical_index() is not None:
+            indexed = rebuild_lexical_index(args.collection, batch_size=args.batch_size)
+            print(f"🔤 어휘 색인 재구성: {indexed}개 청크")
+
+        return 0
+
+    except Exception as e:
+        print(f"❌ 마이그레이션 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
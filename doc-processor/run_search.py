@@ -1,23 +1,26 @@
 #!/usr/bin/env python3
 """
 Milvus 벡터 검색 실행 스크립트 (Prefect 없이)
+- 검색은 VectorSearcher를 사용하므로 한 번 실행에서 연결/컬렉션 로드는 한 번만 수행
+- 여러 질의를 계속 처리할 때는 run_search_service.py(상주 서비스)를 사용
 """
 
 import sys
 import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any
 import logging
-import time
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.append(str(Path(__file__).parent))
+# 파이프라인과 동일한 임베딩 엔진을 사용하기 위해 flow 경로 추가
+sys.path.append(str(Path(__file__).parent / "flow"))
 
 # Milvus
 from pymilvus import Collection, connections, utility
 
-# Azure OpenAI (임베딩용)
-import openai
+# 검색기 (파이프라인과 공유: 연결 유지 + 질의 임베딩 LRU)
+from vector_searcher import get_vector_searcher
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -27,99 +30,14 @@ logger = logging.getLogger(__name__)
 MILVUS_URI = os.getenv("MILVUS_URI", "./milvus_lite.db")  # 파일 기반 DB
 MILVUS_COLLECTION_NAME = os.getenv("MILVUS_COLLECTION_NAME", "document_vectors")
 
-# Azure OpenAI 설정
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
-AZURE_OPENAI_EMBEDDING_API_VERSION = os.getenv("AZURE_OPENAI_EMBEDDING_API_VERSION", "2023-12-01-preview")
-AZURE_OPENAI_EMBEDDING_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
-
-def get_azure_openai_embedding(text: str) -> List[float]:
-    """Azure OpenAI를 사용하여 텍스트 임베딩을 생성합니다."""
-    try:
-        # Azure OpenAI 클라이언트 생성
-        client = openai.AzureOpenAI(
-            azure_endpoint=AZURE_OPENAI_ENDPOINT,
-            api_key=AZURE_OPENAI_KEY,
-            api_version=AZURE_OPENAI_EMBEDDING_API_VERSION
-        )
-        
-        response = client.embeddings.create(
-            model=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            input=text
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        logger.error(f"❌ 임베딩 생성 실패: {str(e)}")
-        raise
-
-def _get_embedding_dim_from_schema(collection: Collection) -> int:
-    """컬렉션 스키마에서 임베딩 차원을 추출합니다."""
-    try:
-        for field in collection.schema.fields:
-            if field.name == "embedding":
-                # PyMilvus 버전에 따라 dim 속성 또는 params 사용
-                dim_value = getattr(field, "dim", None)
-                if dim_value:
-                    return int(dim_value)
-                params = getattr(field, "params", None)
-                if isinstance(params, dict) and "dim" in params:
-                    return int(params["dim"])
-    except Exception:
-        pass
-    # 파이프라인 기본값
-    return 3072
-
-def debug_and_prepare_collection() -> Collection:
-    """컬렉션 로드, 인덱스/스키마 점검 및 준비 (Milvus Lite)."""
-    connections.connect("default", uri=MILVUS_URI)
-    collection = Collection(MILVUS_COLLECTION_NAME)
-
-    # flush/load 보장
-    try:
-        collection.flush()
-    except Exception:
-        pass
-
-    collection.load()
-
-    # 인덱스/스키마 로깅
-    try:
-        index_types = []
-        for ix in collection.indexes:
-            ix_type = getattr(ix, "index_type", None) or str(ix)
-            index_types.append(ix_type)
-        logger.info(f"📋 인덱스: {index_types}")
-    except Exception:
-        logger.info("📋 인덱스 정보를 가져오지 못함")
-
-    try:
-        field_names = [f.name for f in collection.schema.fields]
-        logger.info(f"🧬 스키마 필드: {field_names}")
-    except Exception:
-        logger.info("🧬 스키마 정보를 가져오지 못함")
-
-    return collection
-
-def validate_query_embedding_dim(collection: Collection, embedding: List[float]):
-    """임베딩 차원 검증."""
-    col_dim = _get_embedding_dim_from_schema(collection)
-    if len(embedding) != col_dim:
-        raise ValueError(f"임베딩 차원 불일치: query={len(embedding)}, collection={col_dim}")
-
-def choose_search_params(collection: Collection) -> Dict[str, Any]:
-    """인덱스 유형에 맞는 최적화된 검색 파라미터 선택."""
-    index_type = None
-    try:
-        if collection.indexes:
-            index_type = getattr(collection.indexes[0], "index_type", None)
-    except Exception:
-        pass
-
-    # Milvus Lite는 FLAT, IVF_FLAT, AUTOINDEX만 지원
-    if index_type and "IVF" in str(index_type).upper():
-        return {"metric_type": "COSINE", "params": {"nprobe": 16}}
-    # FLAT 또는 AUTOINDEX (기본값)
-    return {"metric_type": "COSINE", "params": {}}
+def log_timings(result: Dict[str, Any]):
+    """단계별 소요 시간 출력 (embed, search, hydrate)"""
+    timings = result.get("timings_ms", {})
+    cached = " (질의 임베딩 LRU 적중)" if timings.get("embed_cached") else ""
+    logger.info(
+        f"⏱️ embed {timings.get('embed_ms', 0):.1f}ms{cached}, search {timings.get('search_ms', 0):.1f}ms, "
+        f"hydrate {timings.get('hydrate_ms', 0):.1f}ms, total {timings.get('total_ms', 0):.1f}ms"
+    )
 
 def check_milvus_connection():
     """Milvus Lite 연결 상태를 확인합니다."""
@@ -158,48 +76,12 @@ def search_combined_vectors(query: str, top_k: int = 5) -> Dict[str, Any]:
     logger.info(f"🔍 통합 벡터 검색: {query}")
     
     try:
-        collection = debug_and_prepare_collection()
-
-        # 쿼리 임베딩 및 차원 검증
-        query_embedding = get_azure_openai_embedding(query)
-        validate_query_embedding_dim(collection, query_embedding)
-
-        # 인덱스에 맞는 검색 파라미터 선택
-        search_params = choose_search_params(collection)
-
-        t0 = time.time()
-        results = collection.search(
-            [query_embedding],
-            "embedding",
-            search_params,
-            limit=top_k,
-            output_fields=["document_path", "page_number", "content_type", "content", 
-                          "text_content", "image_description", "image_path"]
-        )
-        logger.info(f"⏱️ 검색 시간: {time.time()-t0:.3f}s")
-        
-        # 결과 정리
-        search_results = []
-        for hits in results:
-            for hit in hits:
-                search_results.append({
-                    "score": float(hit.score),
-                    "document_path": hit.entity.get("document_path"),
-                    "page_number": hit.entity.get("page_number"),
-                    "content_type": hit.entity.get("content_type"),
-                    "content": hit.entity.get("content"),
-                    "text_content": hit.entity.get("text_content"),
-                    "image_description": hit.entity.get("image_description"),
-                    "image_path": hit.entity.get("image_path")
-                })
-        
-        logger.info(f"✅ 통합 벡터 검색 완료: {len(search_results)}개 결과")
-        return {
-            "search_type": "combined_vectors",
-            "query": query,
-            "results": search_results,
-            "total_results": len(search_results)
-        }
+        # 같은 페이지의 청크 결과는 최고 점수 하나로 합침
+        result = get_vector_searcher().search(query, top_k, "combined")
+        result["search_type"] = "combined_vectors"
+        log_timings(result)
+        logger.info(f"✅ 통합 벡터 검색 완료: {result['total_results']}개 결과")
+        return result
         
     except Exception as e:
         logger.error(f"❌ 통합 벡터 검색 실패: {str(e)}")
@@ -210,99 +92,24 @@ def search_text_only(query: str, top_k: int = 5) -> Dict[str, Any]:
     logger.info(f"📝 텍스트 전용 검색: {query}")
     
     try:
-        collection = debug_and_prepare_collection()
-
-        query_embedding = get_azure_openai_embedding(query)
-        validate_query_embedding_dim(collection, query_embedding)
-
-        search_params = choose_search_params(collection)
-
-        t0 = time.time()
-        results = collection.search(
-            [query_embedding],
-            "embedding",
-            search_params,
-            limit=top_k,
-            output_fields=["document_path", "page_number", "content_type", "content", 
-                          "text_content", "image_description", "image_path"]
-        )
-        logger.info(f"⏱️ 검색 시간: {time.time()-t0:.3f}s")
-        
-        # 텍스트가 있는 결과만 필터링
-        search_results = []
-        for hits in results:
-            for hit in hits:
-                text_content = hit.entity.get("text_content", "")
-                if text_content.strip():  # 텍스트가 있는 경우만
-                    search_results.append({
-                        "score": float(hit.score),
-                        "document_path": hit.entity.get("document_path"),
-                        "page_number": hit.entity.get("page_number"),
-                        "content_type": "text_only",
-                        "text_content": text_content,
-                        "image_path": hit.entity.get("image_path")
-                    })
-        
-        logger.info(f"✅ 텍스트 전용 검색 완료: {len(search_results)}개 결과")
-        return {
-            "search_type": "text_only",
-            "query": query,
-            "results": search_results,
-            "total_results": len(search_results)
-        }
+        result = get_vector_searcher().search(query, top_k, "text_only")
+        log_timings(result)
+        logger.info(f"✅ 텍스트 전용 검색 완료: {result['total_results']}개 결과")
+        return result
         
     except Exception as e:
         logger.error(f"❌ 텍스트 전용 검색 실패: {str(e)}")
         raise
 
 def search_image_only(query: str, top_k: int = 5) -> Dict[str, Any]:
-    """이미지 설명만 검색"""
+    """이미지 설명만 검색 (Vision 인식 실패 응답 제외)"""
     logger.info(f"🖼️ 이미지 전용 검색: {query}")
     
     try:
-        collection = debug_and_prepare_collection()
-
-        query_embedding = get_azure_openai_embedding(query)
-        validate_query_embedding_dim(collection, query_embedding)
-
-        search_params = choose_search_params(collection)
-
-        t0 = time.time()
-        results = collection.search(
-            [query_embedding],
-            "embedding",
-            search_params,
-            limit=top_k,
-            output_fields=["document_path", "page_number", "content_type", "content", 
-                          "text_content", "image_description", "image_path"]
-        )
-        logger.info(f"⏱️ 검색 시간: {time.time()-t0:.3f}s")
-        
-        # 이미지 설명이 있는 결과만 필터링 (오류 메시지 제외)
-        search_results = []
-        for hits in results:
-            for hit in hits:
-                image_description = hit.entity.get("image_description", "")
-                image_path = hit.entity.get("image_path", "")
-                # 이미지 설명이 있고, 오류 메시지가 아닌 경우만
-                if (image_description.strip() and image_path and 
-                    not image_description.startswith("죄송합니다. 이미지를 인식할 수 없습니다")):
-                    search_results.append({
-                        "score": float(hit.score),
-                        "document_path": hit.entity.get("document_path"),
-                        "page_number": hit.entity.get("page_number"),
-                        "content_type": "image_only",
-                        "image_description": image_description,
-                        "image_path": image_path
-                    })
-        
-        logger.info(f"✅ 이미지 전용 검색 완료: {len(search_results)}개 결과")
-        return {
-            "search_type": "image_only",
-            "query": query,
-            "results": search_results,
-            "total_results": len(search_results)
-        }
+        result = get_vector_searcher().search(query, top_k, "image_only")
+        log_timings(result)
+        logger.info(f"✅ 이미지 전용 검색 완료: {result['total_results']}개 결과")
+        return result
         
     except Exception as e:
         logger.error(f"❌ 이미지 전용 검색 실패: {str(e)}")
@@ -398,31 +205,19 @@ def main():
         # 4. 검색 실행
         print(f"\n🔄 검색 실행 중...")
         
+        # 세 가지 검색을 한 번에 실행 (질의 임베딩 1회, Milvus 검색 동시 실행, 결과 조회 1회)
+        searcher = get_vector_searcher()
+        mode_results = searcher.search_many(query, 5, ["combined", "text_only", "image_only"])
+        mode_results["combined"]["search_type"] = "combined_vectors"
+        
+        # 출력할 상위 3개만 전체 필드 조회 (id 배치 조회 1회)
+        shown = [item for result in mode_results.values() if "error" not in result for item in result["results"][:3]]
+        searcher.expand(shown)
         search_results = {
             "query": query,
-            "results": {}
+            "results": mode_results
         }
-        
-        # 통합 검색
-        try:
-            combined_results = search_combined_vectors(query, 5)
-            search_results["results"]["combined"] = combined_results
-        except Exception as e:
-            search_results["results"]["combined"] = {"error": str(e)}
-        
-        # 텍스트 전용 검색
-        try:
-            text_results = search_text_only(query, 5)
-            search_results["results"]["text_only"] = text_results
-        except Exception as e:
-            search_results["results"]["text_only"] = {"error": str(e)}
-        
-        # 이미지 전용 검색
-        try:
-            image_results = search_image_only(query, 5)
-            search_results["results"]["image_only"] = image_results
-        except Exception as e:
-            search_results["results"]["image_only"] = {"error": str(e)}
+        log_timings(next(iter(mode_results.values())))
         
         # 결과 출력
         print_search_results(search_results)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+상주 검색 서비스 (HTTP, 표준 라이브러리만 사용)
+- 시작 시 Milvus 연결/컬렉션 로드/임베딩 클라이언트 생성을 한 번 수행하고 유지
+- 질의 임베딩 LRU와 단계별 소요 시간(embed, search, hydrate)을 응답에 포함
+- 검색 응답은 id/점수/페이지/미리보기만 담고, 본문은 /fetch로 펼친 결과의 id만 조회 (2단계)
+- 워밍업 이후 질의 지연은 연결 설정이 아니라 ANN 검색 시간에 좌우됨
+
+엔드포인트:
+    GET  /health                               상태, 컬렉션/인덱스, 질의 LRU 통계
+    GET  /search?q=검색어&top_k=5&type=hybrid   검색 (type: combined | text_only | image_only | hybrid)
+    POST /search  {"query": "...", "top_k": 5, "search_type": "combined", "full": false}
+    POST /fetch   {"ids": [...], "fields": ["text_content", ...]}   검색 결과 id의 전체 필드 (fields 생략 시 전체)
+    POST /reload                               컬렉션 다시 로드 (재색인/마이그레이션 후)
+
+Milvus Lite 파일(MILVUS_URI=./milvus_lite.db 등)은 한 프로세스만 열 수 있어 서비스가 실행 중이면
+파이프라인/run_search.py/run_migrate_collection.py가 연결하지 못하므로, Milvus 서버 URI가 필요합니다.
+
+사용 예:
+    python run_search_service.py --port 8765
+    curl "http://127.0.0.1:8765/search?q=D100.5&type=hybrid"
+    curl -X POST http://127.0.0.1:8765/fetch -d '{"ids": [4513, 4520]}'
+"""
+
+import argparse
+import json
+import logging
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# flow 경로 추가
+flow_path = Path(__file__).parent / "flow"
+sys.path.insert(0, str(flow_path))
+
+from config import config
+from vector_searcher import SEARCH_OUTPUT_FIELDS, SEARCH_TYPES, get_vector_searcher
+from vector_store import MILVUS_MAX_TOP_K, is_milvus_lite_uri
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 요청 본문 최대 크기 (질의/id 목록 JSON만 받음)
+_MAX_BODY_BYTES = 64 * 1024
+
+_TRUE_VALUES = ("1", "true", "yes")
+
+# 페이지로 합치기 전 청크를 top_k × SEARCH_CHUNK_OVERSAMPLE개 검색하므로 Milvus topk 한도에서 역산
+_MAX_TOP_K = MILVUS_MAX_TOP_K // max(1, config.SEARCH_CHUNK_OVERSAMPLE)
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """검색 요청 처리기 (ThreadingHTTPServer가 요청마다 스레드 생성, 검색기는 공유)"""
+
+    server_version = "DocSearch/1.0"
+
+    def _send_json(self, status: HTTPStatus, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _search(self, params: dict):
+        query = str(params.get("query") or "").strip()
+        if not query:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "query가 비어 있습니다."})
+            return
+        search_type = params.get("search_type") or "combined"
+        if search_type not in SEARCH_TYPES:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"search_type은 {', '.join(SEARCH_TYPES)} 중 하나입니다."})
+            return
+        try:
+            top_k = int(params.get("top_k") or config.SEARCH_TOP_K)
+        except (TypeError, ValueError):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "top_k는 정수여야 합니다."})
+            return
+        if not 1 <= top_k <= _MAX_TOP_K:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"top_k는 1~{_MAX_TOP_K} 범위여야 합니다."})
+            return
+
+        full_fields = str(params.get("full") or "").lower() in _TRUE_VALUES
+
+        try:
+            result = get_vector_searcher().search(query, top_k, search_type, full_fields=full_fields)
+        except Exception as e:
+            logger.error(f"❌ 검색 실패: {str(e)}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+            return
+        self._send_json(HTTPStatus.OK, result)
+
+    def _fetch(self, params: dict):
+        ids = params.get("ids")
+        fields = params.get("fields") or None
+        if not isinstance(ids, list) or not all(isinstance(hit_id, int) for hit_id in ids):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "ids는 정수 목록이어야 합니다."})
+            return
+        if fields is not None and (not isinstance(fields, list) or set(fields) - set(SEARCH_OUTPUT_FIELDS)):
+            self._send_json(HTTPStatus.BAD_REQUEST,
+                            {"error": f"fields는 {', '.join(SEARCH_OUTPUT_FIELDS)} 중에서 고릅니다."})
+            return
+
+        try:
+            rows = get_vector_searcher().fetch(ids, fields)
+        except Exception as e:
+            logger.error(f"❌ 조회 실패: {str(e)}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+            return
+        # 요청한 id 순서 유지 (없는 id는 missing_ids로)
+        self._send_json(HTTPStatus.OK, {
+            "results": [rows[hit_id] for hit_id in dict.fromkeys(ids) if hit_id in rows],
+            "missing_ids": [hit_id for hit_id in dict.fromkeys(ids) if hit_id not in rows],
+        })
+
+    def _reload(self):
+        try:
+            get_vector_searcher().reload()
+        except Exception as e:
+            logger.error(f"❌ 컬렉션 다시 로드 실패: {str(e)}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+            return
+        self._send_json(HTTPStatus.OK, {"status": "reloaded", **get_vector_searcher().stats()})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok", **get_vector_searcher().stats()})
+        elif url.path == "/search":
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            self._search({
+                "query": params.get("q") or params.get("query"),
+                "top_k": params.get("top_k"),
+                "search_type": params.get("type") or params.get("search_type"),
+                "full": params.get("full"),
+            })
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"알 수 없는 경로: {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == "/reload":
+            self._reload()
+            return
+        if url.path not in ("/search", "/fetch"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"알 수 없는 경로: {url.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > _MAX_BODY_BYTES:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "요청 본문이 너무 큽니다."})
+            return
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "JSON 본문이 올바르지 않습니다."})
+            return
+        params = params if isinstance(params, dict) else {}
+        if url.path == "/fetch":
+            self._fetch(params)
+        else:
+            self._search(params)
+
+    def log_message(self, format, *args):
+        logger.info(f"🌐 {self.address_string()} {format % args}")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='상주 벡터 검색 서비스')
+    parser.add_argument('--host', default=config.SEARCH_SERVICE_HOST,
+                       help='바인드 주소')
+    parser.add_argument('--port', '-p', type=int, default=config.SEARCH_SERVICE_PORT,
+                       help='포트')
+    parser.add_argument('--no-warm-up', action='store_true',
+                       help='시작 시 컬렉션 로드/클라이언트 생성을 하지 않음 (첫 요청에서 수행)')
+    parser.add_argument('--allow-milvus-lite', action='store_true',
+                       help='MILVUS_URI가 Milvus Lite 파일이어도 실행 (서비스 실행 중에는 다른 프로세스가 같은 파일을 열 수 없음)')
+    args = parser.parse_args()
+
+    if is_milvus_lite_uri():
+        if not args.allow_milvus_lite:
+            print(f"❌ MILVUS_URI가 Milvus Lite 파일입니다: {config.MILVUS_URI}")
+            print("   Milvus Lite 파일은 한 프로세스만 열 수 있어, 서비스가 실행 중이면 파이프라인/검색/마이그레이션이 실패합니다.")
+            print("   Milvus 서버 URI(예: http://localhost:19530)를 지정하거나, 단독 사용 시 --allow-milvus-lite를 붙이세요.")
+            return 1
+        print(f"⚠️ Milvus Lite 파일 사용 ({config.MILVUS_URI}): 서비스 실행 중에는 다른 프로세스가 이 파일을 열 수 없습니다.")
+
+    print("🚀 상주 검색 서비스")
+    print(f"   URI: {config.MILVUS_URI}")
+    print(f"   컬렉션: {config.MILVUS_COLLECTION_NAME}")
+    print(f"   주소: http://{args.host}:{args.port}")
+    print("=" * 50)
+
+    if not args.no_warm_up:
+        try:
+            get_vector_searcher().warm_up()
+        except Exception as e:
+            print(f"❌ 워밍업 실패: {e}")
+            return 1
+
+    server = ThreadingHTTPServer((args.host, args.port), SearchRequestHandler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 검색 서비스 종료")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,7 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, insert
 from sqlalchemy.orm import Session
 
 from .models import Document, DocumentChunk, ProcessingJob
@@ -421,6 +421,24 @@ class DocumentChunkCRUD:
             logger.error(f"문서 청크 생성 실패: {str(e)}")
             raise
     
+    def bulk_create_chunks(self, chunks: List[Dict[str, Any]], replace_doc_id: str = None) -> int:
+        """문서 청크 일괄 생성 (단일 INSERT executemany, 단일 트랜잭션, replace_doc_id의 기존 청크는 같은 트랜잭션에서 삭제)"""
+        if not chunks and not replace_doc_id:
+            return 0
+        try:
+            if replace_doc_id:
+                self.db.query(DocumentChunk)\
+                    .filter(DocumentChunk.doc_id == replace_doc_id)\
+                    .delete(synchronize_session=False)
+            if chunks:
+                self.db.execute(insert(DocumentChunk), chunks)
+            self.db.commit()
+            return len(chunks)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"문서 청크 일괄 생성 실패: {str(e)}")
+            raise
+    
     def get_chunk(self, chunk_id: str) -> Optional[DocumentChunk]:
         """청크 조회"""
         try:
@@ -434,7 +452,7 @@ class DocumentChunkCRUD:
         try:
             return self.db.query(DocumentChunk)\
                 .filter(DocumentChunk.doc_id == doc_id)\
-                .order_by(DocumentChunk.page_number)\
+                .order_by(DocumentChunk.page_number, DocumentChunk.chunk_index)\
                 .all()
         except Exception as e:
             logger.error(f"문서 청크 목록 조회 실패: {str(e)}")
@@ -471,12 +489,13 @@ class DocumentChunkCRUD:
             logger.error(f"청크 삭제 실패: {str(e)}")
             raise
     
-    def delete_document_chunks(self, doc_id: str) -> int:
-        """문서의 모든 청크 삭제"""
+    def delete_document_chunks(self, doc_id: str, keep_pages: List[int] = None) -> int:
+        """문서의 모든 청크 삭제 (keep_pages의 페이지 청크는 유지)"""
         try:
-            deleted_count = self.db.query(DocumentChunk)\
-                .filter(DocumentChunk.doc_id == doc_id)\
-                .delete()
+            query = self.db.query(DocumentChunk).filter(DocumentChunk.doc_id == doc_id)
+            if keep_pages:
+                query = query.filter(DocumentChunk.page_number.notin_(keep_pages))
+            deleted_count = query.delete(synchronize_session=False)
             self.db.commit()
             return deleted_count
         except Exception as e:
@@ -129,6 +129,10 @@ class DocumentChunk(Base):
     content = Column(Text)                           # 텍스트 내용
     image_description = Column(Text)                 # 이미지 설명
     image_path = Column(String(500))                 # 이미지 파일 경로
+    chunk_index = Column(Integer, default=0)         # 페이지 내 청크 순번
+    char_start = Column(Integer)                     # 원본(페이지 텍스트/이미지 설명) 내 시작 위치
+    char_end = Column(Integer)                       # 원본 내 끝 위치
+    token_count = Column(Integer)                    # 임베딩 입력 토큰 수 (추정치)
     
     # 벡터 정보
     milvus_id = Column(String(255))          # Milvus에서의 ID
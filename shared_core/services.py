@@ -5,21 +5,33 @@ Backend와 Prefect 프로젝트에서 공통으로 사용하는 문서 관련 
 """
 
 import hashlib
+import io
 import logging
 import mimetypes
 import os
+import shutil
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import BinaryIO, Dict, List, Optional, Union
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 
 from sqlalchemy.orm import Session
 
 from .crud import DocumentChunkCRUD, DocumentCRUD, ProcessingJobCRUD
 from .models import Document, DocumentChunk, ProcessingJob
 
+try:
+    import fcntl
+except ImportError:  # Windows: reflink 미지원
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# 파일 복사/해시 계산 청크 크기
+FILE_CHUNK_SIZE = 1024 * 1024
+# Linux FICLONE ioctl (btrfs/XFS 등에서 copy-on-write 복제)
+_FICLONE = 0x40049409
+
 
 class DocumentService:
     """공통 문서 관리 서비스"""
@@ -61,6 +73,57 @@ class DocumentService:
         """실제 업로드 경로 생성"""
         return self.upload_base_path / file_key
 
+    def _staging_path(self) -> Path:
+        """업로드 경로와 같은 파일시스템의 임시 저장 경로 (완성 후 os.replace로 이동)"""
+        staging_dir = self.upload_base_path / ".staging"
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        return staging_dir / f"{uuid.uuid4().hex}.part"
+
+    def _copy_stream_with_hash(self, source: BinaryIO, target_path: Path) -> tuple[int, str]:
+        """스트림을 청크 단위로 복사하면서 크기와 MD5 해시 계산"""
+        hash_md5 = hashlib.md5()
+        file_size = 0
+        with open(target_path, "wb") as target:
+            for chunk in iter(lambda: source.read(FILE_CHUNK_SIZE), b""):
+                hash_md5.update(chunk)
+                target.write(chunk)
+                file_size += len(chunk)
+        return file_size, hash_md5.hexdigest()
+
+    def _hash_file(self, file_path: Path) -> tuple[int, str]:
+        """파일을 청크 단위로 읽어 크기와 MD5 해시 계산"""
+        with open(file_path, "rb") as f:
+            hash_md5 = hashlib.md5()
+            file_size = 0
+            for chunk in iter(lambda: f.read(FILE_CHUNK_SIZE), b""):
+                hash_md5.update(chunk)
+                file_size += len(chunk)
+        return file_size, hash_md5.hexdigest()
+
+    def _link_file(self, source_path: Path, target_path: Path) -> Optional[str]:
+        """
+        복사 없이 파일 연결 (같은 파일시스템일 때만 가능)
+
+        reflink(copy-on-write)를 먼저 시도하고, 안 되면 하드 링크를 사용합니다.
+        하드 링크는 원본과 inode를 공유하므로 원본을 덮어쓰지 않고 교체하는 경우에만 안전합니다.
+
+        Returns:
+            "reflink" | "hardlink" | None (연결 불가, 복사 필요)
+        """
+        if fcntl is not None:
+            try:
+                with open(source_path, "rb") as source, open(target_path, "wb") as target:
+                    fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+                return "reflink"
+            except OSError:
+                target_path.unlink(missing_ok=True)
+
+        try:
+            os.link(source_path, target_path)
+            return "hardlink"
+        except OSError:
+            return None
+
     def create_document_from_file(
         self,
         file_content: bytes,
@@ -72,17 +135,71 @@ class DocumentService:
         **additional_metadata,
     ) -> Dict:
         """파일 내용으로부터 문서 생성"""
+        return self.create_document_from_stream(
+            file_obj=io.BytesIO(file_content),
+            filename=filename,
+            user_id=user_id,
+            is_public=is_public,
+            permissions=permissions,
+            document_type=document_type,
+            **additional_metadata,
+        )
+
+    def create_document_from_stream(
+        self,
+        file_obj: BinaryIO,
+        filename: str,
+        user_id: str,
+        is_public: bool = False,
+        permissions: List[str] = None,
+        document_type: str = "common",
+        **additional_metadata,
+    ) -> Dict:
+        """파일 스트림으로부터 문서 생성 (청크 단위로 복사하면서 해시 계산, 전체를 메모리에 올리지 않음)"""
+        staged_path = self._staging_path()
+        try:
+            file_size, file_hash = self._copy_stream_with_hash(file_obj, staged_path)
+        except Exception as e:
+            staged_path.unlink(missing_ok=True)
+            logger.error(f"문서 생성 실패: {str(e)}")
+            raise
+
+        return self._register_staged_file(
+            staged_path,
+            filename=filename,
+            file_size=file_size,
+            file_hash=file_hash,
+            user_id=user_id,
+            is_public=is_public,
+            permissions=permissions,
+            document_type=document_type,
+            **additional_metadata,
+        )
+
+    def _register_staged_file(
+        self,
+        staged_path: Path,
+        filename: str,
+        file_size: int,
+        file_hash: str,
+        user_id: str,
+        is_public: bool = False,
+        permissions: List[str] = None,
+        document_type: str = "common",
+        status: str = "completed",
+        **additional_metadata,
+    ) -> Dict:
+        """임시 저장된 파일로 문서 등록 (중복 체크 → 업로드 경로로 이동 → 메타데이터 저장, 새/재처리 문서는 status로 기록)"""
         try:
             # 파일 정보 추출
             file_extension = self._get_file_extension(filename)
             file_type = self._get_mime_type(filename)
-            file_size = len(file_content)
-            file_hash = self._calculate_file_hash(file_content)
 
             # 중복 파일 체크
             existing_doc = self.document_crud.find_document_by_hash(file_hash)
             if existing_doc and existing_doc.status == "completed":
                 logger.info(f"📋 완료된 기존 문서 발견: {existing_doc.document_id}")
+                staged_path.unlink(missing_ok=True)
                 return self._document_to_dict(existing_doc, is_duplicate=True)
 
             # 고유한 문서 ID 생성
@@ -101,9 +218,8 @@ class DocumentService:
             # 디렉토리 생성
             upload_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # 파일 저장
-            with open(upload_path, "wb") as f:
-                f.write(file_content)
+            # 파일 저장 (같은 파일시스템 내 이동이므로 데이터 복사 없음)
+            os.replace(staged_path, upload_path)
 
             # DB에 메타데이터 저장
             if existing_doc and existing_doc.status in ["failed", "processing"]:
@@ -119,7 +235,7 @@ class DocumentService:
                     user_id=user_id,
                     upload_path=str(upload_path),
                     is_public=is_public,
-                    status="completed",
+                    status=status,
                     permissions=permissions,
                     document_type=document_type,
                     **additional_metadata,
@@ -139,7 +255,7 @@ class DocumentService:
                     upload_path=str(upload_path),
                     is_public=is_public,
                     file_hash=file_hash,
-                    status="completed",
+                    status=status,
                     permissions=permissions,
                     document_type=document_type,
                     **additional_metadata,
@@ -148,6 +264,7 @@ class DocumentService:
             return self._document_to_dict(document)
 
         except Exception as e:
+            staged_path.unlink(missing_ok=True)
             logger.error(f"문서 생성 실패: {str(e)}")
             raise
 
@@ -158,23 +275,54 @@ class DocumentService:
         is_public: bool = False,
         permissions: List[str] = None,
         document_type: str = "common",
+        link: bool = True,
+        file_hash: str = None,
+        status: str = "processing",
         **additional_metadata,
     ) -> Dict:
-        """파일 경로로부터 문서 생성"""
+        """
+        파일 경로로부터 문서 생성
+
+        link=True이고 업로드 경로와 같은 파일시스템이면 reflink/하드 링크로 저장하여 데이터를 복사하지 않고,
+        그 외에는 청크 단위로 복사하면서 해시를 계산합니다.
+        호출자가 이미 계산한 file_hash(예: 수집 매니페스트)를 넘기면 파일을 다시 해시하지 않습니다.
+        새/재처리 문서는 status("processing")로 등록하며, 처리를 마친 뒤 호출자가 completed로 갱신합니다
+        (중간에 중단된 문서는 completed가 아니므로 다음 실행에서 재처리/체크포인트 재개 대상).
+        """
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
 
-        with open(file_path, "rb") as f:
-            file_content = f.read()
+        staged_path = self._staging_path()
+        try:
+            link_mode = self._link_file(file_path, staged_path) if link else None
+            if link_mode:
+                logger.debug(f"파일 연결 저장 ({link_mode}): {file_path}")
+                if file_hash:
+                    file_size = staged_path.stat().st_size
+                else:
+                    file_size, file_hash = self._hash_file(staged_path)
+            elif file_hash:
+                shutil.copyfile(file_path, staged_path)
+                file_size = staged_path.stat().st_size
+            else:
+                with open(file_path, "rb") as source:
+                    file_size, file_hash = self._copy_stream_with_hash(source, staged_path)
+        except Exception as e:
+            staged_path.unlink(missing_ok=True)
+            logger.error(f"문서 생성 실패: {str(e)}")
+            raise
 
-        return self.create_document_from_file(
-            file_content=file_content,
+        return self._register_staged_file(
+            staged_path,
             filename=file_path.name,
+            file_size=file_size,
+            file_hash=file_hash,
             user_id=user_id,
             is_public=is_public,
             permissions=permissions,
             document_type=document_type,
+            status=status,
             **additional_metadata,
         )
 
@@ -196,6 +344,16 @@ class DocumentService:
             logger.error(f"문서 조회 실패: {str(e)}")
             raise
 
+    def find_completed_document_by_hash(self, file_hash: str) -> Optional[Dict]:
+        """파일 해시로 처리 완료된 문서 조회 (파일을 읽기 전 중복 체크용)"""
+        try:
+            document = self.document_crud.find_completed_document_by_hash(file_hash)
+            return self._document_to_dict(document, is_duplicate=True) if document else None
+
+        except Exception as e:
+            logger.error(f"해시 기반 문서 조회 실패: {str(e)}")
+            raise
+
     def get_user_documents(self, user_id: str) -> List[Dict]:
         """사용자의 문서 목록 조회"""
         try:
@@ -427,6 +585,53 @@ class DocumentChunkService:
             logger.error(f"문서 청크 생성 실패: {str(e)}")
             raise
 
+    def bulk_create_chunks(self, doc_id: str, chunks: List[Dict[str, Any]], replace: bool = False) -> List[str]:
+        """
+        문서 청크 일괄 생성 (문서 1개의 모든 청크를 한 트랜잭션으로 저장)
+
+        각 항목은 page_number, chunk_type과 create_chunk의 나머지 인자(content, image_description,
+        image_path, milvus_id, chunk_index, char_start, char_end, token_count, embedding_model,
+        vector_dimension, language, metadata_json)를 가집니다.
+        chunk_index가 있으면 chunk_id는 (문서, 페이지, 유형, 순번)으로 고정되므로, 재처리 시에는
+        replace=True로 기존 청크를 같은 트랜잭션에서 교체합니다.
+        생성된 chunk_id 목록을 입력 순서대로 반환합니다.
+        """
+        try:
+            rows = []
+            for chunk in chunks:
+                page_number = chunk["page_number"]
+                chunk_type = chunk["chunk_type"]
+                chunk_index = chunk.get("chunk_index")
+                suffix = uuid.uuid4().hex[:8] if chunk_index is None else chunk_index
+                text_content = chunk.get("content") or ""
+                rows.append({
+                    "chunk_id": f"{doc_id}_page_{page_number}_{chunk_type}_{suffix}",
+                    "doc_id": doc_id,
+                    "page_number": page_number,
+                    "chunk_type": chunk_type,
+                    "content": chunk.get("content"),
+                    "image_description": chunk.get("image_description"),
+                    "image_path": chunk.get("image_path"),
+                    "chunk_index": chunk_index or 0,
+                    "char_start": chunk.get("char_start"),
+                    "char_end": chunk.get("char_end"),
+                    "token_count": chunk.get("token_count"),
+                    "milvus_id": chunk.get("milvus_id"),
+                    "embedding_model": chunk.get("embedding_model"),
+                    "vector_dimension": chunk.get("vector_dimension"),
+                    "char_count": len(text_content),
+                    "word_count": len(text_content.split()),
+                    "language": chunk.get("language"),
+                    "metadata_json": chunk.get("metadata_json"),
+                })
+
+            self.chunk_crud.bulk_create_chunks(rows, replace_doc_id=doc_id if replace else None)
+            return [row["chunk_id"] for row in rows]
+
+        except Exception as e:
+            logger.error(f"문서 청크 일괄 생성 실패: {str(e)}")
+            raise
+
     def get_document_chunks(self, doc_id: str) -> List[Dict]:
         """문서의 모든 청크 조회"""
         try:
@@ -455,6 +660,15 @@ class DocumentChunkService:
             logger.error(f"청크 삭제 실패: {str(e)}")
             raise
 
+    def delete_document_chunks(self, doc_id: str, keep_pages: List[int] = None) -> int:
+        """문서의 모든 청크 삭제 (keep_pages의 페이지 청크는 유지, 중단된 처리를 이어서 할 때)"""
+        try:
+            return self.chunk_crud.delete_document_chunks(doc_id, keep_pages)
+
+        except Exception as e:
+            logger.error(f"문서 청크 일괄 삭제 실패: {str(e)}")
+            raise
+
     def _chunk_to_dict(self, chunk: DocumentChunk) -> Dict:
         """DocumentChunk 객체를 딕셔너리로 변환"""
         return {
@@ -466,6 +680,10 @@ class DocumentChunkService:
             "content": chunk.content,
             "image_description": chunk.image_description,
             "image_path": chunk.image_path,
+            "chunk_index": chunk.chunk_index,
+            "char_start": chunk.char_start,
+            "char_end": chunk.char_end,
+            "token_count": chunk.token_count,
             "milvus_id": chunk.milvus_id,
             "embedding_model": chunk.embedding_model,
             "vector_dimension": chunk.vector_dimension,